@@ -1,58 +1,38 @@
 import streamlit as st
+import os
 import json
-from scrapers import *
-
-# --- CẤU HÌNH ---
-OPTIONS = {
-    "Gạch Ốp Lát (Viglacera Tiles)": {
-        "url": "https://viglaceratiles.vn/san-pham/gach-op-lat.html",
-        "scraper_class": ViglaceraTilesScraper,
-        "item_selector": ".product-box",
-        "link_selector": "a.link-load"
-    },
-    "Ngói Lợp (Viglacera Tiles)": {
-        "url": "https://viglaceratiles.vn/san-pham/ngoi-lop.html",
-        "scraper_class": ViglaceraTilesScraper,
-        "item_selector": ".product-box-tiles",
-        "link_selector": "a.link-load"
-    },
-    "Sản Phẩm AAC (Viglacera AAC)": {
-        "url": "https://viglacera-aac.vn/collections/tat-ca-san-pham",
-        "scraper_class": ViglaceraAACScraper,
-        "item_selector": ".product-title",
-        "link_selector": "a"
-    },
-    "Sản phẩm VTHM Group": {
-        "url": "https://vthmgroup.vn/san-pham",
-        "scraper_class": VthmGroupScraper,
-        # Selector này trỏ thẳng vào thẻ <a> bao quanh sản phẩm
-        "item_selector": "a.block.group.cursor-pointer",
-        # Để trống link_selector báo hiệu cho bot biết item chính là link
-        "link_selector": None
-    },
-    "Sản phẩm TaiceraVN": {
-        "url": "https://taiceravn.com/san-pham/",
-        "scraper_class": TaiceraScraper,
-        # Selector chuẩn xác dựa trên HTML bạn gửi
-        "item_selector": "div.product-small",
-        "link_selector": "a.woocommerce-LoopProduct-link"
-    },
-    "Sản phẩm Slabstone": {
-        "url": "https://slabstone.vn/san-pham/",
-        "scraper_class": SlabstoneScraper,
-        "item_selector": ".tv-product",
-        "link_selector": "a"
-    },
-    "Sản phẩm Amy.vn (Tự động quét hết)": {
-        "url": "https://amy.vn",
-        "scraper_class": AmyScraper,
-        # Selector lấy từ HTML danh sách sản phẩm (bạn gửi trước đó)
-        "item_selector": ".product-box",
-        # Selector link chi tiết
-        "link_selector": "a.more-details"
-    }
+import tempfile
+from config import OPTIONS, option_slug
+from driver_pool import DriverPool
+from sinks import JsonlSink, jsonl_to_json
+from export import write_table
+
+# Thư mục ghi kết quả (JSONL ghi dần trong lúc cào, JSON chuyển đổi trên đĩa)
+OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "interncrawl")
+
+# Số Chrome/HTTP worker duyệt danh mục song song (Taicera, Amy)
+CATEGORY_WORKERS = 3
+
+# Checkpoint cũ hơn thời gian này bị bỏ, cào lại từ đầu (giây)
+CHECKPOINT_MAX_AGE = 24 * 3600
+
+# Định dạng file tải xuống -> (đuôi file, MIME). Chỉ dựng và gửi đúng 1 file người dùng chọn:
+# st.download_button nạp cả file vào RAM của server cho mỗi nút
+EXPORT_FORMATS = {
+    "JSON": ("json", "application/json"),
+    "JSONL (mỗi dòng 1 sản phẩm)": ("jsonl", "application/x-ndjson"),
+    "Parquet (pandas / DuckDB)": ("parquet", "application/vnd.apache.parquet"),
 }
 
+# Pool Chrome sống qua các lần rerun của Streamlit -> chạy nhiều mục liên tiếp không phải khởi động lại Chrome.
+# Mở sẵn 1 Chrome ở luồng nền ngay khi mở trang: lúc người dùng bấm nút thì Chrome đã sẵn sàng
+@st.cache_resource
+def get_driver_pool():
+    pool = DriverPool(size=CATEGORY_WORKERS, max_uses=20)
+    pool.warm(1, background=True)
+    return pool
+
+
 # --- GIAO DIỆN WEB ---
 st.set_page_config(page_title="Viglacera Data Tool", page_icon="📥", layout="centered")
 
@@ -63,58 +43,92 @@ st.markdown("---")
 # 1. Menu chọn
 option_name = st.selectbox("Chọn loại sản phẩm:", list(OPTIONS.keys()))
 config = OPTIONS[option_name]
+export_format = st.radio("Định dạng file tải xuống:", list(EXPORT_FORMATS), horizontal=True)
+fresh_run = st.checkbox("🔄 Cào lại từ đầu (bỏ tiến độ đã lưu của lần chạy trước)")
 
 # 2. Nút chạy
 if st.button("🚀 Bắt đầu lấy dữ liệu", type="primary"):
 
     # Khởi tạo class xử lý tương ứng
     ScraperClass = config["scraper_class"]
-    bot = ScraperClass()
-
-    # --- BƯỚC 1: LẤY LINK (Selenium) ---
+    file_name_clean = option_slug(option_name)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # Checkpoint theo từng mục: lần chạy trước bị dừng (rerun / sập) thì lần này chạy tiếp
+    checkpoint_path = os.path.join(OUTPUT_DIR, f"checkpoint_{file_name_clean}.sqlite")
+    bot = ScraperClass(driver_pool=get_driver_pool(), category_workers=CATEGORY_WORKERS,
+                       checkpoint_path=checkpoint_path, checkpoint_max_age=CHECKPOINT_MAX_AGE)
+    if fresh_run: bot.checkpoint.clear()
+    has_progress = any(bot.checkpoint.stats().values())
+
+    # --- LẤY LINK + CÀO CHI TIẾT CHẠY SONG SONG ---
+    # Link nào tìm thấy trước được tải chi tiết ngay, không chờ Selenium duyệt xong
     status = st.status("Đang kết nối máy chủ...", expanded=True)
-
-    links = bot.get_links(
-        url=config['url'],
-        item_selector=config['item_selector'],
-        link_selector=config['link_selector'],
-        progress_callback=status.write
-    )
+    my_bar = st.progress(0)
+    txt_status = st.empty()
+
+    # Mỗi sản phẩm cào xong được ghi ngay ra file JSONL, không gom toàn bộ trong RAM
+    jsonl_path = os.path.join(OUTPUT_DIR, f"data_{file_name_clean}.jsonl")
+
+    if has_progress:
+        st.info(f"♻️ Lần chạy trước ({(bot.checkpoint.age() or 0) / 60:.0f} phút trước) chưa xong - tiếp tục từ checkpoint, "
+                f"bỏ qua phần đã cào. Tích \"Cào lại từ đầu\" để bỏ checkpoint.")
+    run = bot.resume if has_progress else bot.scrape_streaming
+    with JsonlSink(jsonl_path) as sink:
+        links, count = run(
+            url=config['url'],
+            item_selector=config['item_selector'],
+            link_selector=config['link_selector'],
+            progress_callback=status.write,
+            progress_bar=my_bar,
+            status_text=txt_status,
+            sink=sink
+        )
 
     status.update(label="✅ Đã kết nối xong!", state="complete", expanded=False)
 
+    # Dọn dẹp giao diện khi xong
+    my_bar.empty()
+    txt_status.empty()
+
     if not links:
         st.error("⚠️ Không tìm thấy sản phẩm nào. Vui lòng thử lại sau.")
     else:
-        st.success(f"Đã tìm thấy **{len(links)}** sản phẩm. Đang tải chi tiết...")
-
-        # --- BƯỚC 2: CÀO CHI TIẾT (Requests) ---
-        my_bar = st.progress(0)
-        txt_status = st.empty()
-
-        # Gọi hàm cào danh sách
-        data = bot.scrape_details_list(links, progress_bar=my_bar, status_text=txt_status)
-
-        # Dọn dẹp giao diện khi xong
-        my_bar.empty()
-        txt_status.empty()
+        st.success(f"Đã tìm thấy **{len(links)}** sản phẩm.")
 
-        if data:
+        if count:
             st.balloons()
-            st.success("🎉 Xử lý hoàn tất!")
-
-            # Chuẩn bị file JSON
-            json_str = json.dumps(data, ensure_ascii=False, indent=4)
-            file_name_clean = option_name.split('(')[0].strip().replace(' ', '_').lower()
-            file_name = f"data_{file_name_clean}.json"
-
-            # Nút tải xuống
-            st.download_button(
-                label=f"📥 Tải xuống file {file_name}",
-                data=json_str,
-                file_name=file_name,
-                mime="application/json",
-                type="primary"
-            )
+            st.success(f"🎉 Xử lý hoàn tất! ({count} sản phẩm)")
+
+            # Chỉ chuẩn bị định dạng đã chọn: JSONL có sẵn (ghi dần lúc cào), JSON / Parquet chuyển từ JSONL
+            # ngay trên đĩa, từng bản ghi một
+            ext, mime = EXPORT_FORMATS[export_format]
+            file_name = f"data_{file_name_clean}.{ext}"
+            export_path = os.path.join(OUTPUT_DIR, file_name)
+            try:
+                if ext == "json": jsonl_to_json(jsonl_path, export_path)
+                elif ext == "parquet": write_table([(file_name_clean, jsonl_path)], export_path)
+                with open(export_path, 'rb') as f:
+                    st.download_button(
+                        label=f"📥 Tải xuống file {file_name}",
+                        data=f,
+                        file_name=file_name,
+                        mime=mime,
+                        type="primary"
+                    )
+            except ImportError as e:
+                st.error(f"⚠️ {e}")
         else:
-            st.warning("Đã chạy xong nhưng không thu thập được dữ liệu chi tiết.")
\ No newline at end of file
+            st.warning("Đã chạy xong nhưng không thu thập được dữ liệu chi tiết.")
+
+    # --- HỒ SƠ THỜI GIAN: xem mỗi lần chạy tốn thời gian ở đâu ---
+    with st.expander("⏱️ Hồ sơ thời gian từng giai đoạn"):
+        profile = bot.profiler.report()
+        st.caption(f"Tổng thời gian: {profile['wall_s']}s | Dung lượng tải: "
+                   f"{sum(profile['bytes_downloaded'].values()) / 1024 / 1024:.2f} MB")
+        st.dataframe(bot.profiler.rows(), use_container_width=True)
+        st.download_button(
+            label="📥 Tải xuống profile.json",
+            data=json.dumps(profile, ensure_ascii=False, indent=4),
+            file_name=f"profile_{file_name_clean}.json",
+            mime="application/json"
+        )
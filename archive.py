@@ -0,0 +1,234 @@
+"""Kho lưu HTML thô của trang chi tiết (content-addressed, nén zstd nếu có, không thì zlib) + parse lại offline.
+
+Khi sửa selector trong parse_detail, không cần cào lại cả site: chạy lại parse_detail hiện tại trên mọi trang
+đã lưu, song song trên mọi core.
+
+Dùng trong scraper: BaseScraper(archive_dir="archive") - mỗi trang tải về được lưu vào archive/pages.pack.
+Parse lại:
+    python archive.py reparse archive --output data_taicera.jsonl --scraper TaiceraScraper
+    python archive.py reparse archive --output catalog.jsonl --parser lxml --workers 8
+    python archive.py stats archive
+"""
+import os
+import sys
+import zlib
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+import concurrent.futures
+from parsers import PARSER_BACKENDS
+
+try:
+    import zstandard
+except ImportError:  # không có zstandard: nén zlib (chậm hơn, file lớn hơn), vẫn đọc được gói cũ nếu cài lại
+    zstandard = None
+
+PACK_FILE = "pages.pack"
+INDEX_FILE = "index.sqlite"
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+
+
+def _compress(body):
+    if zstandard: return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return "zlib", zlib.compress(body, ZLIB_LEVEL)
+
+
+def _decompress(codec, data):
+    if codec == "zlib": return zlib.decompress(data)
+    if zstandard is None:
+        raise ImportError("Kho được nén bằng zstd, cần cài thêm zstandard: pip install zstandard")
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+# --- KHO TRANG: 1 file pack chỉ ghi nối + index SQLite (URL -> hash nội dung -> vị trí trong pack) ---
+# Trang có nội dung giống hệt (cùng hash) chỉ lưu 1 lần; cùng URL tải lại thì index trỏ sang bản mới nhất.
+# Chỉ 1 process được ghi vào 1 kho (trong process dùng chung qua open_archive), đọc thì bao nhiêu process cũng được.
+class PageArchive:
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        os.makedirs(archive_dir, exist_ok=True)
+        self.pack_path = os.path.join(archive_dir, PACK_FILE)
+        self._lock = threading.Lock()
+        self._pack = open(self.pack_path, 'ab')
+        self._reader = None
+        self._db = sqlite3.connect(os.path.join(archive_dir, INDEX_FILE), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS blobs (
+            sha256 TEXT PRIMARY KEY, offset INTEGER, length INTEGER, size INTEGER, codec TEXT)""")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY, site TEXT, sha256 TEXT, encoding TEXT, fetched_at REAL)""")
+        self._db.commit()
+        self.stats = {"stored": 0, "duplicate": 0, "bytes": 0}
+
+    def put(self, url, body, encoding=None, site=None):
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            known = self._db.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+        # Nén ngoài khóa: các luồng tải không phải chờ nhau
+        compressed = None if known else _compress(body)
+        with self._lock:
+            if compressed and not self._db.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (digest,)).fetchone():
+                codec, data = compressed
+                offset = self._pack.seek(0, os.SEEK_END)
+                self._pack.write(data)
+                self._pack.flush()
+                self._db.execute("INSERT INTO blobs VALUES (?, ?, ?, ?, ?)", (digest, offset, len(data), len(body), codec))
+                self.stats["stored"] += 1
+                self.stats["bytes"] += len(data)
+            else:
+                self.stats["duplicate"] += 1
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                             (url, site, digest, encoding, time.time()))
+            self._db.commit()
+        return digest
+
+    def get(self, url):
+        # (bytes, encoding) của bản mới nhất của URL, None nếu chưa lưu
+        with self._lock:
+            row = self._db.execute("""SELECT b.offset, b.length, b.codec, p.encoding FROM pages p
+                                      JOIN blobs b ON b.sha256 = p.sha256 WHERE p.url = ?""", (url,)).fetchone()
+            if not row: return None
+            if self._reader is None: self._reader = open(self.pack_path, 'rb')
+            self._reader.seek(row[0])
+            data = self._reader.read(row[1])
+        return _decompress(row[2], data), row[3]
+
+    def sites(self):
+        with self._lock:
+            return {site: n for site, n in self._db.execute("SELECT site, COUNT(*) FROM pages GROUP BY site")}
+
+    def entries(self, sites=None):
+        # [(site, url, offset, length, codec, encoding)] theo thứ tự lưu - đủ để process con tự đọc pack
+        query = """SELECT p.site, p.url, b.offset, b.length, b.codec, p.encoding FROM pages p
+                   JOIN blobs b ON b.sha256 = p.sha256"""
+        params = ()
+        if sites:
+            query += f" WHERE p.site IN ({','.join('?' * len(sites))})"
+            params = tuple(sites)
+        with self._lock:
+            return self._db.execute(query + " ORDER BY p.rowid", params).fetchall()
+
+    def summary(self):
+        with self._lock:
+            pages = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            blobs, raw, packed = self._db.execute("SELECT COUNT(*), SUM(size), SUM(length) FROM blobs").fetchone()
+        ratio = f"x{raw / packed:.1f}" if packed else "-"
+        return (f"🗄️ Kho HTML: {pages} URL | {blobs} bản khác nhau | {(raw or 0) / 1e6:.1f}MB -> "
+                f"{(packed or 0) / 1e6:.1f}MB (nén {ratio})")
+
+    def close(self):
+        with self._lock:
+            self._pack.close()
+            if self._reader: self._reader.close()
+            self._db.close()
+        with _OPEN_LOCK:
+            if _OPEN.get(os.path.abspath(self.archive_dir)) is self: del _OPEN[os.path.abspath(self.archive_dir)]
+
+
+# Các scraper chạy cùng lúc trong 1 process (orchestrator.py) ghi chung 1 instance cho mỗi thư mục
+_OPEN = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def open_archive(archive_dir):
+    with _OPEN_LOCK:
+        key = os.path.abspath(archive_dir)
+        if key not in _OPEN: _OPEN[key] = PageArchive(archive_dir)
+        return _OPEN[key]
+
+
+# --- PARSE LẠI OFFLINE: process con tự đọc pack theo vị trí, chỉ gửi về bản ghi ---
+_WORKER_PACKS = {}
+
+
+def _reparse_chunk(scraper_cls, parse_options, pack_path, chunk):
+    from scrapers import _parse_in_worker
+    pack = _WORKER_PACKS.get(pack_path)
+    if pack is None: pack = _WORKER_PACKS[pack_path] = open(pack_path, 'rb')
+    results = []
+    for url, offset, length, codec, encoding in chunk:
+        try:
+            pack.seek(offset)
+            record, _, _ = _parse_in_worker(scraper_cls, parse_options, _decompress(codec, pack.read(length)),
+                                            encoding, url)
+            results.append((url, record, None))
+        except Exception as e:
+            results.append((url, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def reparse(archive_dir, sink, sites=None, parser="html.parser", workers=None, chunk_size=32):
+    """Chạy parse_detail hiện tại của từng site trên mọi trang đã lưu (song song bằng ProcessPool), ghi vào sink.
+    sites: tên class scraper cần parse lại (None = mọi site trong kho). Trả về {"pages", "records", "failed"}."""
+    import scrapers
+    from export import SOURCE_KEY
+    archive = open_archive(archive_dir)
+    entries = archive.entries(sites)
+    found = list(dict.fromkeys(site for site, *_ in entries))
+    unknown = [site for site in found if not isinstance(getattr(scrapers, site or "", None), type)]
+    if unknown: raise ValueError(f"Không có class scraper: {unknown}")
+
+    # Chia thành từng nhóm trang cùng site: mỗi lần gửi sang process con chỉ tốn vài chục vị trí trong pack
+    chunks = []
+    for site in found:
+        rows = [row[1:] for row in entries if row[0] == site]
+        chunks += [(site, rows[i:i + chunk_size]) for i in range(0, len(rows), chunk_size)]
+    report = {"pages": len(entries), "records": 0, "failed": []}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(_reparse_chunk, getattr(scrapers, site), {"parser": parser}, archive.pack_path, rows)
+                   for site, rows in chunks]
+        for (site, _), future in zip(chunks, futures):
+            for url, record, error in future.result():
+                if error:
+                    report["failed"].append({"url": url, "error": error})
+                    continue
+                if not record: continue
+                # Nhiều site chung 1 file: đánh dấu bản ghi thuộc site nào
+                sink.write({SOURCE_KEY: site, **record} if len(found) > 1 else record)
+                report["records"] += 1
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kho HTML thô: parse lại offline bằng parse_detail hiện tại")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_reparse = sub.add_parser("reparse", help="Parse lại mọi trang đã lưu, ghi ra JSONL")
+    p_reparse.add_argument("archive_dir", help="Thư mục kho (archive_dir của scraper)")
+    p_reparse.add_argument("--output", required=True, help="File .jsonl / .jsonl.gz ghi bản ghi")
+    p_reparse.add_argument("--scraper", nargs="*", default=None, help="Chỉ parse lại các class scraper này")
+    p_reparse.add_argument("--parser", default="html.parser", choices=PARSER_BACKENDS, help="Backend parse HTML")
+    p_reparse.add_argument("--workers", type=int, default=None, help="Số process parse (mặc định: số core)")
+    p_reparse.add_argument("--chunk", type=int, default=32, help="Số trang mỗi lần gửi sang process con")
+    p_stats = sub.add_parser("stats", help="Thống kê kho")
+    p_stats.add_argument("archive_dir", help="Thư mục kho")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.archive_dir, INDEX_FILE)):
+        print(f"❌ Không có kho: {args.archive_dir}", file=sys.stderr)
+        return 2
+    if args.command == "stats":
+        archive = open_archive(args.archive_dir)
+        print(archive.summary())
+        for site, n in archive.sites().items():
+            print(f"   -> {site}: {n} trang")
+        return 0
+
+    from sinks import JsonlSink
+    start = time.perf_counter()
+    with JsonlSink(args.output) as sink:
+        report = reparse(args.archive_dir, sink, args.scraper, args.parser, args.workers, args.chunk)
+    elapsed = time.perf_counter() - start
+    print(f"♻️ Parse lại {report['pages']} trang -> {report['records']} bản ghi ({args.output}) trong {elapsed:.1f}s "
+          f"| {report['pages'] / elapsed if elapsed else 0:.0f} trang/s")
+    for failure in report["failed"][:10]:
+        print(f"   ❌ {failure['url']}: {failure['error']}")
+    if len(report["failed"]) > 10: print(f"   ... và {len(report['failed']) - 10} trang lỗi khác")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,519 @@
+"""Benchmark offline cho scrapers.py (không cần mạng).
+
+Thư mục fixtures chứa các trang đã lưu, chia theo tên class scraper:
+    fixtures/ViglaceraTilesScraper/*.html           (trang chi tiết)
+    fixtures/ViglaceraTilesScraper/listing/*.html   (trang danh sách)
+    fixtures/ViglaceraTilesScraper/manifest.json    (URL gốc + selector của trang danh sách)
+    ...
+    fixtures/baseline.json                          (kết quả "run" với tham số mặc định)
+
+Số bản ghi / số link trong baseline giống nhau trên mọi máy; tốc độ thì không: máy CI chậm hơn hẳn máy ghi
+baseline thì ghi lại baseline trên chính máy CI (--save-baseline) rồi commit.
+
+Ví dụ:
+    python benchmark.py record --scraper AmyScraper --urls amy_links.txt --listing https://amy.vn/gach-op-tuong \
+        --item-selector .product-box --link-selector a.more-details
+    python benchmark.py run --save-baseline fixtures/baseline.json
+    python benchmark.py run --baseline fixtures/baseline.json   # CI: exit 1 nếu chậm hơn baseline / lỗi / thiếu fixtures
+    python benchmark.py fetch --fixtures fixtures --scraper ViglaceraTilesScraper --latency 200
+    python benchmark.py parsers --fixtures fixtures
+    python benchmark.py imports --budget-ms 400   # CI: exit 1 nếu import chậm hoặc kéo theo Selenium
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows: không đo được CPU process con / peak RSS
+    resource = None
+
+import scrapers
+from parsers import PARSER_BACKENDS
+
+LISTING_DIR = "listing"
+MANIFEST = "manifest.json"
+# Module không được nạp khi chỉ import code tải HTTP / parse (trình duyệt, UI)
+HEAVY_MODULES = ("selenium", "webdriver_manager", "streamlit", "pandas")
+
+
+# --- SERVER NỘI BỘ: phục vụ các trang sản phẩm đã lưu ---
+class FixtureHandler(SimpleHTTPRequestHandler):
+    latency = 0.0  # Giả lập độ trễ mạng (giây) cho mỗi request
+
+    def do_GET(self):
+        if self.latency: time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Backlog của listen() phải đặt trước khi bind: mặc định 5, nhiều kết nối song song bị rớt SYN -> chờ 1s
+    request_queue_size = 1024
+
+
+def start_fixture_server(fixtures_dir, latency_ms=0):
+    handler_cls = type("Handler", (FixtureHandler,), {"latency": latency_ms / 1000})
+    server = FixtureServer(("127.0.0.1", 0), partial(handler_cls, directory=fixtures_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fixture_pages(fixtures_dir, scraper_name):
+    # Danh sách đường dẫn tương đối (so với fixtures_dir) của các trang .html của 1 scraper
+    pages = []
+    for root, dirs, files in os.walk(os.path.join(fixtures_dir, scraper_name)):
+        dirs[:] = [d for d in dirs if d != LISTING_DIR]
+        for name in sorted(files):
+            if name.endswith(('.html', '.htm')):
+                pages.append(os.path.relpath(os.path.join(root, name), fixtures_dir).replace(os.sep, '/'))
+    return sorted(pages)
+
+
+def fixture_scrapers(fixtures_dir, only=None):
+    if not os.path.isdir(fixtures_dir): return []
+    names = [only] if only else sorted(os.listdir(fixtures_dir))
+    return [n for n in names if isinstance(getattr(scrapers, n, None), type) and fixture_pages(fixtures_dir, n)]
+
+
+def require_fixtures(args):
+    # Các scraper có fixtures; không có thì báo lỗi (CI không được "xanh" khi chẳng đo / so sánh gì)
+    names = fixture_scrapers(args.fixtures, args.scraper)
+    if not names:
+        target = f" cho {args.scraper}" if args.scraper else ""
+        print(f"❌ Không có fixtures{target} trong {args.fixtures}/<TênClassScraper>/*.html "
+              f"(tạo bằng: python benchmark.py record ...)", file=sys.stderr)
+    return names
+
+
+def fixture_links(server, pages, repeat=1):
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    # Thêm query để mỗi lần lặp là 1 URL khác nhau (tránh lọc trùng)
+    return [f"{base}/{page}?r={i}" for i in range(repeat) for page in pages]
+
+
+def load_manifest(fixtures_dir, scraper_name):
+    try:
+        with open(os.path.join(fixtures_dir, scraper_name, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"pages": {}, "listing": {}}
+
+
+# --- 0. RECORD: tải trang thật về làm fixtures (bước duy nhất cần mạng) ---
+def record_fixtures(args):
+    if not args.scraper:
+        print("❌ record cần --scraper")
+        return 2
+    bot = getattr(scrapers, args.scraper)()
+    root = os.path.join(args.fixtures, args.scraper)
+    os.makedirs(os.path.join(root, LISTING_DIR), exist_ok=True)
+    manifest = load_manifest(args.fixtures, args.scraper)
+
+    urls = []
+    if args.urls:
+        with open(args.urls, encoding='utf-8') as f:
+            urls = [line.strip() for line in f if line.strip()]
+    if args.discover:
+        urls += bot.get_links(args.discover, args.item_selector, args.link_selector)
+    urls = list(dict.fromkeys(urls))[:args.limit]
+
+    def save(url, folder):
+        response = bot.session.get(url, timeout=30)
+        if response.status_code != 200:
+            print(f"   ⚠️ {response.status_code} {url}")
+            return None
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16] + ".html"
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(response.content)
+        return name
+
+    for url in urls:
+        name = save(url, root)
+        if name: manifest["pages"][name] = url
+    for url in args.listing or []:
+        name = save(url, os.path.join(root, LISTING_DIR))
+        if name:
+            manifest["listing"][name] = {"url": url, "item_selector": args.item_selector,
+                                         "link_selector": args.link_selector}
+
+    with open(os.path.join(root, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+    print(f"✅ {args.scraper}: {len(manifest['pages'])} trang chi tiết, {len(manifest['listing'])} trang danh sách")
+    return 0
+
+
+# --- 1. FETCH: thread / async / process parse ---
+def run_mode(scraper_cls, links, **scraper_kwargs):
+    bot = scraper_cls(**scraper_kwargs)
+    start = time.perf_counter()
+    data = bot.scrape_details_list(links)
+    elapsed = time.perf_counter() - start
+    return len(data), elapsed
+
+
+def bench_fetch(args):
+    names = require_fixtures(args)
+    if not names: return 2
+    server = start_fixture_server(args.fixtures, args.latency)
+    for name in names:
+        links = fixture_links(server, fixture_pages(args.fixtures, name), args.repeat)
+        print(f"📦 {name}: {len(links)} trang | latency={args.latency}ms")
+        modes = [
+            ("thread (10 workers)", {"fetch_mode": "thread", "max_concurrency": 10}),
+            ("thread + process parse", {"fetch_mode": "thread", "max_concurrency": 10, "parse_mode": "process"}),
+            (f"async ({args.concurrency} in-flight)", {"fetch_mode": "async", "max_concurrency": args.concurrency}),
+            ("async + process parse", {"fetch_mode": "async", "max_concurrency": args.concurrency,
+                                       "parse_mode": "process"}),
+        ]
+        for label, kwargs in modes:
+            count, elapsed = run_mode(getattr(scrapers, name), links, **kwargs)
+            print(f"   -> {label:<28} {count:>6} bản ghi | {elapsed:7.2f}s | {len(links) / elapsed:8.1f} trang/s")
+    server.shutdown()
+    return 0
+
+
+# --- 2. RUN: bộ benchmark đầy đủ + so sánh baseline ---
+# Mỗi (scraper, chế độ) chạy trong 1 process riêng để CPU time và peak RSS không lẫn vào nhau
+RUN_MODES = {
+    "thread": {"fetch_mode": "thread"},
+    "thread+process": {"fetch_mode": "thread", "parse_mode": "process"},
+    "async": {"fetch_mode": "async"},
+    "async+process": {"fetch_mode": "async", "parse_mode": "process"},
+}
+RUN_TIMEOUT = 600  # Thời gian tối đa (giây) cho 1 (scraper, chế độ)
+
+
+def _percentile(values, p):
+    if not values: return 0.0
+    values = sorted(values)
+    return values[min(int(round(p / 100 * (len(values) - 1))), len(values) - 1)]
+
+
+def _measure_mode(scraper_name, scraper_kwargs, links, result_queue):
+    bot = getattr(scrapers, scraper_name)(**scraper_kwargs)
+    fetch_ms, parse_ms = [], []
+    record_stage, record_parse = bot.profiler.record, bot._record_parse
+
+    def sample_stage(stage, site, seconds, nbytes=0):
+        if stage == "fetch": fetch_ms.append(seconds * 1000)
+        record_stage(stage, site, seconds, nbytes)
+
+    def sample_parse(parse_s, extract_s):
+        parse_ms.append((parse_s + extract_s) * 1000)
+        record_parse(parse_s, extract_s)
+
+    bot.profiler.record, bot._record_parse = sample_stage, sample_parse
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+    cpu_start, start = time.process_time(), time.perf_counter()
+    data = bot.scrape_details_list(links)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    peak_rss_mb = None
+    if resource:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += (children.ru_utime - children_before.ru_utime) + (children.ru_stime - children_before.ru_stime)
+        peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, children.ru_maxrss)
+        peak_rss_mb = round(peak_kb / 1024, 1)
+    result_queue.put({
+        "pages": len(links), "records": len(data), "seconds": round(elapsed, 3),
+        "pages_per_s": round(len(links) / elapsed, 1),
+        "fetch_p50_ms": round(_percentile(fetch_ms, 50), 2), "fetch_p95_ms": round(_percentile(fetch_ms, 95), 2),
+        "parse_p50_ms": round(_percentile(parse_ms, 50), 2), "parse_p95_ms": round(_percentile(parse_ms, 95), 2),
+        "cpu_s": round(cpu, 3), "peak_rss_mb": peak_rss_mb,
+    })
+
+
+def run_isolated(scraper_name, scraper_kwargs, links, timeout=RUN_TIMEOUT):
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    proc = ctx.Process(target=_measure_mode, args=(scraper_name, scraper_kwargs, links, result_queue))
+    proc.start()
+    result, deadline = None, time.monotonic() + timeout
+    while result is None and time.monotonic() < deadline:
+        try:
+            result = result_queue.get(timeout=1)
+        except queue.Empty:
+            # Process con chết mà không gửi kết quả (exception, OOM kill) -> không chờ hết timeout
+            if not proc.is_alive() and result_queue.empty(): break
+    hung = result is None and proc.is_alive()  # Quá timeout mà process con vẫn chạy
+    proc.join(0 if hung else 10)
+    if proc.is_alive():
+        proc.terminate()
+        proc.join()
+    if hung: raise RuntimeError(f"quá {timeout:.0f}s, đã dừng process con")
+    if result is None: raise RuntimeError(f"process con thoát (exit code {proc.exitcode}) mà không gửi kết quả")
+    if proc.exitcode != 0: raise RuntimeError(f"process con thoát với exit code {proc.exitcode}")
+    return result
+
+
+def median_result(samples):
+    # Trung vị từng chỉ số qua nhiều lần chạy: 1 lần chậm bất thường (máy bận, spawn chậm) không thành hồi quy.
+    # Số bản ghi lấy lần ít nhất để lần nào mất bản ghi cũng lộ ra khi so baseline
+    merged = {}
+    for key in samples[0]:
+        values = [s[key] for s in samples if s[key] is not None]
+        merged[key] = statistics.median_low(values) if values else None
+    merged["records"] = min(s["records"] for s in samples)
+    return merged
+
+
+def bench_listing(server, fixtures_dir, name, repeat=1):
+    # Trang danh sách: tải lại từ server nội bộ + tách link bằng đúng selector đã ghi lúc record.
+    # Lặp repeat lần để p50/p95 có đủ mẫu; link gom chung 1 dict nên số link không nhân theo repeat
+    listing = load_manifest(fixtures_dir, name).get("listing", {})
+    if not listing: return None
+    bot = getattr(scrapers, name)()
+    base = f"http://127.0.0.1:{server.server_address[1]}/{name}/{LISTING_DIR}"
+    timings, links = [], {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for file_name, meta in sorted(listing.items()):
+            page_start = time.perf_counter()
+            soup = bot._http_soup(f"{base}/{file_name}")
+            domain = "/".join(meta["url"].split("/")[:3])
+            if soup is not None: bot._collect_links(soup, meta["item_selector"], meta["link_selector"], domain, links)
+            timings.append((time.perf_counter() - page_start) * 1000)
+    elapsed = time.perf_counter() - start
+    return {"pages": len(timings), "records": len(links), "seconds": round(elapsed, 3),
+            "pages_per_s": round(len(timings) / elapsed, 1),
+            "fetch_p50_ms": round(_percentile(timings, 50), 2), "fetch_p95_ms": round(_percentile(timings, 95), 2)}
+
+
+def compare_baseline(results, baseline, tolerance, latency_tolerance):
+    # Chậm hơn (trang/s giảm quá tolerance, p95 tăng quá latency_tolerance), hoặc số bản ghi khác -> hồi quy
+    regressions = []
+    for key, r in results.items():
+        b = baseline.get(key)
+        if not b: continue
+        notes = []
+        if r["records"] != b["records"]: notes.append(f"bản ghi {b['records']} -> {r['records']}")
+        if r["pages_per_s"] < b["pages_per_s"] * (1 - tolerance):
+            notes.append(f"trang/s {b['pages_per_s']} -> {r['pages_per_s']}")
+        # Parse trong luồng tải (thread/async) tính cả thời gian chờ GIL -> p95 parse chỉ so ở chế độ process parse
+        metrics = ("fetch_p95_ms", "parse_p95_ms") if key.endswith("+process") else ("fetch_p95_ms",)
+        for metric in metrics:
+            # p95 dao động mạnh hơn trang/s nên có ngưỡng riêng, cộng thêm 1ms để bỏ qua nhiễu rất nhỏ
+            if metric in b and r[metric] > b[metric] * (1 + latency_tolerance) + 1:
+                notes.append(f"{metric} {b[metric]} -> {r[metric]}")
+        if notes: regressions.append((key, notes))
+    return regressions
+
+
+def bench_run(args):
+    names = require_fixtures(args)
+    if not names: return 2
+    server = start_fixture_server(args.fixtures, args.latency)
+    modes = args.modes.split(',')
+    results, failed = {}, []
+    for name in names:
+        links = fixture_links(server, fixture_pages(args.fixtures, name), args.repeat)
+        print(f"📦 {name}: {len(links)} trang | latency={args.latency}ms | trung vị {args.runs} lần chạy")
+        for mode in modes:
+            kwargs = dict(RUN_MODES[mode], max_concurrency=args.concurrency, parser=args.parser)
+            try:
+                samples = [run_isolated(name, kwargs, links, args.timeout) for _ in range(args.runs)]
+            except RuntimeError as e:
+                failed.append(f"{name}:{mode}")
+                print(f"   ❌ {mode:<15} {e}")
+                continue
+            r = results[f"{name}:{mode}"] = median_result(samples)
+            print(f"   -> {mode:<15} {r['pages_per_s']:8.1f} trang/s | fetch p50/p95 {r['fetch_p50_ms']}/{r['fetch_p95_ms']}ms"
+                  f" | parse p50/p95 {r['parse_p50_ms']}/{r['parse_p95_ms']}ms | CPU {r['cpu_s']}s"
+                  f" | RSS {r['peak_rss_mb']}MB")
+        listing = bench_listing(server, args.fixtures, name, args.repeat)
+        if listing:
+            results[f"{name}:listing"] = listing
+            print(f"   -> {'listing':<15} {listing['pages_per_s']:8.1f} trang/s | {listing['records']} link")
+    server.shutdown()
+
+    if failed:
+        # Thiếu số đo của chế độ lỗi -> không ghi baseline, không coi là "không hồi quy"
+        print(f"🛑 {len(failed)} lần chạy lỗi: {', '.join(failed)}")
+        return 1
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+        print(f"💾 Đã lưu baseline: {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_baseline(results, json.load(f), args.tolerance, args.latency_tolerance)
+        for key, notes in regressions:
+            print(f"   ❌ {key}: {'; '.join(notes)}")
+        if regressions:
+            print(f"🛑 {len(regressions)} hồi quy so với baseline (tolerance {args.tolerance:.0%}).")
+            return 1
+        print("✅ Không có hồi quy so với baseline.")
+    return 0
+
+
+# --- 3. PARSERS: kiểm tra kết quả giống hệt html.parser + đo thời gian ---
+def bench_parsers(args):
+    backends = args.backends.split(',')
+    names = require_fixtures(args)
+    if not names: return 2
+    mismatches, compared = 0, 0
+    for name in names:
+        pages = fixture_pages(args.fixtures, name)
+        bots = {b: getattr(scrapers, name)(parser=b) for b in backends}
+        print(f"📦 {name}: {len(pages)} trang")
+        timings = {b: 0.0 for b in backends}
+        for page in pages:
+            with open(os.path.join(args.fixtures, page), 'rb') as f:
+                content = f.read()
+            url = f"https://fixture/{page}"
+            expected = bots["html.parser"]._parse_html(content, url, 'utf-8') if "html.parser" in bots else None
+            if expected is not None and len(bots) > 1: compared += 1
+            for backend, bot in bots.items():
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    record = bot._parse_html(content, url, 'utf-8')
+                timings[backend] += time.perf_counter() - start
+                if expected is not None and record != expected:
+                    mismatches += 1
+                    print(f"   ❌ {backend} khác html.parser: {page}")
+        base = timings.get("html.parser")
+        for backend, total in timings.items():
+            per_page = total / max(len(pages) * args.repeat, 1) * 1000
+            speedup = f" | x{base / total:.1f}" if base and total else ""
+            print(f"   -> {backend:<12} {per_page:8.2f} ms/trang{speedup}")
+
+    if mismatches:
+        print(f"🛑 {mismatches} trang cho kết quả khác nhau giữa các parser.")
+        return 1
+    if not compared:
+        # Không có html.parser làm chuẩn, chỉ 1 backend, hoặc trang nào cũng parse ra None
+        print("🛑 Không so sánh được trang nào (--backends cần html.parser và ít nhất 1 backend khác).")
+        return 1
+    print(f"✅ {compared} trang: tất cả parser cho kết quả giống nhau.")
+    return 0
+
+
+# --- 4. IMPORTS: thời gian import + không kéo theo Selenium / Streamlit ---
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "heavy": sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r}))}}))
+"""
+
+
+def _import_once(module):
+    # Mỗi lần đo là 1 interpreter mới (sys.modules trống); -X importtime liệt kê module tốn thời gian nhất
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=here,
+                          capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    costs, block = [], []
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package" - module con thụt lề, in trước module cha
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit(): continue
+        name = parts[2].strip()
+        block.append((int(parts[1]), name))
+        if parts[2][1:2] != ' ':  # module cấp cao nhất: kết thúc 1 cây con
+            if name == module: costs = block[:-1]
+            block = []
+    return json.loads(proc.stdout.strip().splitlines()[-1]), sorted(costs, reverse=True)
+
+
+def bench_imports(args):
+    failed = 0
+    for module in args.modules.split(','):
+        samples, costs = [], []
+        try:
+            for _ in range(args.repeat):
+                result, costs = _import_once(module)
+                samples.append(result["ms"])
+        except RuntimeError as e:
+            print(f"❌ import {module}: {e}")
+            failed += 1
+            continue
+        ms = statistics.median(samples)
+        top = ", ".join(f"{name} {us / 1000:.0f}ms" for us, name in costs[:args.top])
+        print(f"📦 import {module}: {ms:.0f}ms (trung vị {len(samples)} lần) | nặng nhất: {top}")
+        if result["heavy"]:
+            failed += 1
+            print(f"   ❌ kéo theo {', '.join(result['heavy'])} - phải import lười ở chỗ thật sự dùng")
+        if args.budget_ms and ms > args.budget_ms:
+            failed += 1
+            print(f"   ❌ vượt ngân sách {args.budget_ms:.0f}ms")
+
+    if failed:
+        print(f"🛑 {failed} vi phạm ngân sách import.")
+        return 1
+    print("✅ Import trong ngân sách, không nạp trình duyệt / UI.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline cho scrapers.py")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_record = sub.add_parser("record", help="Tải trang thật về làm fixtures (cần mạng)")
+    p_record.add_argument("--urls", default=None, help="File chứa URL trang chi tiết, mỗi dòng 1 URL")
+    p_record.add_argument("--discover", default=None, help="URL danh mục: tự tìm link chi tiết bằng get_links")
+    p_record.add_argument("--listing", nargs="*", default=None, help="URL trang danh sách cần lưu")
+    p_record.add_argument("--item-selector", default=None, help="Selector thẻ sản phẩm trên trang danh sách")
+    p_record.add_argument("--link-selector", default=None, help="Selector link chi tiết trong thẻ sản phẩm")
+    p_record.add_argument("--limit", type=int, default=50, help="Số trang chi tiết tối đa")
+    p_record.set_defaults(func=record_fixtures)
+
+    p_run = sub.add_parser("run", help="Bộ benchmark đầy đủ (trang/s, p50/p95, CPU, RSS) + so baseline")
+    p_run.add_argument("--modes", default=",".join(RUN_MODES), help="Các chế độ, cách nhau dấu phẩy")
+    p_run.add_argument("--repeat", type=int, default=40, help="Số lần lặp lại danh sách trang")
+    p_run.add_argument("--runs", type=int, default=5, help="Số lần chạy mỗi (scraper, chế độ), lấy trung vị")
+    p_run.add_argument("--latency", type=float, default=20, help="Độ trễ giả lập mỗi request (ms)")
+    p_run.add_argument("--concurrency", type=int, default=10, help="max_concurrency của scraper")
+    p_run.add_argument("--parser", default="html.parser", choices=PARSER_BACKENDS, help="Backend parse HTML")
+    p_run.add_argument("--baseline", default=None, help="File baseline JSON để so sánh")
+    p_run.add_argument("--save-baseline", default=None, help="Ghi kết quả lần chạy này làm baseline")
+    p_run.add_argument("--tolerance", type=float, default=0.3, help="Mức giảm trang/s cho phép so với baseline (0.3 = 30%%)")
+    p_run.add_argument("--latency-tolerance", type=float, default=0.5, help="Mức tăng p95 cho phép so với baseline")
+    p_run.add_argument("--timeout", type=float, default=RUN_TIMEOUT, help="Thời gian tối đa mỗi (scraper, chế độ), giây")
+    p_run.set_defaults(func=bench_run)
+
+    p_fetch = sub.add_parser("fetch", help="So sánh thread / async / process parse trên server nội bộ")
+    p_fetch.add_argument("--repeat", type=int, default=1, help="Số lần lặp lại danh sách trang")
+    p_fetch.add_argument("--latency", type=float, default=100, help="Độ trễ giả lập mỗi request (ms)")
+    p_fetch.add_argument("--concurrency", type=int, default=200, help="Số request song song cho chế độ async")
+    p_fetch.set_defaults(func=bench_fetch)
+
+    p_parsers = sub.add_parser("parsers", help="Kiểm tra tương đương + đo tốc độ các parser backend")
+    p_parsers.add_argument("--backends", default=",".join(PARSER_BACKENDS), help="Danh sách backend, cách nhau dấu phẩy")
+    p_parsers.add_argument("--repeat", type=int, default=3, help="Số lần parse mỗi trang khi đo")
+    p_parsers.set_defaults(func=bench_parsers)
+
+    p_imports = sub.add_parser("imports", help="Đo thời gian import (process mới) + kiểm tra không nạp Selenium")
+    p_imports.add_argument("--modules", default="scrapers,config,cli,orchestrator", help="Các module, cách nhau dấu phẩy")
+    p_imports.add_argument("--budget-ms", type=float, default=500, help="Thời gian import tối đa mỗi module (0 = không giới hạn)")
+    p_imports.add_argument("--repeat", type=int, default=3, help="Số lần đo mỗi module (lấy trung vị)")
+    p_imports.add_argument("--top", type=int, default=5, help="Số module con tốn thời gian nhất được in ra")
+    p_imports.set_defaults(func=bench_imports)
+
+    for p in (p_record, p_run, p_fetch, p_parsers):
+        p.add_argument("--fixtures", default="fixtures", help="Thư mục fixtures (chia theo tên class scraper)")
+        p.add_argument("--scraper", default=None, help="Chỉ chạy 1 class scraper (mặc định: tất cả có fixtures)")
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+import json
+import time
+import sqlite3
+import threading
+
+
+# --- CHECKPOINT: ghi lại tiến độ 1 lần cào để chạy tiếp nếu bị dừng giữa chừng ---
+# Lưu link đã tìm thấy, danh mục đã duyệt xong và bản ghi của từng URL đã cào xong.
+# Mỗi file checkpoint ứng với 1 lần cào; chạy xong trọn vẹn thì được xóa sạch.
+# max_age: checkpoint cũ hơn số giây này bị bỏ khi mở (link / bản ghi đã lỗi thời, cào lại từ đầu)
+class CheckpointStore:
+    def __init__(self, path, max_age=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS links (seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS categories (url TEXT PRIMARY KEY, links TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS records (url TEXT PRIMARY KEY, record TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+        age = self.age()
+        if max_age is not None and age is not None and age > max_age: self.clear()
+
+    def _touch(self):
+        # Ghi thời điểm bắt đầu có tiến độ (lần ghi đầu tiên sau khi tạo / xóa); gọi khi đang giữ khóa
+        self._db.execute("INSERT OR IGNORE INTO meta VALUES ('started_at', ?)", (str(time.time()),))
+
+    def age(self):
+        # Số giây kể từ khi checkpoint bắt đầu có tiến độ, None nếu đang trống
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'started_at'").fetchone()
+        return time.time() - float(row[0]) if row else None
+
+    # --- Giai đoạn tìm link ---
+    def set_links(self, urls):
+        # Ghi lại cả danh sách theo đúng thứ tự tìm thấy: lần tìm link trước bị dở dang thì thứ tự cũ bị thay,
+        # link cũ không bị đẩy lên trước link mới
+        with self._lock:
+            self._touch()
+            self._db.execute("DELETE FROM links")
+            self._db.executemany("INSERT OR IGNORE INTO links (url) VALUES (?)", [(u,) for u in urls])
+            self._db.commit()
+
+    def links(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT url FROM links ORDER BY seq")]
+
+    def mark_discovery_done(self):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('discovery_done', '1')")
+            self._db.commit()
+
+    def discovery_done(self):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM meta WHERE key = 'discovery_done'").fetchone() is not None
+
+    def mark_category(self, url, links):
+        with self._lock:
+            self._touch()
+            self._db.execute("INSERT OR REPLACE INTO categories VALUES (?, ?)", (url, json.dumps(links)))
+            self._db.commit()
+
+    def category_links(self, url):
+        # Danh sách link của danh mục đã duyệt xong, None nếu chưa duyệt
+        with self._lock:
+            row = self._db.execute("SELECT links FROM categories WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # --- Giai đoạn cào chi tiết ---
+    def add_record(self, url, record):
+        with self._lock:
+            self._touch()
+            self._db.execute("INSERT OR REPLACE INTO records VALUES (?, ?)",
+                             (url, json.dumps(record, ensure_ascii=False)))
+            self._db.commit()
+
+    def records(self):
+        with self._lock:
+            return {url: json.loads(record) for url, record in self._db.execute("SELECT url, record FROM records")}
+
+    def stats(self):
+        with self._lock:
+            return {table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("links", "categories", "records")}
+
+    def clear(self):
+        with self._lock:
+            for table in ("links", "categories", "records", "meta"):
+                self._db.execute(f"DELETE FROM {table}")
+            self._db.commit()
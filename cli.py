@@ -0,0 +1,128 @@
+"""Chạy 1 nguồn trong OPTIONS (config.py) từ dòng lệnh, không cần Streamlit - dùng cho cron / lịch chạy.
+
+Ví dụ:
+    python cli.py --list
+    python cli.py gạch_ốp_lát --output data/gach.jsonl.gz
+    python cli.py 5 --output taicera.parquet --parser lxml --profile taicera_profile.json
+    python cli.py "Sản phẩm Slabstone" --fresh
+
+Mã thoát:
+    0  thành công                        3  không tìm thấy link nào
+    1  xong nhưng có link / danh mục lỗi 4  có link nhưng không cào được bản ghi nào
+    2  sai tham số                       130 bị dừng (Ctrl+C / SIGTERM) - checkpoint giữ lại, chạy lại sẽ tiếp tục
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+from parsers import PARSER_BACKENDS
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_NO_LINKS = 3
+EXIT_NO_RECORDS = 4
+EXIT_INTERRUPTED = 130
+
+
+def _terminate(signum, frame):
+    # SIGTERM (cron/systemd dừng job) xử lý giống Ctrl+C: dừng lại, giữ checkpoint
+    raise KeyboardInterrupt
+
+
+def _convert(jsonl_path, output):
+    # Ghi JSONL trước (từng bản ghi), cuối cùng mới chuyển sang định dạng theo đuôi file đích
+    if output.endswith('.json'):
+        from sinks import jsonl_to_json
+        jsonl_to_json(jsonl_path, output)
+    else:
+        from export import write_table
+        write_table([(None, jsonl_path)], output)
+    os.remove(jsonl_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cào 1 nguồn dữ liệu từ dòng lệnh (không cần Streamlit)")
+    parser.add_argument("source", nargs="?", help="Tên nguồn, slug hoặc số thứ tự (xem --list)")
+    parser.add_argument("--list", action="store_true", help="In danh sách nguồn rồi thoát")
+    parser.add_argument("--output", default=None,
+                        help="File kết quả: .jsonl / .jsonl.gz / .json / .parquet / .arrow (mặc định data_<slug>.jsonl)")
+    parser.add_argument("--checkpoint-dir", default=None, help="Thư mục checkpoint (mặc định: cùng thư mục output)")
+    parser.add_argument("--fresh", action="store_true", help="Bỏ checkpoint cũ, cào lại từ đầu")
+    parser.add_argument("--checkpoint-max-age", type=float, default=24,
+                        help="Checkpoint cũ hơn số giờ này bị bỏ, cào lại từ đầu (mặc định 24)")
+    parser.add_argument("--discovery", default="auto", choices=("auto", "http", "selenium"), help="Cách tìm link")
+    parser.add_argument("--fetch-mode", default="thread", choices=("thread", "async"), help="Cách tải trang chi tiết")
+    parser.add_argument("--parse-mode", default="thread", choices=("thread", "process"), help="Parse tại luồng tải / ProcessPool")
+    parser.add_argument("--parser", default="html.parser", choices=PARSER_BACKENDS, help="Backend parse HTML")
+    parser.add_argument("--concurrency", type=int, default=10, help="Số request song song tối đa")
+    parser.add_argument("--category-workers", type=int, default=1, help="Số worker duyệt danh mục song song")
+    parser.add_argument("--cache-dir", default=None, help="Thư mục cache HTTP (ETag/Last-Modified)")
+    parser.add_argument("--store", default=None, help="Tạo thêm kho tra cứu (mmap + index) từ kết quả (product_store.py)")
+    parser.add_argument("--archive-dir", default=None, help="Lưu HTML thô vào kho để parse lại offline (archive.py)")
+    parser.add_argument("--profile", default=None, help="File JSON ghi hồ sơ thời gian")
+    parser.add_argument("--failures", default=None, help="File JSON ghi danh sách link lỗi")
+    parser.add_argument("--quiet", action="store_true", help="Không in tiến độ tìm link")
+    args = parser.parse_args(argv)
+
+    # Chỉ import scraper sau khi đọc xong tham số: --help không phải chờ
+    from config import OPTIONS, option_slug, resolve_source
+
+    if args.list:
+        for i, name in enumerate(OPTIONS, 1):
+            print(f"{i}. {name}  ({option_slug(name)})")
+        return EXIT_OK
+    source = resolve_source(args.source or "")
+    if not source:
+        print(f"❌ Không có nguồn: {args.source!r} (xem --list)", file=sys.stderr)
+        return EXIT_USAGE
+
+    from sinks import JsonlSink
+    config = OPTIONS[source]
+    slug = option_slug(source)
+    output = args.output or f"data_{slug}.jsonl"
+    direct = output.endswith(('.jsonl', '.jsonl.gz'))
+    jsonl_path = output if direct else output + ".part.jsonl"
+    out_dir = os.path.dirname(os.path.abspath(output))
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint_dir = args.checkpoint_dir or out_dir
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    bot = config["scraper_class"](
+        discovery=args.discovery, fetch_mode=args.fetch_mode, parse_mode=args.parse_mode, parser=args.parser,
+        max_concurrency=args.concurrency, category_workers=args.category_workers, cache_dir=args.cache_dir,
+        archive_dir=args.archive_dir, checkpoint_max_age=args.checkpoint_max_age * 3600,
+        profile_path=args.profile, failure_report_path=args.failures,
+        checkpoint_path=os.path.join(checkpoint_dir, f"checkpoint_{slug}.sqlite"))
+    if args.fresh: bot.checkpoint.clear()
+    has_progress = any(bot.checkpoint.stats().values())
+    run = bot.resume if has_progress else bot.scrape_streaming
+    progress = None if args.quiet else print
+
+    signal.signal(signal.SIGTERM, _terminate)
+    start = time.perf_counter()
+    try:
+        with JsonlSink(jsonl_path) as sink:
+            links, count = run(config["url"], config["item_selector"], config["link_selector"],
+                               progress_callback=progress, sink=sink)
+    except KeyboardInterrupt:
+        print("🛑 Đã dừng - checkpoint được giữ lại, chạy lại lệnh này để tiếp tục.", file=sys.stderr)
+        return EXIT_INTERRUPTED
+
+    if not links:
+        print("⚠️ Không tìm thấy sản phẩm nào.", file=sys.stderr)
+        return EXIT_NO_LINKS
+    if not count:
+        print(f"⚠️ Tìm thấy {len(links)} link nhưng không cào được bản ghi nào.", file=sys.stderr)
+        return EXIT_NO_RECORDS
+    if args.store:
+        from product_store import build_store
+        build_store([(None, jsonl_path)], args.store)
+    if not direct: _convert(jsonl_path, output)
+    print(f"✅ {count}/{len(links)} sản phẩm -> {output} ({time.perf_counter() - start:.1f}s)")
+    return EXIT_PARTIAL if bot.failures.items or bot.category_failures.items else EXIT_OK
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+from scrapers import (ViglaceraTilesScraper, ViglaceraAACScraper, VthmGroupScraper, TaiceraScraper,
+                      SlabstoneScraper, AmyScraper)
+
+# --- CẤU HÌNH CÁC NGUỒN DỮ LIỆU (dùng chung cho app.py và orchestrator.py) ---
+OPTIONS = {
+    "Gạch Ốp Lát (Viglacera Tiles)": {
+        "url": "https://viglaceratiles.vn/san-pham/gach-op-lat.html",
+        "scraper_class": ViglaceraTilesScraper,
+        "item_selector": ".product-box",
+        "link_selector": "a.link-load"
+    },
+    "Ngói Lợp (Viglacera Tiles)": {
+        "url": "https://viglaceratiles.vn/san-pham/ngoi-lop.html",
+        "scraper_class": ViglaceraTilesScraper,
+        "item_selector": ".product-box-tiles",
+        "link_selector": "a.link-load"
+    },
+    "Sản Phẩm AAC (Viglacera AAC)": {
+        "url": "https://viglacera-aac.vn/collections/tat-ca-san-pham",
+        "scraper_class": ViglaceraAACScraper,
+        "item_selector": ".product-title",
+        "link_selector": "a"
+    },
+    "Sản phẩm VTHM Group": {
+        "url": "https://vthmgroup.vn/san-pham",
+        "scraper_class": VthmGroupScraper,
+        # Selector này trỏ thẳng vào thẻ <a> bao quanh sản phẩm
+        "item_selector": "a.block.group.cursor-pointer",
+        # Để trống link_selector báo hiệu cho bot biết item chính là link
+        "link_selector": None
+    },
+    "Sản phẩm TaiceraVN": {
+        "url": "https://taiceravn.com/san-pham/",
+        "scraper_class": TaiceraScraper,
+        # Selector chuẩn xác dựa trên HTML bạn gửi
+        "item_selector": "div.product-small",
+        "link_selector": "a.woocommerce-LoopProduct-link"
+    },
+    "Sản phẩm Slabstone": {
+        "url": "https://slabstone.vn/san-pham/",
+        "scraper_class": SlabstoneScraper,
+        "item_selector": ".tv-product",
+        "link_selector": "a"
+    },
+    "Sản phẩm Amy.vn (Tự động quét hết)": {
+        "url": "https://amy.vn",
+        "scraper_class": AmyScraper,
+        # Selector lấy từ HTML danh sách sản phẩm (bạn gửi trước đó)
+        "item_selector": ".product-box",
+        # Selector link chi tiết
+        "link_selector": "a.more-details"
+    }
+}
+
+
+def option_slug(option_name):
+    # "Gạch Ốp Lát (Viglacera Tiles)" -> "gạch_ốp_lát": dùng đặt tên file kết quả / checkpoint
+    return option_name.split('(')[0].strip().replace(' ', '_').lower()
+
+
+def resolve_source(name):
+    # Tên đầy đủ, slug ("gạch_ốp_lát") hoặc số thứ tự (từ 1) -> tên trong OPTIONS; None nếu không có
+    keys = list(OPTIONS)
+    if name in OPTIONS: return name
+    if name.isdigit() and 0 < int(name) <= len(keys): return keys[int(name) - 1]
+    for key in keys:
+        if option_slug(key) == name.lower(): return key
+    return None
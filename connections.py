@@ -0,0 +1,150 @@
+import time
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# --- THỐNG KÊ KẾT NỐI: dùng lại bao nhiêu, mở mới bao nhiêu, tốn bao lâu bắt tay TCP/TLS ---
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.handshake_seconds = 0.0
+            self.discarded = 0
+
+    def add_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def add_connection(self, seconds=0.0):
+        with self._lock:
+            self.new_connections += 1
+            self.handshake_seconds += seconds
+
+    def add_handshake_time(self, seconds):
+        with self._lock:
+            self.handshake_seconds += seconds
+
+    def add_discarded(self):
+        with self._lock:
+            self.discarded += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused": max(self.requests - self.new_connections, 0),
+                "discarded": self.discarded,
+                "handshake_seconds": round(self.handshake_seconds, 3),
+                "avg_handshake_ms": round(self.handshake_seconds / self.new_connections * 1000, 1)
+                if self.new_connections else 0.0,
+            }
+
+
+def _timed_pool_classes(stats):
+    # Lớp connection/pool của urllib3 có đo thời gian connect() (TCP + TLS) và đếm kết nối bị bỏ khi pool đầy
+    class TimedHTTPConnection(HTTPConnection):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.add_connection(time.perf_counter() - start)
+
+    class TimedHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.add_connection(time.perf_counter() - start)
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+
+        def _put_conn(self, conn):
+            if conn and self.pool is not None and self.pool.full(): stats.add_discarded()
+            super()._put_conn(conn)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+
+        def _put_conn(self, conn):
+            if conn and self.pool is not None and self.pool.full(): stats.add_discarded()
+            super()._put_conn(conn)
+
+    return {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+# --- ADAPTER CHO requests.Session: pool cỡ tùy chỉnh + thống kê ---
+class StatsAdapter(HTTPAdapter):
+    def __init__(self, stats=None, **kwargs):
+        self.stats = stats or PoolStats()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _timed_pool_classes(self.stats)
+
+    def send(self, request, **kwargs):
+        self.stats.add_request()
+        return super().send(request, **kwargs)
+
+
+def mount_pool(session, pool_size, stats=None):
+    # pool_maxsize = số kết nối giữ sống mỗi host; nên >= số luồng tải song song để không phải bắt tay lại
+    adapter = StatsAdapter(stats, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return adapter
+
+
+# --- BACKEND HTTPX (HTTP/2: nhiều request chạy chung 1 kết nối) ---
+def new_httpx_client(headers, pool_size, stats=None, http2=True):
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError("http_backend='httpx' cần cài thêm httpx: pip install 'httpx[http2]'")
+
+    def trace_request(request):
+        # Dùng sự kiện trace của httpcore để đếm kết nối mới + thời gian TCP/TLS
+        marks = {}
+
+        def trace(name, info):
+            if name == "connection.connect_tcp.started":
+                marks["start"] = time.perf_counter()
+                stats.add_connection()
+            elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete") and "start" in marks:
+                now = time.perf_counter()
+                stats.add_handshake_time(now - marks["start"])
+                marks["start"] = now
+
+        request.extensions["trace"] = trace
+        stats.add_request()
+
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    return httpx.Client(http2=http2, headers=headers, limits=limits, follow_redirects=True,
+                        event_hooks={"request": [trace_request]} if stats else None)
+
+
+# --- THỐNG KÊ CHO aiohttp (fetch_mode="async") ---
+def aiohttp_trace_config(stats):
+    import aiohttp
+
+    async def on_request_start(session, ctx, params):
+        stats.add_request()
+
+    async def on_connection_create_start(session, ctx, params):
+        ctx.connect_started = time.perf_counter()
+
+    async def on_connection_create_end(session, ctx, params):
+        stats.add_connection(time.perf_counter() - ctx.connect_started)
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_connection_create_start.append(on_connection_create_start)
+    config.on_connection_create_end.append(on_connection_create_end)
+    return config
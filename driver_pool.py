@@ -0,0 +1,193 @@
+import os
+import json
+import threading
+
+# File lưu đường dẫn chromedriver đã tải để lần chạy sau không phải hỏi mạng lại
+DRIVER_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "interncrawl", "chromedriver.json")
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+# Selenium chỉ được import khi mở Chrome thật (new_driver) -> import module này không tốn thời gian nạp Selenium
+def chrome_options():
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    prefs = {"profile.managed_default_content_settings.images": 2}
+    options.add_experimental_option("prefs", prefs)
+    return options
+
+
+def resolve_driver_path():
+    # Thứ tự: nhớ trong process -> file cache trên đĩa -> ChromeDriverManager (cần mạng)
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path and os.path.exists(_driver_path):
+            return _driver_path
+        try:
+            with open(DRIVER_PATH_CACHE, encoding='utf-8') as f:
+                cached = json.load(f).get("path")
+            if cached and os.path.exists(cached):
+                _driver_path = cached
+                return _driver_path
+        except (OSError, ValueError):
+            pass
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _driver_path = ChromeDriverManager().install()
+            os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+            with open(DRIVER_PATH_CACHE, 'w', encoding='utf-8') as f:
+                json.dump({"path": _driver_path}, f)
+        except Exception as e:
+            print(f"⚠️ Không tải được chromedriver qua webdriver_manager: {e}")
+            _driver_path = None
+        return _driver_path
+
+
+def forget_driver_path(path):
+    # chromedriver đã lưu không mở được Chrome (Chrome tự cập nhật lên bản mới, file hỏng...) -> bỏ khỏi cache,
+    # lần sau resolve_driver_path tải lại bản khớp với Chrome hiện tại
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path == path: _driver_path = None
+        try:
+            with open(DRIVER_PATH_CACHE, encoding='utf-8') as f:
+                cached = json.load(f).get("path")
+            if cached == path: os.remove(DRIVER_PATH_CACHE)
+        except (OSError, ValueError):
+            pass
+
+
+def new_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    path = resolve_driver_path()
+    if path:
+        try:
+            return webdriver.Chrome(service=Service(path), options=chrome_options())
+        except Exception as e:
+            print(f"⚠️ chromedriver {path} không mở được Chrome ({type(e).__name__}) -> bỏ đường dẫn đã lưu")
+            forget_driver_path(path)
+    # Fallback: để Selenium tự tìm driver (chromium-driver cài sẵn / Selenium Manager)
+    return webdriver.Chrome(options=chrome_options())
+
+
+# --- POOL TRÌNH DUYỆT DÙNG CHUNG GIỮA CÁC SCRAPER ---
+class DriverPool:
+    def __init__(self, size=2, max_uses=20):
+        # size: số Chrome chạy cùng lúc tối đa
+        # max_uses: số lần cho mượn trước khi tắt và mở Chrome mới (tránh rò rỉ bộ nhớ)
+        self.size = size
+        self.max_uses = max_uses
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._uses = {}
+        self._closed = False
+        self.stats = {"started": 0, "reused": 0, "recycled": 0, "unhealthy": 0}
+
+    def _start(self):
+        driver = new_driver()
+        with self._lock:
+            self._uses[id(driver)] = 0
+            self.stats["started"] += 1
+        return driver
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def warm(self, count=None, background=False):
+        """Khởi động sẵn Chrome (tối đa count, mặc định = size) để lần get_links đầu tiên không phải chờ.
+        Mỗi Chrome đang mở chiếm 1 slot -> tổng số Chrome không vượt size; acquire() gọi lúc đang mở sẵn thì chờ
+        dùng luôn Chrome đó. background=True: chạy ở luồng nền, trả về Thread."""
+        if background:
+            thread = threading.Thread(target=self.warm, args=(count,), daemon=True, name="driver-pool-warm")
+            thread.start()
+            return thread
+        count = min(count or self.size, self.size)
+        with self._lock:
+            missing = count - len(self._idle)
+        # Giữ trước slot cho mọi Chrome sẽ mở (slot đang bị scraper mượn thì mở ít hơn)
+        reserved = 0
+        while reserved < missing and self._slots.acquire(blocking=False): reserved += 1
+        try:
+            while reserved:
+                driver = self._start()
+                with self._lock:
+                    closed = self._closed
+                    if not closed: self._idle.append(driver)
+                if closed: self._quit(driver)
+                # Chrome đã vào hàng chờ -> trả slot, acquire() đang chờ nhận được ngay
+                self._slots.release()
+                reserved -= 1
+                if closed: break
+        except Exception as e:
+            print(f"⚠️ Không khởi động sẵn được Chrome: {e}")
+        finally:
+            for _ in range(reserved): self._slots.release()
+
+    def acquire(self, timeout=None):
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Hết thời gian chờ trình duyệt rảnh trong pool")
+        try:
+            while True:
+                with self._lock:
+                    driver = self._idle.pop() if self._idle else None
+                if driver is None:
+                    return self._start()
+                if self._is_healthy(driver):
+                    with self._lock:
+                        self.stats["reused"] += 1
+                    return driver
+                with self._lock:
+                    self.stats["unhealthy"] += 1
+                self._quit(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver):
+        try:
+            with self._lock:
+                self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+                worn_out = self._uses[id(driver)] >= self.max_uses
+                if worn_out: self.stats["recycled"] += 1
+            if worn_out or not self._is_healthy(driver):
+                self._quit(driver)
+                return
+            # Dọn trạng thái trước khi cho scraper khác mượn
+            try:
+                driver.delete_all_cookies()
+                driver.get("about:blank")
+            except Exception:
+                self._quit(driver)
+                return
+            with self._lock:
+                self._idle.append(driver)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._quit(driver)
+
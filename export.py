@@ -0,0 +1,178 @@
+"""Xuất dữ liệu đã cào sang Parquet / Arrow (dạng cột) với schema thống nhất cho mọi scraper.
+
+Ví dụ:
+    python export.py catalog.parquet data_gach_op_lat.jsonl data_slabstone.json
+    python export.py catalog.arrow data_*.jsonl.gz --batch-size 2000
+"""
+import os
+import json
+import argparse
+from sinks import iter_records
+
+# Cột lặp lại nhiều giá trị giống nhau -> luôn thử mã hóa dictionary
+DICTIONARY_COLUMNS = ("Nguồn", "Bộ Sưu Tập", "Thương Hiệu", "Bề Mặt", "Bề mặt", "Loại Sản Phẩm",
+                      "Kích Thước", "Kích thước", "Xương Gạch", "Màu")
+DICTIONARY_MAX_VALUES = 10000  # Quá số giá trị khác nhau này thì để string thường
+VARIANTS_KEY = "Chi Tiết Các Mã"
+SOURCE_KEY = "Nguồn"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise ImportError("Xuất Parquet/Arrow cần cài thêm pyarrow: pip install pyarrow")
+
+
+def read_source(source):
+    # source: đường dẫn .json (mảng) / .jsonl / .jsonl.gz, hoặc list bản ghi
+    if not isinstance(source, str): return source
+    if source.endswith('.json'):
+        with open(source, encoding='utf-8') as f:
+            return json.load(f)
+    return iter_records(source)
+
+
+def flatten_record(record, source=None):
+    """1 bản ghi -> các dòng phẳng. Bản ghi có danh sách biến thể (Slabstone) tách thành 1 dòng / biến thể;
+    trường biến thể trùng tên với trường chung được đổi thành "<tên> (biến thể)"."""
+    base = {SOURCE_KEY: source} if source else {}
+    base.update((k, v) for k, v in record.items() if k != VARIANTS_KEY)
+    variants = record.get(VARIANTS_KEY)
+    if not isinstance(variants, list) or not variants:
+        return [base]
+    rows = []
+    for variant in variants:
+        row = dict(base)
+        for key, value in (variant.items() if isinstance(variant, dict) else [(VARIANTS_KEY, variant)]):
+            row[f"{key} (biến thể)" if key in base else key] = value
+        rows.append(row)
+    return rows
+
+
+def iter_rows(sources):
+    # sources: list (tên nguồn, file hoặc list bản ghi); tên nguồn None = không thêm cột "Nguồn"
+    for name, source in sources:
+        for record in read_source(source):
+            if record: yield from flatten_record(record, name)
+
+
+def _scalar(value):
+    if value is None or isinstance(value, str): return value
+    if isinstance(value, (dict, list)): return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+# --- SUY RA SCHEMA (lượt 1: chỉ giữ thống kê từng cột, không giữ dữ liệu) ---
+def infer_schema(rows):
+    columns = {}
+    for row in rows:
+        for key, value in row.items():
+            col = columns.setdefault(key, {"list": False, "count": 0, "values": set()})
+            if value is None: continue
+            col["count"] += 1
+            if isinstance(value, list):
+                col["list"] = True
+                continue
+            values = col["values"]
+            if values is not None:
+                values.add(_scalar(value))
+                if len(values) > DICTIONARY_MAX_VALUES: col["values"] = None
+
+    schema = {}
+    for key, col in columns.items():
+        values = col["values"]
+        # Dictionary: cột được chỉ định sẵn, hoặc số giá trị khác nhau <= 1/2 số dòng có dữ liệu
+        use_dict = (not col["list"] and values is not None and values
+                    and (key in DICTIONARY_COLUMNS or len(values) * 2 <= col["count"]))
+        schema[key] = {"list": col["list"], "dictionary": sorted(values) if use_dict else None}
+    return schema
+
+
+def _arrow_schema(pa, schema):
+    fields = []
+    for key, col in schema.items():
+        if col["list"]: type_ = pa.list_(pa.string())
+        elif col["dictionary"] is not None: type_ = pa.dictionary(pa.int32(), pa.string())
+        else: type_ = pa.string()
+        fields.append(pa.field(key, type_))
+    return pa.schema(fields)
+
+
+def _to_batch(pa, arrow_schema, schema, dictionaries, rows):
+    arrays = []
+    for key, col in schema.items():
+        values = [row.get(key) for row in rows]
+        if col["list"]:
+            values = [None if v is None else [_scalar(x) for x in (v if isinstance(v, list) else [v])]
+                      for v in values]
+            arrays.append(pa.array(values, type=pa.list_(pa.string())))
+        elif col["dictionary"] is not None:
+            # Dùng chung 1 dictionary cho mọi batch (file Arrow không cho thay dictionary giữa chừng)
+            dictionary, index = dictionaries[key]
+            indices = pa.array([None if v is None else index[_scalar(v)] for v in values], type=pa.int32())
+            arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+        else:
+            arrays.append(pa.array([_scalar(v) for v in values], type=pa.string()))
+    return pa.RecordBatch.from_arrays(arrays, schema=arrow_schema)
+
+
+# --- GHI FILE (lượt 2: đọc lại nguồn, ghi từng batch) ---
+def write_table(sources, path, batch_size=5000, fmt=None):
+    """Ghi Parquet (.parquet) hoặc Arrow IPC (.arrow/.feather) theo từng batch, trả về số dòng.
+    sources: list (tên nguồn, file hoặc list bản ghi) - được đọc 2 lần (suy schema, rồi ghi)."""
+    pa = _require_pyarrow()
+    fmt = fmt or ("parquet" if path.endswith('.parquet') else "arrow")
+    schema = infer_schema(iter_rows(sources))
+    arrow_schema = _arrow_schema(pa, schema)
+    dictionaries = {key: (pa.array(col["dictionary"], type=pa.string()),
+                          {v: i for i, v in enumerate(col["dictionary"])})
+                    for key, col in schema.items() if col["dictionary"] is not None}
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        use_dictionary = [k for k, col in schema.items() if col["dictionary"] is not None]
+        writer = pq.ParquetWriter(path, arrow_schema, compression="zstd", use_dictionary=use_dictionary or False)
+        write = writer.write_batch
+    else:
+        writer = pa.ipc.new_file(path, arrow_schema)
+        write = writer.write_batch
+
+    total = 0
+    try:
+        batch = []
+        for row in iter_rows(sources):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                write(_to_batch(pa, arrow_schema, schema, dictionaries, batch))
+                total += len(batch)
+                batch = []
+        if batch:
+            write(_to_batch(pa, arrow_schema, schema, dictionaries, batch))
+            total += len(batch)
+    finally:
+        writer.close()
+    return total
+
+
+def source_name(path):
+    # data_gach_op_lat.jsonl.gz -> gach_op_lat
+    name = os.path.basename(path).split('.')[0]
+    return name[5:] if name.startswith("data_") else name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Xuất JSON/JSONL đã cào sang Parquet hoặc Arrow")
+    parser.add_argument("output", help="File đích: .parquet hoặc .arrow/.feather")
+    parser.add_argument("inputs", nargs="+", help="Các file .json / .jsonl / .jsonl.gz")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Số dòng mỗi batch khi ghi")
+    args = parser.parse_args()
+
+    total = write_table([(source_name(p), p) for p in args.inputs], args.output, args.batch_size)
+    print(f"✅ Đã ghi {total} dòng vào {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,149 @@
+import re
+import soupsieve
+from bs4 import Tag
+from bs4.filter import ElementFilter
+
+# Bỏ phần trong (...) và [...] trước khi tìm khóa lọc: class trong :not(.x) không phải điều kiện bắt buộc
+_NESTED = re.compile(r'\([^()]*\)|\[[^\]]*\]')
+_COMBINATOR = re.compile(r'\s*[>+~]\s*|\s+')
+# [id^="tv-tab-"]: thẻ có id bắt đầu bằng tiền tố (id đánh số theo tab / biến thể)
+_ID_PREFIX = re.compile(r'^\[id\^=["\']?([\w-]+)["\']?\]$')
+
+
+def _compound_key(compound):
+    # ("id", x) / ("class", x) / ("name", x) của 1 selector ghép, None nếu không rút ra được
+    if '(' in compound or '[' in compound: return None
+    found = re.search(r'#([\w-]+)', compound)
+    if found: return ("id", found.group(1))
+    found = re.search(r'\.([\w-]+)', compound)
+    if found: return ("class", found.group(1))
+    found = re.match(r'[a-zA-Z][\w-]*', compound)
+    if found: return ("name", found.group(0).lower())
+    return None
+
+
+def _selector_keys(part):
+    # Khóa lọc nhanh của 1 selector đơn (không có dấu phẩy): (khóa của chính thẻ, khóa tổ tiên hoặc None).
+    # Khóa tổ tiên lấy từ phần đầu khi các phần nối nhau bằng dấu cách / '>' (vd ".detail-pic img").
+    # Khóa của thẻ None -> phải thử mọi thẻ
+    part = part.strip()
+    if '\\' in part: return None, None
+    stripped = _NESTED.sub('', part)
+    compounds = _COMBINATOR.split(stripped)
+    ancestor = None
+    if len(compounds) > 1 and not re.search(r'[+~]', stripped): ancestor = _compound_key(compounds[0])
+    return _compound_key(compounds[-1]), ancestor
+
+
+def _has_key(tag, key):
+    kind, value = key
+    if kind == "name": return tag.name == value
+    if kind == "id": return tag.get('id') == value
+    return value in (tag.get('class') or ())
+
+
+def _leftmost_key(part):
+    # Khóa của phần đầu selector (vd ".breadcrumb" trong ".breadcrumb li:last-child a");
+    # None nếu phần đầu có pseudo-class khác :not() (vd :first-child phụ thuộc thẻ anh em bị bỏ khi lọc vùng)
+    part = part.strip()
+    if '\\' in part: return None
+    leftmost = _COMBINATOR.split(part)[0]
+    if ':' in re.sub(r':not\([^()]*\)', '', leftmost): return None
+    found = _ID_PREFIX.match(leftmost)
+    if found: return ("id_prefix", found.group(1))
+    return _compound_key(_NESTED.sub('', leftmost))
+
+
+# --- VÙNG CẦN PARSE: chỉ dựng cây cho các thẻ chứa dữ liệu, bỏ header/menu/footer/script ---
+class RegionFilter(ElementFilter):
+    """Bộ lọc parse_only cho BeautifulSoup: giữ nguyên cây con của thẻ ngoài cùng khớp 1 trong các khóa,
+    bỏ qua mọi thứ khác (bs4 chỉ hỏi bộ lọc khi chưa nằm trong thẻ nào đã giữ lại)."""
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self.names = {v for k, v in self.keys if k == "name"}
+        self.classes = {v for k, v in self.keys if k == "class"}
+        self.ids = {v for k, v in self.keys if k == "id"}
+        self.id_prefixes = tuple(v for k, v in self.keys if k == "id_prefix")
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        if name in self.names: return True
+        attrs = attrs or {}
+        tag_id = attrs.get('id')
+        if tag_id and (tag_id in self.ids or tag_id.startswith(self.id_prefixes)): return True
+        classes = attrs.get('class') or ()
+        if isinstance(classes, str): classes = classes.split()
+        return any(c in self.classes for c in classes)
+
+    def allow_string_creation(self, string):
+        return False
+
+
+# --- KẾ HOẠCH SELECTOR: compile 1 lần cho mỗi site, lấy mọi trường của trang trong 1 lượt duyệt cây ---
+class SelectorPlan:
+    """page: {tên trường: CSS} tìm trên cả trang (gom trong 1 lượt scan());
+    item: {tên: CSS} tìm bên trong 1 thẻ con (select()/select_one())."""
+
+    def __init__(self, page, item=None):
+        self.page = dict(page)
+        self.item = dict(item or {})
+        self._compiled = {name: soupsieve.compile(css) for name, css in {**self.page, **self.item}.items()}
+        # Chỉ số khóa -> các (trường, khóa tổ tiên) cần thử; trường không có khóa thì thử với mọi thẻ
+        self._by_key, self._always = {}, []
+        for name, css in self.page.items():
+            keys = [_selector_keys(part) for part in css.split(',')]
+            if any(key is None for key, _ in keys):
+                self._always.append((name, None))
+                continue
+            for key, ancestor in dict.fromkeys(keys):
+                self._by_key.setdefault(key, []).append((name, ancestor))
+
+    def scan(self, soup):
+        # {tên trường: [thẻ khớp theo thứ tự trong trang]} - giống hệt soup.select(css) của từng trường
+        found = {name: [] for name in self.page}
+        if not isinstance(soup, Tag):
+            # Backend selectolax: Lexbor đã đủ nhanh, chỉ cần gọi select
+            for name, css in self.page.items():
+                found[name] = soup.select(css)
+            return found
+        by_key, always, compiled = self._by_key, self._always, self._compiled
+        for tag in soup.descendants:
+            if not isinstance(tag, Tag): continue
+            candidates = by_key.get(("name", tag.name), [])
+            classes = tag.get('class')
+            if classes:
+                for c in classes:
+                    if ("class", c) in by_key: candidates = candidates + by_key[("class", c)]
+            tag_id = tag.get('id')
+            if tag_id and ("id", tag_id) in by_key: candidates = candidates + by_key[("id", tag_id)]
+            if always: candidates = candidates + always
+            if not candidates: continue
+            tried = set()
+            for name, ancestor in candidates:
+                if name in tried: continue
+                # Lọc rẻ trước: selector có phần tổ tiên thì thẻ phải nằm trong 1 thẻ có khóa đó
+                if ancestor and not any(_has_key(parent, ancestor) for parent in tag.parents): continue
+                tried.add(name)
+                if compiled[name].match(tag): found[name].append(tag)
+        return found
+
+    def region(self):
+        # Vùng tối thiểu để mọi selector trang vẫn cho kết quả như trên cả trang: thẻ khớp phần đầu của
+        # từng selector (cây con giữ nguyên nên phần sau vẫn khớp). None = không rút ra được, parse cả trang
+        keys = [_leftmost_key(part) for css in self.page.values() for part in css.split(',')]
+        if None in keys: return None
+        return RegionFilter(dict.fromkeys(keys))
+
+    def select(self, tag, name):
+        if isinstance(tag, Tag): return self._compiled[name].select(tag)
+        return tag.select(self.item.get(name) or self.page[name])
+
+    def select_one(self, tag, name):
+        if isinstance(tag, Tag): return self._compiled[name].select_one(tag)
+        return tag.select_one(self.item.get(name) or self.page[name])
+
+
+def first(found, name):
+    # Thẻ đầu tiên của 1 trường trong kết quả scan(), None nếu không có
+    tags = found[name]
+    return tags[0] if tags else None
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from requests.utils import get_encoding_from_headers
+from connections import StatsAdapter
+
+
+# --- CACHE HTTP TRÊN Ổ ĐĨA (ETag / Last-Modified) ---
+# Lưu body + validator của từng URL. Lần sau gửi If-None-Match / If-Modified-Since,
+# nếu server trả 304 thì dùng lại bản local -> chỉ tốn 1 round-trip kiểm tra.
+class HttpCache:
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.body_dir = os.path.join(cache_dir, "bodies")
+        self.max_bytes = max_bytes
+        os.makedirs(self.body_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS entries (
+            url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, headers TEXT,
+            size INTEGER, last_access REAL)""")
+        self._db.commit()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        with self._lock:
+            self._evict()
+
+    def _body_path(self, url):
+        return os.path.join(self.body_dir, hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+    def lookup(self, url):
+        with self._lock:
+            row = self._db.execute("SELECT etag, last_modified, headers FROM entries WHERE url = ?", (url,)).fetchone()
+        if not row: return None
+        return {"etag": row[0], "last_modified": row[1], "headers": json.loads(row[2])}
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry["etag"]: headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]: headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read_body(self, url):
+        try:
+            with open(self._body_path(url), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+            self.stats["hits"] += 1
+        return body
+
+    def refresh(self, url, headers):
+        # 304 có thể mang validator mới -> cập nhật lại
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not (etag or last_modified): return
+        with self._lock:
+            self._db.execute("""UPDATE entries SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                                WHERE url = ?""", (etag, last_modified, url))
+            self._db.commit()
+
+    def store(self, url, headers, body):
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        with self._lock:
+            self.stats["misses"] += 1
+        if not (etag or last_modified): return
+        # Ghi file tạm rồi rename để không bao giờ đọc phải body ghi dở
+        path = self._body_path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        kept_headers = {k: v for k, v in headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                             (url, etag, last_modified, json.dumps(kept_headers), len(body), time.time()))
+            self._db.commit()
+            self.stats["stored"] += 1
+            self._evict()
+
+    def _evict(self):
+        # Xóa các URL lâu không dùng nhất (LRU) cho tới khi dưới giới hạn dung lượng
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes: return
+        for url, size in self._db.execute("SELECT url, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes: break
+            try:
+                os.remove(self._body_path(url))
+            except OSError:
+                pass
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            total -= size
+            self.stats["evicted"] += 1
+        self._db.commit()
+
+
+# --- ADAPTER CHO requests.Session ---
+class CachingAdapter(StatsAdapter):
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != "GET" or stream:
+            return super().send(request, stream=stream, **kwargs)
+
+        entry = self.cache.lookup(request.url)
+        request.headers.update(self.cache.conditional_headers(entry))
+        response = super().send(request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and entry:
+            body = self.cache.read_body(request.url)
+            if body is not None:
+                self.cache.refresh(request.url, response.headers)
+                return self._from_cache(response, entry, body)
+            # Mất file body -> tải lại đầy đủ
+            for key in ("If-None-Match", "If-Modified-Since"):
+                request.headers.pop(key, None)
+            response = super().send(request, stream=stream, **kwargs)
+
+        if response.status_code == 200:
+            self.cache.store(request.url, response.headers, response.content)
+        return response
+
+    @staticmethod
+    def _from_cache(response, entry, body):
+        for key, value in entry["headers"].items():
+            response.headers.setdefault(key, value)
+        response.status_code = 200
+        response._content = body
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+
+def mount_cache(session, cache, **adapter_kwargs):
+    adapter = CachingAdapter(cache, **adapter_kwargs)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return adapter
@@ -0,0 +1,288 @@
+"""Tải ảnh sản phẩm về máy (bản sao media): lọc trùng theo URL chuẩn hóa + hash nội dung, tải song song
+bằng asyncio (aiohttp), lưu file theo hash (content-addressed), chạy lại thì bỏ qua ảnh đã có.
+
+Dùng trong scraper: BaseScraper(media_dir="media") - mỗi bản ghi được thêm trường "Tệp Ảnh".
+Hoặc chạy riêng cho file đã cào:
+    python images.py media data_gach_op_lat.jsonl -o data_gach_op_lat_media.jsonl
+"""
+import os
+import re
+import time
+import atexit
+import asyncio
+import sqlite3
+import hashlib
+import argparse
+import threading
+import concurrent.futures
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from ratelimit import RateLimiter, FailureReport, RETRY_STATUSES, parse_retry_after, retry_delay
+
+IMAGES_KEY = "Danh Sách Ảnh"
+COVER_KEY = "Ảnh Đại Diện"
+MEDIA_KEY = "Tệp Ảnh"
+
+# Hậu tố cỡ có tên của Haravan/Shopify (_small, _master...): chắc chắn cùng 1 ảnh, chỉ khác cỡ
+_SIZE_SUFFIX = re.compile(r'_(?:pico|icon|thumb|small|compact|medium|large|grande|master|original)(?=\.\w+$)', re.I)
+# Hậu tố số (WordPress -300x300, Shopify _1024x1024) trùng dạng với kích thước sản phẩm (gach-60x60.jpg, CL_30x60.jpg)
+# -> chỉ coi là bản thu nhỏ khi ảnh gốc (không hậu tố) cũng có trong cùng bản ghi
+_DIMENSION_SUFFIX = re.compile(r'(?:_\d+x\d*|-\d+x\d+)(?=\.\w+$)', re.I)
+# Tham số query chỉ đổi cỡ / chống cache, không đổi ảnh
+_RESIZE_PARAMS = {"v", "ver", "version", "w", "h", "width", "height", "resize", "fit", "quality", "q", "strip"}
+_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif",
+               "image/svg+xml": ".svg", "image/avif": ".avif"}
+
+
+def absolute_image_url(url):
+    return 'https:' + url if url.startswith('//') else url
+
+
+def normalize_image_url(url):
+    # Khóa lọc trùng: bỏ scheme, fragment, hậu tố kích thước và tham số đổi cỡ; host viết thường
+    parts = urlsplit(absolute_image_url(url.strip()))
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in _RESIZE_PARAMS)
+    key = parts.netloc.lower() + _SIZE_SUFFIX.sub('', parts.path)
+    return key + ("?" + urlencode(query) if query else "")
+
+
+def _dimension_original(url):
+    # URL ảnh gốc nếu url có hậu tố số kích thước, None nếu không có
+    parts = urlsplit(absolute_image_url(url.strip()))
+    path = _DIMENSION_SUFFIX.sub('', parts.path)
+    return urlunsplit(parts._replace(path=path)) if path != parts.path else None
+
+
+def _url_rank(url):
+    # 0 = ảnh gốc (không hậu tố hoặc _master/_original), 1 = bản thu nhỏ -> ưu tiên tải ảnh gốc
+    found = _SIZE_SUFFIX.search(urlsplit(url).path)
+    return 0 if not found or found.group(0).lower() in ("_master", "_original") else 1
+
+
+def _extension(url, content_type):
+    ext = _EXTENSIONS.get((content_type or "").split(';')[0].strip().lower())
+    if ext: return ext
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    return ext if re.fullmatch(r'\.\w{2,5}', ext) else ".bin"
+
+
+# --- MANIFEST: URL chuẩn hóa -> file đã tải (để chạy lại không tải lại) ---
+# Bảng images_v2: khóa không còn bỏ hậu tố số kích thước (bảng cũ có thể gộp nhầm gach-60x60 / gach-80x80)
+class MediaManifest:
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS images_v2 (
+            key TEXT PRIMARY KEY, url TEXT, rank INTEGER, sha256 TEXT, size INTEGER, path TEXT, updated_at REAL)""")
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT url, rank, sha256, size, path FROM images_v2 WHERE key = ?", (key,)).fetchone()
+        return dict(zip(("url", "rank", "sha256", "size", "path"), row)) if row else None
+
+    def put(self, key, url, rank, sha256, size, path):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO images_v2 VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (key, url, rank, sha256, size, path, time.time()))
+            self._db.commit()
+
+
+# --- BẢN SAO MEDIA: chạy 1 event loop riêng ở luồng nền, các luồng tải chi tiết gửi bản ghi vào ---
+class MediaMirror:
+    def __init__(self, media_dir, max_concurrency=16, per_host_limit=None, rate_limit=None, max_retries=3,
+                 headers=None, timeout=30, profiler=None, site=None):
+        # media_dir: thư mục lưu ảnh (media_dir/ab/abcdef....jpg) + manifest.sqlite
+        # max_concurrency / per_host_limit: số ảnh tải song song tối đa (toàn cục / mỗi host)
+        self.media_dir = media_dir
+        os.makedirs(media_dir, exist_ok=True)
+        self.manifest = MediaManifest(os.path.join(media_dir, "manifest.sqlite"))
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.headers = headers
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_limit, per_host_limit or max_concurrency)
+        self.failures = FailureReport()
+        self.profiler = profiler
+        self.site = site
+        self._loop = None
+        self._http = None
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        # Gọi đầu mỗi lần chạy; ảnh lỗi chỉ thử 1 lần mỗi lần chạy (không thử lại cho từng bản ghi chứa nó)
+        self.stats = {"downloaded": 0, "skipped": 0, "duplicate_content": 0, "failed": 0, "bytes": 0}
+        self._failed = {}
+        self.rate_limiter.reset_stats()
+
+    # --- Event loop nền ---
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop: return self._loop
+            try:
+                import aiohttp  # noqa: F401
+            except ImportError:
+                raise ImportError("Tải ảnh (media_dir) cần cài thêm aiohttp: pip install aiohttp")
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True, name="media-mirror").start()
+            self._loop = loop
+            atexit.register(self.close)
+            return loop
+
+    def _session(self):
+        import aiohttp
+        if self._http is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._http = aiohttp.ClientSession(headers=self.headers, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._http
+
+    def close(self):
+        if not self._loop: return
+        if self._http:
+            asyncio.run_coroutine_threadsafe(self._http.close(), self._loop).result()
+            self._http = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    # --- API cho scraper ---
+    def mirror(self, record):
+        # Gọi từ luồng thường (ThreadPool): chờ tải xong ảnh của bản ghi, trả về bản ghi đã thêm "Tệp Ảnh"
+        if not record or not record.get(IMAGES_KEY) and not record.get(COVER_KEY): return record
+        return asyncio.run_coroutine_threadsafe(self._mirror_record(record), self._ensure_loop()).result()
+
+    async def mirror_async(self, record):
+        # Gọi từ event loop khác (fetch_mode="async"): không chặn loop đó
+        if not record or not record.get(IMAGES_KEY) and not record.get(COVER_KEY): return record
+        future = asyncio.run_coroutine_threadsafe(self._mirror_record(record), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def mirror_many(self, records, window=64):
+        # Nhiều bản ghi cùng lúc (tối đa window bản ghi đang tải), trả về theo đúng thứ tự đầu vào
+        loop, pending = self._ensure_loop(), []
+        for record in records:
+            if record and (record.get(IMAGES_KEY) or record.get(COVER_KEY)):
+                pending.append(asyncio.run_coroutine_threadsafe(self._mirror_record(record), loop))
+            else:
+                pending.append(record)
+            if len(pending) >= window:
+                first = pending.pop(0)
+                yield first.result() if isinstance(first, concurrent.futures.Future) else first
+        for item in pending:
+            yield item.result() if isinstance(item, concurrent.futures.Future) else item
+
+    # --- Chạy trên event loop nền ---
+    async def _mirror_record(self, record):
+        urls = [u for u in list(record.get(IMAGES_KEY) or []) + [record.get(COVER_KEY)]
+                if isinstance(u, str) and u.startswith(('http', '//'))]
+        # Lọc trùng trong bản ghi theo URL chuẩn hóa, giữ URL ảnh gốc nếu có nhiều cỡ
+        best = {}
+        for url in urls:
+            key = normalize_image_url(url)
+            if key not in best or _url_rank(url) < _url_rank(best[key]): best[key] = url
+        for key, url in list(best.items()):
+            original = _dimension_original(url)
+            if original and normalize_image_url(original) in best: del best[key]
+        entries = await asyncio.gather(*(self._image(key, url) for key, url in best.items()))
+        record[MEDIA_KEY] = list(entries)
+        return record
+
+    async def _image(self, key, url):
+        # Nhiều bản ghi cùng chờ 1 ảnh đang tải -> chỉ tải 1 lần
+        if key in self._failed: return self._failed[key]
+        if key in self._inflight: return await asyncio.shield(self._inflight[key])
+        task = self._inflight[key] = asyncio.ensure_future(self._download(key, url))
+        try:
+            return await task
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _download(self, key, url):
+        saved = self.manifest.get(key)
+        if saved and saved["rank"] <= _url_rank(url) and os.path.exists(os.path.join(self.media_dir, saved["path"])):
+            self.stats["skipped"] += 1
+            return {"URL": saved["url"], "SHA256": saved["sha256"], "Bytes": saved["size"], "Tệp": saved["path"]}
+
+        url = absolute_image_url(url)
+        http = self._session()
+        limiter = self.rate_limiter.host(url)
+        for attempt in range(self.max_retries + 1):
+            status, retry_after, content, content_type = None, None, None, None
+            started = await limiter.acquire_async()
+            try:
+                async with self._semaphore:
+                    start = time.perf_counter()
+                    async with http.get(url) as response:
+                        status = response.status
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        if status == 200:
+                            content = await response.read()
+                            content_type = response.headers.get("Content-Type")
+                    if self.profiler and content is not None:
+                        self.profiler.record("image_fetch", self.site, time.perf_counter() - start, len(content))
+                reason = f"HTTP {status}"
+            except Exception as e:
+                reason = type(e).__name__
+            finally:
+                limiter.release(started, status, retry_after)
+            if content is not None: return self._store(key, url, content, content_type)
+            if status is not None and status not in RETRY_STATUSES: break
+            if attempt < self.max_retries:
+                delay = retry_delay(attempt, retry_after)
+                if delay is None:
+                    reason += " (Retry-After quá dài)"
+                    break
+                await asyncio.sleep(delay)
+        self.stats["failed"] += 1
+        self.failures.add(url, reason, status, attempt + 1)
+        self._failed[key] = {"URL": url, "Lỗi": reason}
+        return self._failed[key]
+
+    def _store(self, key, url, content, content_type):
+        # Tên file = sha256 nội dung -> 2 URL khác nhau nhưng cùng ảnh chỉ lưu 1 file
+        sha = hashlib.sha256(content).hexdigest()
+        path = os.path.join(sha[:2], sha + _extension(url, content_type))
+        full_path = os.path.join(self.media_dir, path)
+        if os.path.exists(full_path):
+            self.stats["duplicate_content"] += 1
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            tmp_path = full_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, full_path)
+            self.stats["downloaded"] += 1
+            self.stats["bytes"] += len(content)
+        self.manifest.put(key, url, _url_rank(url), sha, len(content), path)
+        return {"URL": url, "SHA256": sha, "Bytes": len(content), "Tệp": path}
+
+    def summary(self):
+        s = self.stats
+        msg = (f"🖼️ Ảnh: tải mới {s['downloaded']} ({s['bytes'] / 1e6:.1f}MB) | đã có {s['skipped']} | "
+               f"trùng nội dung {s['duplicate_content']} | lỗi {s['failed']}")
+        limits = self.rate_limiter.summary()
+        return msg + "\n" + limits if limits else msg
+
+
+def main():
+    from sinks import JsonlSink, iter_records
+    parser = argparse.ArgumentParser(description="Tải ảnh của các bản ghi đã cào (JSONL) về thư mục media")
+    parser.add_argument("media_dir", help="Thư mục lưu ảnh + manifest")
+    parser.add_argument("input", help="File .jsonl / .jsonl.gz đã cào")
+    parser.add_argument("-o", "--output", required=True, help="File .jsonl ghi lại bản ghi kèm trường 'Tệp Ảnh'")
+    parser.add_argument("--concurrency", type=int, default=16, help="Số ảnh tải song song")
+    args = parser.parse_args()
+
+    mirror = MediaMirror(args.media_dir, args.concurrency)
+    with JsonlSink(args.output) as sink:
+        for record in mirror.mirror_many(iter_records(args.input)):
+            if record: sink.write(record)
+    mirror.close()
+    print(mirror.summary())
+    return 1 if mirror.stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+import re
+import json
+import time
+import sqlite3
+import inspect
+import hashlib
+import threading
+
+# Các phần thay đổi mỗi lần tải nhưng không ảnh hưởng dữ liệu sản phẩm (script, style, comment, khoảng trắng)
+_NOISE_RE = re.compile(rb"<script\b.*?</script\s*>|<style\b.*?</style\s*>|<!--.*?-->", re.S | re.I)
+_SPACE_RE = re.compile(rb"\s+")
+# Tăng khi sửa phần parse dùng chung (parsers.py, extraction.py) -> mọi bản ghi đã lưu trong index bị parse lại
+PARSER_VERSION = 1
+
+
+def content_hash(content):
+    if isinstance(content, str): content = content.encode('utf-8')
+    normalized = _SPACE_RE.sub(b" ", _NOISE_RE.sub(b"", content)).strip()
+    return hashlib.sha256(normalized).hexdigest()
+
+
+def parser_version(scraper_cls, parser=None):
+    # Dấu vân tay của cách parse 1 site: PLAN / PARSE_REGION, mã nguồn class (parse_detail + hàm phụ), backend parse.
+    # Đổi 1 trong số đó thì HTML không đổi vẫn phải parse lại, không trả bản ghi của parser cũ
+    plan = getattr(scraper_cls, "PLAN", None)
+    region = getattr(scraper_cls, "PARSE_REGION", None)
+    try:
+        source = inspect.getsource(scraper_cls)
+    except (OSError, TypeError):
+        source = None
+    parts = [PARSER_VERSION, scraper_cls.__name__, parser, plan and [plan.page, plan.item],
+             region and list(region.keys), source]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+# --- INDEX NỘI DUNG: URL -> hash HTML đã chuẩn hóa -> bản ghi parse lần trước ---
+class ContentIndex:
+    def __init__(self, path, version=None):
+        # version: parser_version() của scraper; bản ghi do parser khác tạo ra không được dùng lại
+        self.path = path
+        self.version = version
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY, hash TEXT, record TEXT, updated_at REAL, version TEXT)""")
+        # Index cũ chưa có cột version -> mọi bản ghi cũ coi như của parser khác
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(pages)")]
+        if "version" not in columns: self._db.execute("ALTER TABLE pages ADD COLUMN version TEXT")
+        self._db.commit()
+        self.begin_run()
+
+    def begin_run(self):
+        self.status = {}  # url -> "new" / "changed" / "unchanged"
+
+    def lookup(self, url, digest):
+        # Trả về bản ghi cũ nếu HTML không đổi và cùng parser, ngược lại None (và ghi nhận new/changed)
+        with self._lock:
+            row = self._db.execute("SELECT hash, record, version FROM pages WHERE url = ?", (url,)).fetchone()
+            if row and row[0] == digest:
+                # HTML không đổi nhưng parser đã đổi: vẫn tính "unchanged", chỉ parse lại
+                self.status[url] = "unchanged"
+                return json.loads(row[1]) if row[2] == self.version else None
+            self.status[url] = "changed" if row else "new"
+        return None
+
+    def update(self, url, digest, record):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                             (url, digest, json.dumps(record, ensure_ascii=False), time.time(), self.version))
+            self._db.commit()
+
+    def finish_run(self, links, complete=True):
+        # Tổng hợp báo cáo; URL có trong index nhưng không còn trong danh sách link -> "disappeared".
+        # complete=False (chỉ cào 1 phần link / chưa tìm đủ link): không xét biến mất, không xóa gì khỏi index
+        current = set(links)
+        disappeared = []
+        with self._lock:
+            if complete:
+                known = [row[0] for row in self._db.execute("SELECT url FROM pages")]
+                disappeared = sorted(url for url in known if url not in current)
+                self._db.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in disappeared])
+                self._db.commit()
+        report = {"new": [], "changed": [], "unchanged": [], "disappeared": disappeared}
+        for url in links:
+            if url in self.status: report[self.status[url]].append(url)
+        return report
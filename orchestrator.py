@@ -0,0 +1,149 @@
+"""Chạy nhiều nguồn trong OPTIONS (config.py) cùng lúc với 1 ngân sách tài nguyên chung:
+- Trình duyệt: 1 DriverPool cho mọi scraper (tổng số Chrome mở cùng lúc <= browsers)
+- HTTP: tổng số request song song <= http_budget, chia đều giữa các host (ratelimit.SharedBudget)
+- Kết quả: 1 file JSONL chung, mỗi bản ghi có thêm cột "Nguồn"
+Tổng thời gian ~ thời gian của site chậm nhất thay vì cộng dồn từng site.
+
+Ví dụ:
+    python orchestrator.py --output catalog.jsonl
+    python orchestrator.py "Sản phẩm TaiceraVN" "Sản phẩm Slabstone" --browsers 2 --http-budget 24
+    python orchestrator.py --list
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+from config import OPTIONS, option_slug, resolve_source
+from driver_pool import DriverPool
+from parsers import PARSER_BACKENDS
+from ratelimit import SharedBudget
+from sinks import JsonlSink
+from export import SOURCE_KEY
+
+
+class _SourceSink:
+    # Ghi vào sink chung, gắn tên nguồn vào từng bản ghi và đếm riêng cho nguồn đó
+    def __init__(self, sink, source):
+        self.sink = sink
+        self.source = source
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        self.sink.write({SOURCE_KEY: self.source, **record})
+        with self._lock:
+            self.count += 1
+
+
+class Orchestrator:
+    def __init__(self, browsers=3, http_budget=32, work_dir=None, scraper_kwargs=None, driver_pool=None):
+        # browsers: số Chrome tối đa cho mọi nguồn cộng lại (dùng chung cả cho duyệt danh mục song song)
+        # http_budget: số request tải chi tiết song song tối đa cho mọi nguồn cộng lại
+        # work_dir: thư mục checkpoint của từng nguồn (chạy lại sau khi bị dừng thì tiếp tục)
+        # scraper_kwargs: tham số thêm cho mọi scraper (VD: parser="lxml", cache_dir=...)
+        self.browsers = browsers
+        if driver_pool is None:
+            driver_pool = DriverPool(size=browsers, max_uses=20)
+            # Mở sẵn Chrome ở luồng nền trong lúc các nguồn còn đang tìm link bằng HTTP
+            driver_pool.warm(background=True)
+        self.driver_pool = driver_pool
+        self.budget = SharedBudget(http_budget)
+        self.work_dir = work_dir or os.path.join(tempfile.gettempdir(), "interncrawl")
+        self.scraper_kwargs = scraper_kwargs or {}
+        self._print_lock = threading.Lock()
+
+    def _log(self, source, msg):
+        with self._print_lock:
+            print(f"[{option_slug(source)}] {msg}")
+
+    def _run_source(self, source, sink, report):
+        config = OPTIONS[source]
+        start = time.perf_counter()
+        result = report[source] = {"links": 0, "records": 0, "seconds": 0.0, "error": None}
+        try:
+            kwargs = dict(driver_pool=self.driver_pool, category_workers=self.browsers, http_budget=self.budget,
+                          max_concurrency=self.budget.total,
+                          checkpoint_path=os.path.join(self.work_dir, f"checkpoint_{option_slug(source)}.sqlite"))
+            kwargs.update(self.scraper_kwargs)
+            bot = config["scraper_class"](**kwargs)
+            source_sink = _SourceSink(sink, source)
+            run = bot.resume if any(bot.checkpoint.stats().values()) else bot.scrape_streaming
+            links, _ = run(config["url"], config["item_selector"], config["link_selector"],
+                           progress_callback=lambda msg: self._log(source, msg), sink=source_sink)
+            result["links"], result["records"] = len(links), source_sink.count
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            self._log(source, f"❌ Lỗi: {result['error']}")
+        result["seconds"] = round(time.perf_counter() - start, 1)
+        self._log(source, f"✅ Xong: {result['records']}/{result['links']} sản phẩm trong {result['seconds']}s")
+
+    def run(self, sources=None, output_path="catalog.jsonl"):
+        """Chạy các nguồn (tên trong OPTIONS, None = tất cả) song song, ghi chung vào output_path.
+        Trả về {nguồn: {"links", "records", "seconds", "error"}}; 1 nguồn lỗi không làm dừng nguồn khác."""
+        sources = list(sources or OPTIONS)
+        unknown = [s for s in sources if s not in OPTIONS]
+        if unknown: raise ValueError(f"Không có nguồn: {unknown} (xem --list)")
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.budget.reset_stats()
+
+        report = {}
+        with JsonlSink(output_path) as sink:
+            threads = [threading.Thread(target=self._run_source, args=(source, sink, report), name=option_slug(source))
+                       for source in sources]
+            for t in threads: t.start()
+            for t in threads: t.join()
+        return report
+
+    def close(self):
+        self.driver_pool.close()
+
+
+def resolve_sources(names):
+    # Cho phép gọi bằng tên đầy đủ, slug ("gạch_ốp_lát") hoặc số thứ tự trong --list
+    sources = []
+    for name in names:
+        source = resolve_source(name)
+        if not source: raise ValueError(f"Không có nguồn: {name} (xem --list)")
+        sources.append(source)
+    return list(dict.fromkeys(sources))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cào nhiều nguồn cùng lúc với ngân sách trình duyệt/HTTP chung")
+    parser.add_argument("sources", nargs="*", help="Tên nguồn, slug hoặc số thứ tự (mặc định: tất cả)")
+    parser.add_argument("--output", default="catalog.jsonl", help="File JSONL chung (.jsonl.gz để nén)")
+    parser.add_argument("--browsers", type=int, default=3, help="Số Chrome tối đa cho mọi nguồn")
+    parser.add_argument("--http-budget", type=int, default=32, help="Số request song song tối đa cho mọi nguồn")
+    parser.add_argument("--work-dir", default=None, help="Thư mục checkpoint (mặc định: thư mục tạm)")
+    parser.add_argument("--parser", default="html.parser", choices=PARSER_BACKENDS, help="Backend parse HTML")
+    parser.add_argument("--store", default=None, help="Tạo thêm kho tra cứu từ file kết quả (product_store.py)")
+    parser.add_argument("--archive-dir", default=None, help="Kho HTML thô chung cho mọi nguồn (xem archive.py)")
+    parser.add_argument("--list", action="store_true", help="In danh sách nguồn rồi thoát")
+    args = parser.parse_args()
+
+    if args.list:
+        for i, name in enumerate(OPTIONS, 1):
+            print(f"{i}. {name}  ({option_slug(name)})")
+        return 0
+
+    orchestrator = Orchestrator(args.browsers, args.http_budget, args.work_dir,
+                                {"parser": args.parser, "archive_dir": args.archive_dir})
+    start = time.perf_counter()
+    try:
+        report = orchestrator.run(resolve_sources(args.sources), args.output)
+    finally:
+        orchestrator.close()
+    total = sum(r["records"] for r in report.values())
+    if args.store:
+        from product_store import build_store
+        build_store([(None, args.output)], args.store)
+    print(f"📦 {total} sản phẩm từ {len(report)} nguồn -> {args.output} ({time.perf_counter() - start:.1f}s)")
+    for source, r in report.items():
+        print(f"   -> {source}: {r['records']}/{r['links']} trong {r['seconds']}s" + (f" ❌ {r['error']}" if r['error'] else ""))
+    print(orchestrator.budget.summary())
+    return 1 if any(r["error"] for r in report.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+# Các backend parse HTML hỗ trợ:
+#   "html.parser" : parser thuần Python (mặc định, chậm nhất)
+#   "lxml"        : BeautifulSoup + lxml (cần cài lxml)
+#   "selectolax"  : engine CSS Lexbor (cần cài selectolax), bọc lại theo API kiểu BeautifulSoup
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+
+# bs4 chỉ được import khi parse thật (make_soup) -> cli / orchestrator đọc PARSER_BACKENDS để kiểm tra tham số
+# mà không tốn thời gian nạp bs4
+
+# bs4 không tính text nằm trong các thẻ này vào .text của thẻ cha
+_SKIP_TEXT_PARENTS = ("script", "style", "template")
+
+
+def make_soup(html, backend="html.parser", region=None):
+    # region: bộ lọc parse_only (chỉ dựng cây cho vùng cần đọc); selectolax dựng cả cây bằng C nên bỏ qua
+    if backend == "selectolax":
+        return SelectolaxSoup(html)
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Parser không hỗ trợ: {backend} (chọn 1 trong {PARSER_BACKENDS})")
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, backend, parse_only=region)
+
+
+def _css_for(name=None, attrs=None, class_=None, **kwargs):
+    # Đổi tham số kiểu find()/find_all() của bs4 sang CSS selector
+    names = [name] if isinstance(name, str) else list(name or ['*'])
+    conditions = ""
+    for key, value in {**(attrs or {}), **kwargs}.items():
+        if value is True:
+            conditions += f"[{key}]"
+        else:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+            conditions += f'[{key}="{value}"]'
+    if class_:
+        conditions += "".join(f".{c}" for c in class_.split())
+    return ", ".join(f"{n}{conditions}" for n in names)
+
+
+class SelectolaxTag:
+    """Bọc 1 node selectolax với các hàm mà parse_detail/get_links đang dùng:
+    select, select_one, find, find_all, find_next_sibling, find_parent, get, text, get_text, name."""
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    def __eq__(self, other):
+        return isinstance(other, SelectolaxTag) and self.node.mem_id == other.node.mem_id
+
+    def __hash__(self):
+        return self.node.mem_id
+
+    def __repr__(self):
+        return self.node.html or ""
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    @property
+    def attrs(self):
+        return {k: self.get(k) for k in self.node.attributes}
+
+    def get(self, key, default=None):
+        if key not in self.node.attributes:
+            return default
+        value = self.node.attributes[key]
+        if value is None: value = ""
+        # bs4 trả class dạng list
+        if key == "class": return value.split()
+        return value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None: raise KeyError(key)
+        return value
+
+    # --- Truy vấn CSS (bs4 chỉ tìm trong con cháu, không tính chính node) ---
+    def _css(self, selector):
+        return [n for n in self.node.css(selector) if n.mem_id != self.node.mem_id]
+
+    def select(self, selector):
+        return [SelectolaxTag(n) for n in self._css(selector)]
+
+    def select_one(self, selector):
+        first = self.node.css_first(selector)
+        if first is not None and first.mem_id == self.node.mem_id:
+            found = self._css(selector)
+            first = found[0] if found else None
+        return SelectolaxTag(first) if first is not None else None
+
+    def find_all(self, name=None, attrs=None, class_=None, **kwargs):
+        return self.select(_css_for(name, attrs, class_, **kwargs))
+
+    def find(self, name=None, attrs=None, class_=None, **kwargs):
+        return self.select_one(_css_for(name, attrs, class_, **kwargs))
+
+    def find_next_sibling(self, name=None):
+        names = [name] if isinstance(name, str) else name
+        sibling = self.node.next
+        while sibling is not None:
+            if not sibling.tag.startswith('-') and (not names or sibling.tag in names):
+                return SelectolaxTag(sibling)
+            sibling = sibling.next
+        return None
+
+    def find_parent(self, name=None, class_=None):
+        parent = self.node.parent
+        while parent is not None:
+            classes = (parent.attributes.get('class') or '').split()
+            if (not name or parent.tag == name) and (not class_ or class_ in classes):
+                return SelectolaxTag(parent)
+            parent = parent.parent
+        return None
+
+    # --- Text ---
+    def _strings(self):
+        for n in self.node.traverse(include_text=True):
+            if n.tag == '-text' and n.parent is not None and n.parent.tag not in _SKIP_TEXT_PARENTS:
+                yield n.text_content
+
+    def get_text(self, separator="", strip=False):
+        strings = self._strings()
+        if strip: strings = (s.strip() for s in strings if s.strip())
+        return separator.join(strings)
+
+    @property
+    def text(self):
+        return self.get_text()
+
+
+class SelectolaxSoup(SelectolaxTag):
+    __slots__ = ("tree",)
+
+    def __init__(self, html):
+        from selectolax.lexbor import LexborHTMLParser
+        self.tree = LexborHTMLParser(html)
+        super().__init__(self.tree.root)
+
+    def _css(self, selector):
+        # Document: giống BeautifulSoup object, được phép khớp cả thẻ <html>
+        return self.node.css(selector)
+
+    def select_one(self, selector):
+        first = self.node.css_first(selector)
+        return SelectolaxTag(first) if first is not None else None
+
+    @property
+    def name(self):
+        return "[document]"
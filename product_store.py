@@ -0,0 +1,243 @@
+"""Kho sản phẩm tra cứu nhanh: bản ghi nằm trong 1 file JSONL được mmap, kèm index SQLite theo mã sản phẩm,
+URL, bộ sưu tập, thương hiệu và nguồn. Tra 1 mã chỉ đọc đúng dòng của bản ghi đó, không phải json.load cả file.
+
+Ví dụ:
+    python product_store.py build store data_brick_viglacera.json data_slabstone.jsonl.gz
+    python product_store.py get store CL-BS3604
+    python product_store.py find store --collection "Bộ sưu tập Cửu Long" --limit 5
+    python product_store.py stats store
+
+Trong code:
+    with ProductStore("store") as store:
+        record = store.get("CL-BS3604")
+        for record in store.find(brand="Viglacera", collection="Bộ sưu tập Cửu Long"): ...
+"""
+import os
+import glob
+import json
+import mmap
+import time
+import sqlite3
+import argparse
+import threading
+from export import SOURCE_KEY, VARIANTS_KEY, read_source, source_name
+
+RECORDS_PREFIX = "records-"
+INDEX_FILE = "index.sqlite"
+
+# Trường được index -> các tên cột tương ứng trong bản ghi của từng scraper (và file JSON cũ dạng Ma_SP).
+# So khớp không phân biệt hoa thường: Amy / Taicera lấy tên cột từ nhãn trên trang ("Thương hiệu", "Bộ sưu tập")
+INDEXED_FIELDS = {
+    "code": ("Mã Sản Phẩm", "Ma_SP", "Mã"),
+    "url": ("URL",),
+    "collection": ("Bộ Sưu Tập", "Bo_Suu_Tap", "Dòng Sản Phẩm"),
+    "brand": ("Thương Hiệu", "Thuong_Hieu", "Nhãn Hiệu"),
+    "source": (SOURCE_KEY,),
+}
+# Tên cột đã chuẩn hóa -> trường được index
+_FIELD_BY_NAME = {" ".join(name.split()).casefold(): field for field, names in INDEXED_FIELDS.items() for name in names}
+# Giá trị giữ chỗ, không phải mã / tên thật
+_PLACEHOLDERS = {"", "n/a", "tiêu chuẩn"}
+
+
+def normalize_key(field, value):
+    # URL giữ nguyên (phân biệt hoa thường), còn lại bỏ khoảng trắng thừa + không phân biệt hoa thường
+    value = " ".join(str(value).split())
+    return value if field == "url" else value.casefold()
+
+
+def index_keys(record):
+    # [(trường, giá trị đã chuẩn hóa)] của 1 bản ghi; mã của từng biến thể (Slabstone) cũng trỏ về bản ghi cha
+    keys = set()
+    parts = [record] + [v for v in record.get(VARIANTS_KEY) or () if isinstance(v, dict)]
+    for part in parts:
+        for name, value in part.items():
+            field = _FIELD_BY_NAME.get(" ".join(str(name).split()).casefold())
+            if field is None or value is None or isinstance(value, (dict, list)): continue
+            value = normalize_key(field, value)
+            if value.casefold() not in _PLACEHOLDERS: keys.add((field, value))
+    return keys
+
+
+# --- GHI KHO: mỗi lần build ghi 1 file bản ghi mới, index (thay thế nguyên tử) trỏ tới file đó ---
+# Người đang đọc vẫn giữ bản cũ (file đã mở / mmap) tới khi mở lại.
+def build_store(sources, store_dir):
+    """sources: list (tên nguồn, file .json / .jsonl / .jsonl.gz hoặc list bản ghi); tên nguồn None = giữ
+    nguyên bản ghi, có tên thì thêm cột "Nguồn" (nếu bản ghi chưa có). Trả về số bản ghi đã ghi."""
+    os.makedirs(store_dir, exist_ok=True)
+    records_name = f"{RECORDS_PREFIX}{time.time_ns()}.jsonl"
+    index_path = os.path.join(store_dir, INDEX_FILE)
+    if os.path.exists(index_path + ".tmp"): os.remove(index_path + ".tmp")
+
+    db = sqlite3.connect(index_path + ".tmp")
+    db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+    db.execute("INSERT INTO meta VALUES ('records', ?)", (records_name,))
+    db.execute("CREATE TABLE records (id INTEGER PRIMARY KEY, offset INTEGER, length INTEGER)")
+    db.execute("CREATE TABLE keys (field TEXT, value TEXT, id INTEGER)")
+    count, offset, rows, keys = 0, 0, [], []
+    with open(os.path.join(store_dir, records_name), 'wb') as f:
+        for name, source in sources:
+            for record in read_source(source):
+                if not record: continue
+                if name and SOURCE_KEY not in record: record = {SOURCE_KEY: name, **record}
+                line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+                f.write(line)
+                rows.append((count, offset, len(line) - 1))
+                keys.extend((field, value, count) for field, value in index_keys(record))
+                offset += len(line)
+                count += 1
+                if len(rows) >= 5000:
+                    db.executemany("INSERT INTO records VALUES (?, ?, ?)", rows)
+                    db.executemany("INSERT INTO keys VALUES (?, ?, ?)", keys)
+                    rows, keys = [], []
+    db.executemany("INSERT INTO records VALUES (?, ?, ?)", rows)
+    db.executemany("INSERT INTO keys VALUES (?, ?, ?)", keys)
+    # Tạo index sau khi nạp xong: nhanh hơn cập nhật B-tree theo từng dòng
+    db.execute("CREATE INDEX keys_lookup ON keys (field, value, id)")
+    db.commit()
+    db.close()
+    os.replace(index_path + ".tmp", index_path)
+    # Xóa file bản ghi của các lần build trước (Windows: file còn đang mở thì để lần sau xóa)
+    for path in glob.glob(os.path.join(store_dir, RECORDS_PREFIX + "*.jsonl")):
+        if os.path.basename(path) == records_name: continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return count
+
+
+# --- ĐỌC KHO ---
+class ProductStore:
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f"file:{os.path.join(store_dir, INDEX_FILE)}?mode=ro", uri=True,
+                                   check_same_thread=False)
+        records_name = self._db.execute("SELECT value FROM meta WHERE key = 'records'").fetchone()[0]
+        self._file = open(os.path.join(store_dir, records_name), 'rb')
+        # File rỗng không mmap được (kho chưa có bản ghi nào)
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def _load(self, offset, length):
+        return json.loads(self._data[offset:offset + length])
+
+    def _query(self, filters, limit=None):
+        # Giao các điều kiện trên index -> [(offset, length)] theo thứ tự ghi
+        unknown = [field for field in filters if field not in INDEXED_FIELDS]
+        if unknown: raise ValueError(f"Không có index cho trường: {unknown} (có: {list(INDEXED_FIELDS)})")
+        parts, params = [], []
+        for field, value in filters.items():
+            parts.append("SELECT id FROM keys WHERE field = ? AND value = ?")
+            params += [field, normalize_key(field, value)]
+        query = f"SELECT offset, length FROM records WHERE id IN ({' INTERSECT '.join(parts)}) ORDER BY id"
+        if limit: query += f" LIMIT {int(limit)}"
+        with self._lock:
+            return self._db.execute(query, params).fetchall()
+
+    def get(self, code):
+        """Bản ghi đầu tiên có mã sản phẩm (hoặc mã biến thể) = code, None nếu không có."""
+        found = self._query({"code": code}, limit=1)
+        return self._load(*found[0]) if found else None
+
+    def by_url(self, url):
+        found = self._query({"url": url}, limit=1)
+        return self._load(*found[0]) if found else None
+
+    def find(self, where=None, limit=None, **filters):
+        """Các bản ghi khớp mọi điều kiện (code=, url=, collection=, brand=, source=) - tra trên index rồi chỉ
+        đọc đúng các dòng đó. where: hàm lọc thêm trên bản ghi. Không có điều kiện index nào thì duyệt cả file."""
+        filters = {k: v for k, v in filters.items() if v is not None}
+        if filters:
+            # Có where thì không biết trước bao nhiêu dòng qua được -> không giới hạn ở SQL
+            rows = self._query(filters, None if where else limit)
+            records = (self._load(offset, length) for offset, length in rows)
+        else:
+            records = self.scan()
+        count = 0
+        for record in records:
+            if where and not where(record): continue
+            yield record
+            count += 1
+            if limit and count >= limit: return
+
+    def scan(self):
+        # Duyệt tuần tự mọi bản ghi (đọc thẳng từ vùng mmap, không nạp cả file)
+        start = 0
+        while start < len(self._data):
+            end = self._data.find(b'\n', start)
+            if end < 0: end = len(self._data)
+            yield json.loads(self._data[start:end])
+            start = end + 1
+
+    def values(self, field):
+        # {giá trị đã chuẩn hóa: số bản ghi} của 1 trường được index (VD: danh sách bộ sưu tập)
+        if field not in INDEXED_FIELDS: raise ValueError(f"Không có index cho trường: {field}")
+        with self._lock:
+            return dict(self._db.execute("""SELECT value, COUNT(*) FROM keys WHERE field = ?
+                                            GROUP BY value ORDER BY COUNT(*) DESC""", (field,)))
+
+    def close(self):
+        with self._lock:
+            if isinstance(self._data, mmap.mmap): self._data.close()
+            self._file.close()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kho sản phẩm mmap + index để tra cứu nhanh theo mã / URL / BST")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Tạo (lại) kho từ các file đã cào")
+    p_build.add_argument("store_dir", help="Thư mục kho")
+    p_build.add_argument("inputs", nargs="+", help="Các file .json / .jsonl / .jsonl.gz")
+    p_build.add_argument("--no-source", action="store_true", help="Không thêm cột 'Nguồn' theo tên file")
+    p_get = sub.add_parser("get", help="Tra 1 mã sản phẩm")
+    p_get.add_argument("store_dir", help="Thư mục kho")
+    p_get.add_argument("code", help="Mã sản phẩm (hoặc mã biến thể)")
+    p_find = sub.add_parser("find", help="Lọc theo các trường được index, in JSONL")
+    p_find.add_argument("store_dir", help="Thư mục kho")
+    for field in INDEXED_FIELDS:
+        p_find.add_argument(f"--{field}", default=None, help=f"Lọc theo {field}")
+    p_find.add_argument("--limit", type=int, default=None, help="Số bản ghi tối đa")
+    p_stats = sub.add_parser("stats", help="Thống kê kho")
+    p_stats.add_argument("store_dir", help="Thư mục kho")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        sources = [(None if args.no_source else source_name(p), p) for p in args.inputs]
+        print(f"✅ Đã ghi {build_store(sources, args.store_dir)} bản ghi vào {args.store_dir}")
+        return 0
+
+    with ProductStore(args.store_dir) as store:
+        if args.command == "get":
+            record = store.get(args.code)
+            if record is None:
+                print(f"⚠️ Không có mã: {args.code}")
+                return 1
+            print(json.dumps(record, ensure_ascii=False, indent=4))
+        elif args.command == "find":
+            filters = {field: getattr(args, field) for field in INDEXED_FIELDS}
+            for record in store.find(limit=args.limit, **filters):
+                print(json.dumps(record, ensure_ascii=False))
+        else:
+            print(f"📦 {len(store)} bản ghi")
+            for field in INDEXED_FIELDS:
+                values = store.values(field)
+                top = ", ".join(f"{v} ({n})" for v, n in list(values.items())[:3])
+                print(f"   -> {field}: {len(values)} giá trị" + (f" | nhiều nhất: {top}" if field != "url" else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Mốc histogram (mili-giây), thang gần log: đủ chi tiết cho cả parse (ms) lẫn chờ Selenium (s)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class _Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.bytes = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds, nbytes=0):
+        ms = seconds * 1000
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.bytes += nbytes
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, p):
+        # Ước lượng từ histogram: mốc trên của bucket chứa phân vị p
+        if not self.count: return 0.0
+        rank, seen = p / 100 * self.count, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS_MS[i], self.max * 1000) if i < len(BUCKETS_MS) else self.max * 1000
+        return self.max * 1000
+
+    def summary(self):
+        result = {
+            "count": self.count,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "min_ms": round((self.min or 0) * 1000, 2),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "max_ms": round(self.max * 1000, 2),
+            "histogram_ms": {(f"<={b}" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}"): n
+                             for i, (b, n) in enumerate(zip(BUCKETS_MS + (None,), self.buckets)) if n},
+        }
+        if self.bytes: result["bytes"] = self.bytes
+        return result
+
+
+# --- PROFILER: thời gian từng giai đoạn theo từng site ---
+# Giai đoạn: driver_start, page_load, scroll_wait..., listing_fetch, fetch, parse (dựng soup), extract (parse_detail)
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self.started = time.time()
+
+    def record(self, stage, site, seconds, nbytes=0):
+        with self._lock:
+            self._stages.setdefault((site, stage), _Histogram()).add(seconds, nbytes)
+
+    @contextmanager
+    def stage(self, stage, site):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, site, time.perf_counter() - start)
+
+    def report(self):
+        with self._lock:
+            sites = {}
+            for (site, stage), hist in sorted(self._stages.items()):
+                sites.setdefault(site, {})[stage] = hist.summary()
+            return {
+                "started_at": self.started,
+                "wall_s": round(time.time() - self.started, 3),
+                "sites": sites,
+                "bytes_downloaded": {site: sum(s.get("bytes", 0) for s in stages.values())
+                                     for site, stages in sites.items()},
+            }
+
+    def rows(self):
+        # Dạng bảng phẳng (1 dòng / site + giai đoạn) cho st.dataframe
+        rows = []
+        for site, stages in self.report()["sites"].items():
+            for stage, s in stages.items():
+                rows.append({"site": site, "stage": stage, "count": s["count"], "total_s": s["total_s"],
+                             "mean_ms": s["mean_ms"], "p50_ms": s["p50_ms"], "p95_ms": s["p95_ms"],
+                             "max_ms": s["max_ms"], "bytes": s.get("bytes", 0)})
+        return rows
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=4)
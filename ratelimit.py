@@ -0,0 +1,233 @@
+import json
+import time
+import random
+import asyncio
+import threading
+from urllib.parse import urlparse
+from email.utils import parsedate_to_datetime
+
+# Mã lỗi tạm thời -> thử lại; 429/503 còn là tín hiệu site đang bóp băng thông
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+# Thời gian chờ lâu nhất giữa 2 lần thử / tạm dừng cả host theo Retry-After (giây)
+MAX_RETRY_DELAY = 30.0
+
+
+def parse_retry_after(value):
+    # Retry-After: số giây hoặc ngày giờ HTTP; None nếu không đọc được
+    if not value: return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt, retry_after=None, base=0.5, cap=MAX_RETRY_DELAY):
+    # Exponential backoff có jitter ("full jitter"), không bao giờ ngắn hơn Retry-After của server.
+    # None: server đòi chờ lâu hơn cap -> không giữ worker ngủ, bỏ link (ghi lỗi) để lần chạy sau thử lại
+    if retry_after is not None and retry_after > cap: return None
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None: delay = max(delay, retry_after)
+    return delay
+
+
+# --- NGÂN SÁCH HTTP CHUNG cho nhiều scraper chạy cùng lúc (orchestrator.py) ---
+class SharedBudget:
+    """Tổng số request song song tối đa của mọi scraper, chia đều cho các host đang chạy:
+    1 host đang tải thì được dùng hết, thêm host thì mỗi host tối đa ~total / số host (không host nào chiếm hết)."""
+
+    ACTIVE_SECONDS = 2.0  # Host có request / đang chờ trong khoảng này được tính là đang chạy
+
+    def __init__(self, total):
+        self.total = total
+        self.in_flight = 0
+        self._hosts = {}  # host -> [số request đang chạy, lần cuối xin slot]
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        # peak: số request song song cao nhất (tổng / từng host); denied: số lần xin slot bị từ chối (phải chờ)
+        self.peak = 0
+        self.denied = 0
+        self._peaks = {}
+
+    def try_acquire(self, host):
+        with self._lock:
+            now = time.monotonic()
+            state = self._hosts.setdefault(host, [0, now])
+            state[1] = now
+            active = sum(1 for n, seen in self._hosts.values() if n or now - seen < self.ACTIVE_SECONDS)
+            share = max(1, -(-self.total // max(active, 1)))
+            if self.in_flight >= self.total or state[0] >= share:
+                self.denied += 1
+                return False
+            state[0] += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self._peaks[host] = max(self._peaks.get(host, 0), state[0])
+            return True
+
+    def release(self, host):
+        with self._lock:
+            self._hosts[host][0] -= 1
+            self.in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"total": self.total, "peak": self.peak, "denied": self.denied, "hosts": dict(self._peaks)}
+
+    def summary(self):
+        s = self.stats()
+        hosts = ", ".join(f"{host} {n}" for host, n in s["hosts"].items())
+        return (f"🌐 Ngân sách HTTP: đỉnh {s['peak']}/{s['total']} request song song | phải chờ slot {s['denied']} lần"
+                + (f" | đỉnh từng host: {hosts}" if hosts else ""))
+
+
+# --- GIỚI HẠN THEO TỪNG HOST: token bucket (req/s) + số request song song thích ứng (AIMD) ---
+class HostLimiter:
+    def __init__(self, rate=None, burst=None, max_concurrency=10, min_concurrency=1, target_latency=None,
+                 budget=None, host=None):
+        # rate: số request/giây tối đa (None = không giới hạn tốc độ, chỉ điều chỉnh song song)
+        # target_latency: độ trễ (giây) vượt quá thì coi như site đang quá tải (None = chỉ phản ứng với 429/503)
+        # budget: SharedBudget dùng chung giữa nhiều scraper (None = không giới hạn chung)
+        self.rate = rate
+        self.burst = burst or max(1.0, rate or 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.target_latency = target_latency
+        self.budget = budget
+        self.host = host
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.last_decrease = 0.0
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        # Đếm lại cho lần chạy mới; giữ nguyên limit / cooldown đã học được
+        self.stats = {"requests": 0, "throttled": 0, "decreases": 0}
+
+    def _try_acquire(self):
+        # 0 = đã lấy được slot + token; ngược lại là số giây nên chờ rồi thử lại
+        with self._lock:
+            now = time.monotonic()
+            if now < self.cooldown_until: return self.cooldown_until - now
+            if self.in_flight >= int(self.limit): return 0.05
+            if self.rate:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens < 1: return (1 - self.tokens) / self.rate
+            if self.budget and not self.budget.try_acquire(self.host): return 0.02
+            if self.rate: self.tokens -= 1
+            self.in_flight += 1
+            self.stats["requests"] += 1
+            return 0
+
+    def acquire(self):
+        # Trả về thời điểm bắt đầu, truyền lại cho release() để đo độ trễ
+        while True:
+            wait = self._try_acquire()
+            if not wait: return time.monotonic()
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._try_acquire()
+            if not wait: return time.monotonic()
+            await asyncio.sleep(wait)
+
+    def release(self, started, status=None, retry_after=None):
+        now = time.monotonic()
+        latency = now - started
+        if self.budget: self.budget.release(self.host)
+        with self._lock:
+            self.in_flight -= 1
+            throttled = status in THROTTLE_STATUSES
+            if throttled: self.stats["throttled"] += 1
+            if throttled or (self.target_latency and latency > self.target_latency):
+                # Giảm nhân, tối đa 1 lần mỗi khoảng độ trễ (nhiều request lỗi cùng lúc chỉ tính 1 lần)
+                if now - self.last_decrease > latency:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self.last_decrease = now
+                    self.stats["decreases"] += 1
+            elif status is not None and status < 500:
+                # Tăng cộng: thêm ~1 slot sau mỗi "cửa sổ" request thành công
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            # Retry-After dài hơn MAX_RETRY_DELAY: link đó bị bỏ (retry_delay trả None), không dừng cả host -
+            # các link khác vẫn tải tiếp, chỉ giảm song song như trên
+            if retry_after and retry_after <= MAX_RETRY_DELAY:
+                self.cooldown_until = max(self.cooldown_until, now + retry_after)
+
+
+class RateLimiter:
+    def __init__(self, rate=None, max_concurrency=10, target_latency=None, budget=None):
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.budget = budget
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, url):
+        netloc = urlparse(url).netloc
+        with self._lock:
+            if netloc not in self._hosts:
+                self._hosts[netloc] = HostLimiter(self.rate, max_concurrency=self.max_concurrency,
+                                                  target_latency=self.target_latency,
+                                                  budget=self.budget, host=netloc)
+            return self._hosts[netloc]
+
+    def reset_stats(self):
+        with self._lock:
+            for h in self._hosts.values(): h.reset_stats()
+
+    def stats(self):
+        with self._lock:
+            return {host: dict(h.stats, limit=round(h.limit, 2)) for host, h in self._hosts.items()}
+
+    def summary(self):
+        # 1 dòng / host đã gửi request trong lần chạy: số request, số lần bị bóp (429/503), song song hiện tại
+        return "\n".join(f"🚦 {host}: {s['requests']} request | bị bóp (429/503) {s['throttled']} | "
+                         f"giảm song song {s['decreases']} lần (còn {s['limit']}/{self.max_concurrency})"
+                         for host, s in self.stats().items() if s["requests"])
+
+
+# --- BÁO CÁO LINK BỊ BỎ (hết lượt thử lại, lỗi HTTP, lỗi parse) ---
+class FailureReport:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.items = []
+
+    def add(self, url, reason, status=None, attempts=1):
+        with self._lock:
+            self.items.append({"url": url, "reason": reason, "status": status, "attempts": attempts})
+
+    def clear(self):
+        with self._lock:
+            self.items = []
+
+    def retryable(self):
+        # Link lỗi có thể tải được ở lần chạy sau: lỗi mạng / 429 / 5xx (404 hay lỗi parse thì chạy lại cũng vậy)
+        with self._lock:
+            return [item for item in self.items
+                    if item["status"] in RETRY_STATUSES or (item["status"] is None and item["reason"] != "parse")]
+
+    def summary(self):
+        result = {}
+        with self._lock:
+            for item in self.items:
+                result[item["reason"]] = result.get(item["reason"], 0) + 1
+        return result
+
+    def save(self, path):
+        with self._lock:
+            items = list(self.items)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(items, f, ensure_ascii=False, indent=4)
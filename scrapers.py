@@ -1,65 +1,466 @@
+import os
 import time
+import queue
+import asyncio
+import threading
 import requests
 import concurrent.futures
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from urllib.parse import urlparse, urljoin
+from parsers import make_soup
+from extraction import SelectorPlan, first
+from http_cache import HttpCache, mount_cache
+from connections import PoolStats, mount_pool, new_httpx_client, aiohttp_trace_config
+from incremental import ContentIndex, content_hash, parser_version
+from checkpoint import CheckpointStore
+from images import MediaMirror
+from archive import open_archive
+from ratelimit import RateLimiter, FailureReport, RETRY_STATUSES, parse_retry_after, retry_delay
+from driver_pool import new_driver
+from profiling import Profiler
+from waits import (By, Waiter, WaitRecorder, any_of, elements_present, item_count_increased, first_href_changed,
+                   scroll_height_changed, scroll_height_stable, network_idle)
+
+
+# --- TẬP LINK: dict giữ thứ tự + bỏ trùng, báo ngay link mới cho chế độ streaming ---
+class LinkSet(dict):
+    def __init__(self, on_new=None):
+        super().__init__()
+        self.on_new = on_new
+
+    def add(self, href):
+        self[href] = True
+
+    def __setitem__(self, href, value):
+        is_new = href not in self
+        super().__setitem__(href, value)
+        if is_new and self.on_new: self.on_new(href)
 
 
 # --- CLASS CHA (BASE) ---
 class BaseScraper:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, fetch_mode="thread", max_concurrency=10, per_host_limit=None,
+                 parse_mode="thread", parse_workers=None, parser="html.parser",
+                 cache_dir=None, cache_max_bytes=512 * 1024 * 1024, index_path=None, discovery="auto",
+                 driver_pool=None, category_workers=1, rate_limit=None, target_latency=None, max_retries=3,
+                 failure_report_path=None, pool_size=None, http_backend="requests", checkpoint_path=None,
+                 profile_path=None, media_dir=None, media_concurrency=16, http_budget=None, archive_dir=None,
+                 checkpoint_max_age=24 * 3600):
+        # fetch_mode: "thread" (ThreadPool + requests) hoặc "async" (asyncio + aiohttp)
+        # max_concurrency: số request chạy song song tối đa (toàn cục)
+        # per_host_limit: số request song song tối đa cho mỗi host (None = không giới hạn riêng)
+        # parse_mode: "thread" (parse ngay tại luồng tải) hoặc "process" (đẩy HTML sang ProcessPool, tránh GIL)
+        # parse_workers: số process parse (None = số core CPU)
+        # parser: backend parse HTML - "html.parser", "lxml" hoặc "selectolax" (xem parsers.py)
+        # cache_dir: thư mục cache HTTP (ETag/Last-Modified) cho trang chi tiết, None = tắt cache
+        # index_path: file index nội dung (URL -> hash HTML -> bản ghi) cho chế độ cào lại tăng dần
+        # discovery: cách tìm link - "auto" (HTTP trước, không được thì Selenium), "http" hoặc "selenium"
+        # driver_pool: DriverPool dùng chung (driver_pool.py); None = mỗi lần get_links mở Chrome mới
+        # category_workers: số worker (Chrome hoặc HTTP) duyệt danh mục song song (Taicera, Amy)
+        # rate_limit: số request/giây tối đa cho mỗi host khi tải chi tiết (None = không giới hạn tốc độ)
+        # target_latency: độ trễ (giây) mà vượt quá thì tự giảm số request song song vào host (None = chỉ xét 429/503)
+        # max_retries: số lần thử lại khi gặp lỗi mạng / 429 / 5xx (backoff có jitter, tôn trọng Retry-After)
+        # failure_report_path: file JSON ghi danh sách link bị bỏ sau mỗi lần chạy (None = chỉ in tóm tắt)
+        # pool_size: số kết nối keep-alive giữ lại mỗi host (None = theo max_concurrency, tối thiểu 10)
+        # http_backend: "requests" (HTTP/1.1) hoặc "httpx" (HTTP/2 multiplexing, cần cài httpx[http2]; không dùng được cache_dir)
+        # checkpoint_path: file SQLite lưu tiến độ (link, danh mục, bản ghi) để chạy tiếp sau khi bị dừng (xem resume)
+        # profile_path: file JSON ghi hồ sơ thời gian từng giai đoạn sau mỗi lần chạy (None = chỉ giữ trong self.profiler)
+        # media_dir: thư mục tải ảnh sản phẩm về (lọc trùng, lưu theo hash, thêm trường "Tệp Ảnh"); None = chỉ giữ URL
+        # media_concurrency: số ảnh tải song song tối đa (cần aiohttp)
+        # http_budget: SharedBudget (ratelimit.py) dùng chung với các scraper khác chạy cùng lúc (xem orchestrator.py)
+        # checkpoint_max_age: checkpoint cũ hơn số giây này bị bỏ, cào lại từ đầu (None = không giới hạn)
+        # archive_dir: thư mục lưu HTML thô của trang chi tiết (nén, lọc trùng) để parse lại offline (xem archive.py)
+        self.fetch_mode = fetch_mode
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.parse_mode = parse_mode
+        self.parse_workers = parse_workers
+        self.parser = parser
+        self.discovery = discovery
+        self.driver_pool = driver_pool
+        self.category_workers = category_workers
+        self.max_retries = max_retries
+        self.failure_report_path = failure_report_path
+
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept-Language': 'vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7'
         }
-        self.session.headers.update(self.headers)
+
+        # Pool kết nối cỡ theo số luồng tải -> các luồng không phải bỏ kết nối và bắt tay TLS lại
+        self.pool_size = pool_size or max(max_concurrency, 10)
+        self.pool_stats = PoolStats()
+        self.last_pool_stats = None
+        if http_backend == "httpx":
+            if cache_dir: raise ValueError("cache_dir chỉ dùng được với http_backend='requests'")
+            self.session = new_httpx_client(self.headers, self.pool_size, self.pool_stats)
+        else:
+            self.session = requests.Session()
+            self.session.headers.update(self.headers)
+
+        self.http_cache = None
+        if cache_dir:
+            self.http_cache = HttpCache(cache_dir, cache_max_bytes)
+            mount_cache(self.session, self.http_cache, stats=self.pool_stats, pool_maxsize=self.pool_size)
+        elif http_backend != "httpx":
+            mount_pool(self.session, self.pool_size, self.pool_stats)
+
+        # Cào lại tăng dần: trang có HTML không đổi (và parser không đổi) thì trả lại bản ghi cũ, không parse lại
+        self.content_index = ContentIndex(index_path, parser_version(type(self), parser)) if index_path else None
+        self.last_run_report = None
+        # Danh sách link của lần tìm link đầy đủ gần nhất (None = chưa tìm / tìm thiếu): chỉ khi cào đủ các link này
+        # mới xóa khỏi index những trang không còn trên site
+        self.complete_links = None
+
+        # Checkpoint: bị dừng giữa chừng thì lần chạy sau bỏ qua phần đã làm xong
+        self.checkpoint = CheckpointStore(checkpoint_path, checkpoint_max_age) if checkpoint_path else None
+
+        # Giới hạn tốc độ + song song thích ứng (AIMD) theo từng host, và danh sách link bị bỏ (xem ratelimit.py)
+        self.rate_limiter = RateLimiter(rate_limit, per_host_limit or max_concurrency, target_latency, http_budget)
+        self.failures = FailureReport()
+        # Danh mục duyệt lỗi ở lần tìm link gần nhất: không đánh dấu xong trong checkpoint, lần sau duyệt lại
+        self.category_failures = FailureReport()
+
+        # Đo thời gian từng giai đoạn (khởi động Chrome, chờ trang, tải, parse...) theo site (xem profiling.py)
+        self.profiler = Profiler()
+        self.profile_path = profile_path
+        self.site = type(self).__name__
+
+        # Tải ảnh ngay sau parse_detail (xem images.py)
+        self.media = MediaMirror(media_dir, media_concurrency, per_host_limit, rate_limit, max_retries,
+                                 self.headers, profiler=self.profiler, site=self.site) if media_dir else None
+
+        # Lưu HTML thô ngay khi tải xong: sửa parse_detail thì parse lại từ kho, không cần cào lại
+        self.archive = open_archive(archive_dir) if archive_dir else None
+
+        # Ghi lại thời gian chờ thực tế của từng bước Selenium (xem waits.py), đồng thời đưa vào profiler
+        self.wait_recorder = WaitRecorder(self.profiler)
+        # Đã có lần chạy đang đo (tìm link hoặc tải chi tiết đã bắt đầu) -> không xóa số đo giữa chừng
+        self._run_open = False
+
+        # Streaming (iter_links): hàng đợi nhận link mới ngay khi tìm thấy
+        self._link_stream = None
+        self.discovered_links = []
 
     def _setup_driver(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1920,1080")
-        prefs = {"profile.managed_default_content_settings.images": 2}
-        chrome_options.add_experimental_option("prefs", prefs)
+        with self.profiler.stage("driver_start", self.site):
+            if self.driver_pool: return self.driver_pool.acquire()
+            return new_driver()
 
-        try:
-            return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        except Exception:
-            return webdriver.Chrome(options=chrome_options)
+    def _release_driver(self, driver):
+        # Trả Chrome về pool để scraper sau dùng lại, không có pool thì tắt luôn
+        if self.driver_pool: self.driver_pool.release(driver)
+        else: driver.quit()
+
+    def _waiter(self, driver):
+        return Waiter(driver, self.wait_recorder, site=self.site)
+
+    def _new_link_set(self):
+        return LinkSet(self._emit_link)
+
+    def _emit_link(self, href):
+        if self._link_stream is not None: self._link_stream.put(("link", href))
+
+    # --- TÌM LINK BẰNG HTTP (không cần Chrome) ---
+    # Class con khai báo cách phân trang tĩnh nếu site cho phép; cả 2 đều None = chỉ dùng Selenium
+    HTTP_NEXT_SELECTOR = None  # Nút "trang sau" có href thật (VD: WooCommerce "ul.page-numbers a.next")
+    HTTP_PAGE_URL = None  # Mẫu URL trang thứ N (VD: "{url}?page={page}")
+    HTTP_MAX_PAGES = 200
 
     def get_links(self, url, item_selector, link_selector=None, progress_callback=None):
+        self._open_run()
+        self.category_failures.clear()
+        self.complete_links = None
+        if self.checkpoint and self.checkpoint.discovery_done():
+            links = self.checkpoint.links()
+            msg = f"♻️ Dùng lại {len(links)} link đã tìm thấy từ checkpoint"
+            print(msg)
+            if progress_callback: progress_callback(msg)
+            self.complete_links = set(links)
+            return links
+        links = self._discover_links(url, item_selector, link_selector, progress_callback)
+        # Còn danh mục lỗi -> chưa tìm đủ link, lần sau tìm lại (danh mục đã xong lấy từ checkpoint)
+        if links and not self.category_failures.items: self.complete_links = set(links)
+        if self.checkpoint and links:
+            self.checkpoint.set_links(links)
+            if self.complete_links is not None: self.checkpoint.mark_discovery_done()
+        return links
+
+    def _discover_links(self, url, item_selector, link_selector=None, progress_callback=None):
+        if self.discovery != "selenium" and (self.HTTP_NEXT_SELECTOR or self.HTTP_PAGE_URL):
+            links = self._get_links_http(url, item_selector, link_selector, progress_callback)
+            if links or self.discovery == "http": return links or []
+            if progress_callback: progress_callback("⚠️ Không lấy được link bằng HTTP -> Chuyển sang Selenium...")
+            self.category_failures.clear()
+        links = self._get_links_selenium(url, item_selector, link_selector, progress_callback)
+        self._report_waits(progress_callback)
+        return links
+
+    def iter_links(self, url, item_selector, link_selector=None, progress_callback=None):
+        """Generator: chạy get_links ở luồng phụ, yield từng link mới (đã bỏ trùng) ngay khi tìm thấy.
+        progress_callback vẫn được gọi ở luồng đang duyệt generator. Xong thì danh sách đầy đủ ở self.discovered_links."""
+        stream = queue.Queue()
+        seen = {}
+        final = []
+
+        def run():
+            try:
+                stream.put(("done", self.get_links(url, item_selector, link_selector,
+                                                   lambda msg: stream.put(("progress", msg)))))
+            except Exception as e:
+                stream.put(("error", e))
+
+        self._link_stream = stream
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            while True:
+                kind, value = stream.get()
+                if kind == "progress":
+                    if progress_callback: progress_callback(value)
+                    continue
+                if kind == "error": raise value
+                # "link": 1 link vừa tìm thấy; "done": danh sách cuối (bù các link không đi qua LinkSet)
+                for href in ([value] if kind == "link" else value or []):
+                    if href not in seen:
+                        seen[href] = True
+                        yield href
+                if kind == "done":
+                    final = value or []
+                    break
+        finally:
+            self._link_stream = None
+            # Thứ tự cuối theo kết quả get_links (gộp theo thứ tự danh mục), không theo thứ tự worker nào xong trước
+            self.discovered_links = list(dict.fromkeys(final + list(seen)))
+
+    def _report_waits(self, progress_callback=None):
+        summary = self.wait_recorder.summary()
+        if not summary: return
+        waited = sum(s['seconds'] for s in summary.values())
+        reclaimed = sum(s['reclaimed_seconds'] for s in summary.values())
+        msg = f"⏱️ Tổng thời gian chờ Selenium: {waited:.1f}s (nhanh hơn ~{reclaimed:.1f}s so với sleep cố định)"
+        print(msg)
+        for key, s in summary.items():
+            print(f"   -> {key}: {s['count']} lần, {s['seconds']:.1f}s, timeout {s['timeouts']} lần")
+        if progress_callback: progress_callback(msg)
+
+    def _http_soup(self, url):
+        # None = trang không tồn tại (404/410); lỗi khác (429, 5xx...) thì báo lỗi, không coi là hết trang
+        start = time.perf_counter()
+        response = self.session.get(url, timeout=15)
+        self.profiler.record("listing_fetch", self.site, time.perf_counter() - start, len(response.content))
+        if response.status_code in (404, 410): return None
+        if response.status_code != 200: raise ValueError(f"HTTP {response.status_code}: {url}")
+        return self._make_soup(response.text)
+
+    def _collect_links(self, soup, item_selector, link_selector, domain, product_links):
+        # Thêm link mới vào product_links (dict giữ thứ tự, bỏ trùng), trả về số link mới
+        count_new = 0
+        for item in soup.select(item_selector):
+            tag = item.select_one(link_selector) if link_selector else item
+            href = tag.get('href') if tag else None
+            if href:
+                if not href.startswith('http'): href = domain + href
+                if href not in product_links:
+                    product_links[href] = True
+                    count_new += 1
+        return count_new
+
+    def _next_page_url(self, soup, url, current_url, page):
+        # URL trang kế tiếp, None nếu hết trang; lỗi nếu chỉ sang trang được bằng JavaScript
+        if self.HTTP_NEXT_SELECTOR:
+            next_tag = soup.select_one(self.HTTP_NEXT_SELECTOR)
+            if not next_tag: return None
+            href = next_tag.get('href')
+            if href and not href.startswith(('#', 'javascript')):
+                return urljoin(current_url, href)
+        if self.HTTP_PAGE_URL:
+            return self.HTTP_PAGE_URL.format(url=url.rstrip('/'), page=page)
+        raise ValueError("Nút chuyển trang chỉ hoạt động bằng JavaScript")
+
+    def _crawl_pages_http(self, url, item_selector, link_selector, product_links, progress_callback=None):
+        # Chỉ kết thúc bình thường khi chắc chắn đã hết trang. Không chắc (site bỏ qua tham số trang, lỗi giữa chừng,
+        # chạm HTTP_MAX_PAGES) thì báo lỗi -> _get_links_http trả None, chuyển sang Selenium thay vì trả danh sách thiếu
+        domain = "/".join(url.split("/")[:3])
+        page_url, page = url, 1
+        while page_url:
+            soup = self._http_soup(page_url)
+            if soup is None:
+                # 404 ở trang 1 là sai URL; ở các trang sau là đã quá trang cuối
+                if page == 1: raise ValueError(f"Không có trang danh sách: {page_url}")
+                break
+            count_new = self._collect_links(soup, item_selector, link_selector, domain, product_links)
+            msg = f"📄 [HTTP] Trang {page}: Thêm {count_new} sản phẩm mới. Tổng: {len(product_links)}"
+            print(msg)
+            if progress_callback: progress_callback(msg)
+            if count_new == 0:
+                # Trang 2 dựng từ HTTP_PAGE_URL vẫn có sản phẩm nhưng toàn link của trang 1 -> site bỏ qua tham số trang.
+                # Trang trống (hoặc trang sau lặp lại trang cuối) mới là hết trang
+                generated = self.HTTP_PAGE_URL and page_url == self.HTTP_PAGE_URL.format(url=url.rstrip('/'), page=page)
+                if page == 2 and generated and soup.select(item_selector):
+                    raise ValueError(f"Site bỏ qua tham số trang ({page_url} lặp lại trang 1)")
+                break
+            # Trang ngay sau HTTP_MAX_PAGES vẫn có link mới -> danh sách chưa đủ
+            if page > self.HTTP_MAX_PAGES: raise ValueError(f"Vượt {self.HTTP_MAX_PAGES} trang mà vẫn còn trang sau")
+            page += 1
+            page_url = self._next_page_url(soup, url, page_url, page)
+
+    def _get_links_http(self, url, item_selector, link_selector=None, progress_callback=None):
+        product_links = self._new_link_set()
+        try:
+            if progress_callback: progress_callback(f"⚡ Đang lấy link trực tiếp bằng HTTP: {url}")
+            self._crawl_pages_http(url, item_selector, link_selector, product_links, progress_callback)
+        except Exception as e:
+            print(f"⚠️ Không lấy được link bằng HTTP: {e}")
+            return None
+        return list(product_links)
+
+    def _crawl_category_http(self, driver, cat_url, item_selector, link_selector=None):
+        # Bản HTTP của 1 danh mục (không dùng driver, giữ cùng chữ ký với bản Selenium)
+        category_links = self._new_link_set()
+        self._crawl_pages_http(cat_url, item_selector, link_selector, category_links)
+        return list(category_links)
+
+    # --- DUYỆT NHIỀU DANH MỤC (tuần tự hoặc song song) ---
+    def _crawl_categories(self, categories, crawl_one, progress_callback=None, driver=None, use_browser=False):
+        """Gọi crawl_one(driver, cat_url) cho từng danh mục, trả về list link đã bỏ trùng.
+        category_workers > 1: chia danh mục cho nhiều worker, mỗi worker mượn Chrome riêng (nếu use_browser).
+        Kết quả luôn gộp theo thứ tự danh mục -> bỏ trùng ổn định, không phụ thuộc worker nào xong trước.
+        Danh mục lỗi (hoặc không worker nào duyệt tới) được ghi vào self.category_failures, không đánh dấu xong;
+        chỉ raise khi không danh mục nào duyệt được."""
+        results = {}
+        errors = {}  # chỉ số danh mục -> lỗi
+        worker_errors = []
+        total = len(categories)
+
+        # Danh mục đã duyệt xong ở lần chạy trước (checkpoint) -> lấy lại link, không mở lại trang
+        if self.checkpoint:
+            for i, cat_url in enumerate(categories):
+                cached = self.checkpoint.category_links(cat_url)
+                if cached is None: continue
+                results[i] = cached
+            if results: print(f"♻️ Checkpoint: bỏ qua {len(results)}/{total} danh mục đã duyệt xong")
+        pending = [(i, cat_url) for i, cat_url in enumerate(categories) if i not in results]
+        workers = min(self.category_workers, len(pending))
+        from_checkpoint = set(results)
+
+        def crawl(i, own_driver):
+            # None = lỗi (đã ghi vào errors); lỗi 1 danh mục không làm dừng các danh mục còn lại
+            try:
+                return crawl_one(own_driver, categories[i])
+            except Exception as e:
+                print(f"⚠️ Lỗi danh mục {categories[i]}: {e}")
+                errors[i] = e
+                return None
+
+        if workers <= 1:
+            # Link của danh mục lấy từ checkpoint được báo đúng vị trí của danh mục đó -> chạy tiếp cho cùng thứ tự
+            # link với chạy từ đầu
+            for i, cat_url in enumerate(categories):
+                if i in from_checkpoint:
+                    for href in results[i]: self._emit_link(href)
+                    continue
+                msg = f"📂 [{i + 1}/{total}] Đang xử lý: {cat_url}"
+                print(msg)
+                if progress_callback: progress_callback(msg)
+                links = crawl(i, driver)
+                if links is None: continue
+                results[i] = links
+                if self.checkpoint: self.checkpoint.mark_category(cat_url, links)
+        else:
+            # Song song: thứ tự báo link vốn theo worker xong trước, danh sách cuối mới gộp theo thứ tự danh mục
+            for i in sorted(from_checkpoint):
+                for href in results[i]: self._emit_link(href)
+            todo = queue.Queue()
+            for item in pending: todo.put(item)
+            done = queue.Queue()
+
+            def worker():
+                own_driver = None
+                try:
+                    if use_browser: own_driver = self._setup_driver()
+                    while True:
+                        try:
+                            i, cat_url = todo.get_nowait()
+                        except queue.Empty:
+                            return
+                        done.put((i, crawl(i, own_driver)))
+                except Exception as e:
+                    # Không mở được Chrome: danh mục còn trong hàng đợi để worker khác nhận
+                    print(f"⚠️ Worker danh mục lỗi: {e}")
+                    worker_errors.append(e)
+                finally:
+                    if own_driver: self._release_driver(own_driver)
+
+            if progress_callback: progress_callback(f"⚡ Duyệt {total} danh mục song song với {workers} worker...")
+            threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+            for t in threads: t.start()
+            # Chỉ luồng chính gọi progress_callback (Streamlit không cho gọi từ luồng phụ)
+            finished = len(results)
+            while finished < total:
+                try:
+                    i, links = done.get(timeout=1)
+                except queue.Empty:
+                    if not any(t.is_alive() for t in threads) and done.empty(): break
+                    continue
+                finished += 1
+                if links is None:
+                    msg = f"📂 [{finished}/{total}] ❌ Lỗi: {categories[i]}"
+                else:
+                    results[i] = links
+                    if self.checkpoint: self.checkpoint.mark_category(categories[i], links)
+                    msg = f"📂 [{finished}/{total}] Xong: {categories[i]} (+{len(links)} link)"
+                print(msg)
+                if progress_callback: progress_callback(msg)
+            for t in threads: t.join()
+
+        failed = [i for i in range(total) if i not in results]
+        first_error = None
+        for i in failed:
+            # Không có lỗi riêng = không worker nào duyệt tới (mọi worker đều không mở được Chrome)
+            error = errors.get(i) or (worker_errors[0] if worker_errors else None)
+            first_error = first_error or error
+            self.category_failures.add(categories[i], f"danh mục: {type(error).__name__ if error else 'bỏ dở'}")
+        if failed:
+            msg = f"⚠️ {len(failed)}/{total} danh mục lỗi - chưa tìm đủ link, lần chạy sau sẽ duyệt lại"
+            print(msg)
+            if progress_callback: progress_callback(msg)
+            # Không danh mục nào duyệt được (VD: HTTP bị chặn) -> báo lỗi để nơi gọi chuyển cách khác
+            if first_error and len(failed) == len(pending): raise first_error
+        merged = {}
+        for i in range(total):
+            for href in results.get(i, []):
+                merged[href] = True
+        return list(merged)
+
+    def _get_links_selenium(self, url, item_selector, link_selector=None, progress_callback=None):
         """Mặc định: Dùng Scroll (Cho Viglacera Tiles)"""
         driver = None
-        product_links = []
+        product_links = self._new_link_set()
         try:
             if progress_callback: progress_callback(f"🚀 Đang khởi động trình duyệt...")
             driver = self._setup_driver()
 
+            waiter = self._waiter(driver)
+
             if progress_callback: progress_callback(f"🔗 Đang truy cập: {url}")
             driver.get(url)
-            time.sleep(3)
+            waiter.until("page_load", elements_present(item_selector), timeout=10, baseline=3)
 
             if progress_callback: progress_callback("🔄 Đang cuộn trang (Lazy Load)...")
             last_height = driver.execute_script("return document.body.scrollHeight")
 
             while True:
+                item_count = len(driver.find_elements(By.CSS_SELECTOR, item_selector))
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1.5)
+                # Chờ tới khi trang dài ra hoặc có thêm sản phẩm, hết 3s mà không đổi -> đã cuộn hết
+                waiter.until("scroll_wait", any_of(scroll_height_changed(last_height),
+                                                      item_count_increased(item_selector, item_count)),
+                             timeout=3, baseline=1.5)
                 new_height = driver.execute_script("return document.body.scrollHeight")
                 if new_height == last_height:
                     break
                 last_height = new_height
 
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            soup = self._make_soup(driver.page_source)
             items = soup.select(item_selector)
 
             if progress_callback: progress_callback(f"✅ Tìm thấy {len(items)} thẻ sản phẩm. Đang trích xuất link...")
@@ -70,60 +471,466 @@ class BaseScraper:
                 if tag and tag.get('href'):
                     href = tag.get('href')
                     if not href.startswith('http'): href = domain + href
-                    product_links.append(href)
+                    product_links.add(href)
         except Exception as e:
             if progress_callback: progress_callback(f"❌ Lỗi Selenium: {e}")
             print(f"Error: {e}")
         finally:
-            if driver: driver.quit()
-        return list(set(product_links))
+            if driver: self._release_driver(driver)
+        return list(product_links)
+
+    # --- PARSE TRANG CHI TIẾT ---
+    # Vùng cần parse (RegionFilter, thường là PLAN.region()): chỉ dựng cây cho các thẻ parse_detail đọc tới.
+    # None = parse cả trang (site cần đi qua thẻ anh em / thẻ nằm ngoài các vùng đã khai báo)
+    PARSE_REGION = None
 
     def parse_detail(self, soup, url):
         raise NotImplementedError
 
-    def _fetch_single_product(self, link):
+    def _make_soup(self, html, region=None):
+        return make_soup(html, self.parser, region)
+
+    def _parse_options(self):
+        # Các tham số ảnh hưởng tới việc parse, được gửi kèm sang process con
+        return {"parser": self.parser}
+
+    def _parse_html(self, html, link, encoding=None):
+        record, parse_s, extract_s = self._parse_html_timed(html, link, encoding)
+        self._record_parse(parse_s, extract_s)
+        return record
+
+    def _parse_html_timed(self, html, link, encoding=None):
+        # html có thể là str hoặc bytes thô (từ process pool / aiohttp)
+        # Trả về (bản ghi, thời gian dựng soup, thời gian parse_detail) - process con gửi kèm số đo về
+        start = time.perf_counter()
+        if isinstance(html, bytes) and encoding:
+            html = html.decode(encoding, errors='replace')
+        soup = self._make_soup(html, self.PARSE_REGION)
+        parsed = time.perf_counter()
+        record = self.parse_detail(soup, link)
+        return record, parsed - start, time.perf_counter() - parsed
+
+    def _record_parse(self, parse_s, extract_s):
+        self.profiler.record("parse", self.site, parse_s)
+        self.profiler.record("extract", self.site, extract_s)
+
+    def _parse_in_pool_result(self, result):
+        record, parse_s, extract_s = result
+        self._record_parse(parse_s, extract_s)
+        return record
+
+    def _fetch_html(self, link):
+        # Chỉ tải trang, trả về (bytes, encoding) hoặc None nếu lỗi
+        # Mỗi lần thử đều qua bộ giới hạn của host; lỗi tạm thời thì chờ (backoff) rồi thử lại
+        limiter = self.rate_limiter.host(link)
+        for attempt in range(self.max_retries + 1):
+            status, retry_after = None, None
+            started = limiter.acquire()
+            try:
+                start = time.perf_counter()
+                response = self.session.get(link, timeout=15)
+                nbytes = 0 if getattr(response, "from_cache", False) else len(response.content)
+                self.profiler.record("fetch", self.site, time.perf_counter() - start, nbytes)
+                status = response.status_code
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                reason = f"HTTP {status}"
+            except Exception as e:
+                reason = type(e).__name__
+                print(f"Lỗi link {link}: {e}")
+            finally:
+                limiter.release(started, status, retry_after)
+            if status == 200:
+                return self._archived(link, response.content, response.encoding or response.apparent_encoding)
+            if status is not None and status not in RETRY_STATUSES: break
+            if attempt < self.max_retries:
+                delay = retry_delay(attempt, retry_after)
+                if delay is None:
+                    reason += " (Retry-After quá dài)"
+                    break
+                time.sleep(delay)
+        self.failures.add(link, reason, status, attempt + 1)
+        return None
+
+    def _archived(self, link, content, encoding):
+        # Trả lại đúng (bytes, encoding) sau khi lưu vào kho (nếu bật archive_dir)
+        if self.archive: self.archive.put(link, content, encoding, self.site)
+        return content, encoding
+
+    def _unchanged_record(self, link, content):
+        # Trả về (hash, bản ghi cũ nếu HTML không đổi so với lần cào trước)
+        if not self.content_index: return None, None
+        digest = content_hash(content)
+        return digest, self.content_index.lookup(link, digest)
+
+    def _remember_record(self, link, digest, record):
+        if self.content_index and digest and record:
+            self.content_index.update(link, digest, record)
+
+    def _fetch_single_product(self, link, parse_pool=None):
+        fetched = self._fetch_html(link)
+        if not fetched: return None
         try:
-            response = self.session.get(link, timeout=15)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                return self.parse_detail(soup, link)
+            digest, record = self._unchanged_record(link, fetched[0])
+            if record is not None: return record
+            if parse_pool:
+                record = self._parse_in_pool_result(parse_pool.submit(
+                    _parse_in_worker, type(self), self._parse_options(), fetched[0], fetched[1], link).result())
+            else:
+                record = self._parse_html(fetched[0], link, fetched[1])
+            self._remember_record(link, digest, record)
+            return record
         except Exception as e:
             print(f"Lỗi link {link}: {e}")
+            self.failures.add(link, "parse")
         return None
 
-    def scrape_details_list(self, links, progress_bar=None, status_text=None):
-        data = []
+    def _to_sink(self, record, sink=None, link=None):
+        # Có sink: ghi bản ghi ra đĩa ngay khi xong, không giữ lại trong RAM
+        if self.checkpoint and record and link: self.checkpoint.add_record(link, record)
+        if sink and record:
+            sink.write(record)
+            return None
+        return record
+
+    def _fetch_to_sink(self, link, parse_pool=None, sink=None):
+        return self._to_sink(self._with_media(self._fetch_single_product(link, parse_pool)), sink, link)
+
+    def _with_media(self, record):
+        # Tải ảnh của bản ghi (chặn luồng gọi tới khi xong); không bật media_dir thì trả nguyên bản ghi
+        return self.media.mirror(record) if self.media and record else record
+
+    def _report_progress(self, completed, total, progress_bar=None, status_text=None):
+        if progress_bar: progress_bar.progress(completed / total)
+        if status_text: status_text.text(f"Đã tải xong: {completed}/{total} sản phẩm")
+
+    def _new_parse_pool(self):
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.parse_workers or os.cpu_count() or 1)
+
+    def scrape_details_list(self, links, progress_bar=None, status_text=None, sink=None):
+        """sink: JsonlSink (sinks.py) - mỗi bản ghi được ghi ra đĩa ngay khi xong thay vì gom vào list.
+        Có sink thì trả về số bản ghi đã ghi (sink.count), không thì trả về list bản ghi."""
+        self._begin_run()
+        restored = self._restore_records(links, sink)
+        todo = [link for link in links if link not in restored] if restored else links
+
+        if self.fetch_mode == "async":
+            data = asyncio.run(self._scrape_details_async(todo, progress_bar, status_text, sink))
+        elif self.parse_mode == "process":
+            data = self._scrape_details_process(todo, progress_bar, status_text, sink)
+        else:
+            data = self._scrape_details_threads(todo, progress_bar, status_text, sink)
+
+        self._finish_run(links, status_text)
+        if sink: return sink.count
+        # Bản ghi lấy từ checkpoint nằm đúng vị trí link của nó (chạy tiếp cho cùng thứ tự với chạy từ đầu)
+        fetched = dict(zip(todo, data))
+        return [r for r in (restored[link] if link in restored else fetched.get(link) for link in links) if r]
+
+    def _restore_records(self, links, sink=None):
+        # Bản ghi đã cào xong ở lần chạy trước (checkpoint): đưa thẳng vào kết quả, không tải lại
+        if not self.checkpoint: return {}
+        saved = self.checkpoint.records()
+        restored = {link: saved[link] for link in links if link in saved}
+        if restored: print(f"♻️ Checkpoint: bỏ qua {len(restored)} link đã cào xong")
+        if sink:
+            for record in restored.values(): sink.write(record)
+        return restored
+
+    def _open_run(self):
+        # Hồ sơ thời gian + thời gian chờ Selenium chỉ tính cho lần chạy hiện tại. Lần chạy bắt đầu ở get_links
+        # (get_links rồi scrape_details_list) hoặc ở _begin_run; đóng lại ở _finish_run
+        if self._run_open: return
+        self._run_open = True
+        self.profiler.reset()
+        self.wait_recorder.reset()
+        self.rate_limiter.reset_stats()
+
+    def _begin_run(self):
+        self._open_run()
+        if self.content_index: self.content_index.begin_run()
+        self.failures.clear()
+        self.pool_stats.reset()
+        if self.media:
+            self.media.reset_stats()
+            self.media.failures.clear()
+
+    def _finish_run(self, links, status_text=None):
+        # Chạy xong không còn link lỗi tạm thời -> xóa checkpoint, lần sau cào lại từ đầu (tìm cả sản phẩm mới).
+        # Còn lỗi mạng / 429 / 5xx thì giữ lại để resume chỉ tải lại các link đó; 404, lỗi parse... không giữ
+        # Danh mục lỗi: giữ checkpoint để lần sau chỉ duyệt lại các danh mục đó
+        if self.checkpoint and not self.failures.retryable() and not self.category_failures.items:
+            self.checkpoint.clear()
+        if self.profile_path: self.profiler.save(self.profile_path)
+        self._run_open = False
+        self.last_pool_stats = self.pool_stats.snapshot()
+        p = self.last_pool_stats
+        print(f"🔌 Kết nối: {p['requests']} request | mở mới {p['new_connections']} "
+              f"(bắt tay TB {p['avg_handshake_ms']}ms) | dùng lại {p['reused']} | bỏ do pool đầy {p['discarded']}")
+        if self.failures.items:
+            reasons = ", ".join(f"{reason}: {n}" for reason, n in self.failures.summary().items())
+            print(f"⚠️ Bỏ {len(self.failures.items)} link sau khi thử lại ({reasons})")
+            if self.failure_report_path: self.failures.save(self.failure_report_path)
+        if self.category_failures.items:
+            print(f"⚠️ {len(self.category_failures.items)} danh mục lỗi, chưa tìm đủ link: "
+                  + ", ".join(item["url"] for item in self.category_failures.items))
+        limits = self.rate_limiter.summary()
+        if limits: print(limits)
+        if self.media: print(self.media.summary())
+        if self.archive: print(self.archive.summary())
+        if not self.content_index: return
+        # Chỉ cào 1 phần link (hoặc tìm link chưa đủ) thì không coi các trang còn lại là đã biến mất
+        complete = self.complete_links is not None and self.complete_links <= set(links)
+        self.last_run_report = self.content_index.finish_run(links, complete)
+        counts = {k: len(v) for k, v in self.last_run_report.items()}
+        msg = (f"🔁 Mới: {counts['new']} | Thay đổi: {counts['changed']} | Không đổi: {counts['unchanged']} | "
+               + (f"Biến mất: {counts['disappeared']}" if complete else "Biến mất: chưa xét (không cào đủ link)"))
+        print(msg)
+        if status_text: status_text.text(msg)
+
+    # --- STREAMING: tải chi tiết ngay khi có link, không chờ tìm link xong ---
+    def scrape_details_stream(self, link_iter, progress_bar=None, status_text=None, sink=None):
+        """link_iter: iterable/generator link (VD: iter_links). Kết quả giữ thứ tự link.
+        Luôn tải bằng ThreadPool (fetch_mode="async" không áp dụng); parse_mode="process" vẫn dùng ProcessPool."""
+        self._begin_run()
+        links, futures, done = [], [], []
+        saved = self.checkpoint.records() if self.checkpoint else {}
+        parse_pool = self._new_parse_pool() if self.parse_mode == "process" else None
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                for link in link_iter:
+                    links.append(link)
+                    if link in saved:
+                        # Đã cào xong ở lần chạy trước (checkpoint)
+                        future = concurrent.futures.Future()
+                        future.set_result(self._to_sink(saved.pop(link), sink))
+                    else:
+                        future = executor.submit(self._fetch_to_sink, link, parse_pool, sink)
+                    future.add_done_callback(done.append)
+                    futures.append(future)
+                    self._report_progress(len(done), len(links), progress_bar, status_text)
+
+                completed = 0
+                for _ in concurrent.futures.as_completed(futures):
+                    completed += 1
+                    self._report_progress(completed, len(links), progress_bar, status_text)
+                data = [f.result() for f in futures]
+        finally:
+            if parse_pool: parse_pool.shutdown()
+
+        self._finish_run(links, status_text)
+        return sink.count if sink else [r for r in data if r]
+
+    def scrape_streaming(self, url, item_selector, link_selector=None, progress_callback=None,
+                         progress_bar=None, status_text=None, sink=None):
+        # Tìm link + tải chi tiết chồng lên nhau: tổng thời gian ~ max(tìm link, tải chi tiết). Trả về (links, data)
+        link_iter = self.iter_links(url, item_selector, link_selector, progress_callback)
+        data = self.scrape_details_stream(link_iter, progress_bar, status_text, sink)
+        return self.discovered_links, data
+
+    def resume(self, url, item_selector, link_selector=None, progress_callback=None,
+               progress_bar=None, status_text=None, sink=None):
+        """Chạy tiếp lần cào bị dừng: link, danh mục và trang chi tiết đã xong được lấy từ checkpoint.
+        Trả về (links, data) như scrape_streaming."""
+        if not self.checkpoint: raise ValueError("resume cần khởi tạo scraper với checkpoint_path")
+        stats = self.checkpoint.stats()
+        msg = (f"♻️ Chạy tiếp từ checkpoint: {stats['links']} link, {stats['categories']} danh mục, "
+               f"{stats['records']} sản phẩm đã có")
+        print(msg)
+        if progress_callback: progress_callback(msg)
+        return self.scrape_streaming(url, item_selector, link_selector, progress_callback,
+                                     progress_bar, status_text, sink)
+
+    # Các pipeline tải chi tiết trả về list cùng thứ tự / độ dài với links (None = link lỗi hoặc đã ghi ra sink)
+    def _scrape_details_threads(self, links, progress_bar=None, status_text=None, sink=None):
         total = len(links)
-        MAX_WORKERS = 10
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            future_to_url = {executor.submit(self._fetch_single_product, link): link for link in links}
+        results = [None] * total
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            future_to_index = {executor.submit(self._fetch_to_sink, link, None, sink): i for i, link in enumerate(links)}
             completed = 0
-            for future in concurrent.futures.as_completed(future_to_url):
-                result = future.result()
-                if result: data.append(result)
+            for future in concurrent.futures.as_completed(future_to_index):
+                results[future_to_index[future]] = future.result()
                 completed += 1
-                if progress_bar: progress_bar.progress(completed / total)
-                if status_text: status_text.text(f"Đã tải xong: {completed}/{total} sản phẩm")
-        return data
+                self._report_progress(completed, total, progress_bar, status_text)
+        return results
+
+    # --- PIPELINE: luồng I/O tải HTML -> ProcessPool parse (kết quả giữ đúng thứ tự links) ---
+    def _scrape_details_process(self, links, progress_bar=None, status_text=None, sink=None):
+        total = len(links)
+        results = [None] * total
+        completed = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency) as fetch_pool, \
+                self._new_parse_pool() as parse_pool:
+            pending = {fetch_pool.submit(self._fetch_html, link): ("fetch", i, None) for i, link in enumerate(links)}
+            while pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    stage, i, digest = pending.pop(future)
+                    if stage == "fetch" and future.result():
+                        content, encoding = future.result()
+                        digest, results[i] = self._unchanged_record(links[i], content)
+                        if results[i] is None:
+                            parse_future = parse_pool.submit(_parse_in_worker, type(self), self._parse_options(),
+                                                             content, encoding, links[i])
+                            pending[parse_future] = ("parse", i, digest)
+                            continue
+                    if stage == "parse":
+                        try:
+                            results[i] = self._parse_in_pool_result(future.result())
+                            self._remember_record(links[i], digest, results[i])
+                        except Exception as e:
+                            print(f"Lỗi link {links[i]}: {e}")
+                            self.failures.add(links[i], "parse")
+                    if stage == "media":
+                        results[i] = future.result()
+                    elif self.media and results[i]:
+                        # Tải ảnh trên luồng I/O, không chặn vòng điều phối
+                        pending[fetch_pool.submit(self.media.mirror, results[i])] = ("media", i, None)
+                        continue
+                    results[i] = self._to_sink(results[i], sink, links[i])
+                    completed += 1
+                    self._report_progress(completed, total, progress_bar, status_text)
+        return results
+
+    # --- ENGINE ASYNC (aiohttp): giữ hàng trăm request cùng lúc trên 1 core ---
+    async def _fetch_html_async(self, http, link, global_sem, host_sem):
+        # Bản async của _fetch_html: cache ETag/Last-Modified + giới hạn theo host + thử lại có backoff
+        limiter = self.rate_limiter.host(link)
+        entry = self.http_cache.lookup(link) if self.http_cache else None
+        for attempt in range(self.max_retries + 1):
+            status, retry_after, content, encoding = None, None, None, None
+            request_headers = self.http_cache.conditional_headers(entry) if entry else None
+            started = await limiter.acquire_async()
+            try:
+                async with global_sem, host_sem:
+                    start = time.perf_counter()
+                    async with http.get(link, headers=request_headers) as response:
+                        status = response.status
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        encoding = response.charset
+                        if status == 304 and entry:
+                            content = self.http_cache.read_body(link)
+                            self.http_cache.refresh(link, response.headers)
+                        elif status == 200:
+                            content = await response.read()
+                            if self.http_cache: self.http_cache.store(link, response.headers, content)
+                    nbytes = len(content) if status == 200 and content else 0
+                    self.profiler.record("fetch", self.site, time.perf_counter() - start, nbytes)
+                reason = f"HTTP {status}"
+            except Exception as e:
+                reason = type(e).__name__
+                print(f"Lỗi link {link}: {e}")
+            finally:
+                limiter.release(started, status, retry_after)
+            if content is not None: return self._archived(link, content, encoding)
+            if status == 304:
+                # Mất body trong cache -> tải lại ngay không kèm validator
+                entry = None
+                continue
+            if status is not None and status not in RETRY_STATUSES: break
+            if attempt < self.max_retries:
+                delay = retry_delay(attempt, retry_after)
+                if delay is None:
+                    reason += " (Retry-After quá dài)"
+                    break
+                await asyncio.sleep(delay)
+        self.failures.add(link, reason, status, attempt + 1)
+        return None
+
+    async def _fetch_single_product_async(self, http, link, global_sem, host_sems, parse_pool=None):
+        host = urlparse(link).netloc
+        if host not in host_sems:
+            host_sems[host] = asyncio.Semaphore(self.per_host_limit or self.max_concurrency)
+        fetched = await self._fetch_html_async(http, link, global_sem, host_sems[host])
+        if not fetched: return None
+        content, encoding = fetched
+        try:
+            digest, record = self._unchanged_record(link, content)
+            if record is not None: return record
+            if parse_pool:
+                loop = asyncio.get_running_loop()
+                record = self._parse_in_pool_result(await loop.run_in_executor(
+                    parse_pool, _parse_in_worker, type(self), self._parse_options(), content, encoding, link))
+            else:
+                # Parse ngay trên event loop (parse_detail của từng site giữ nguyên)
+                record = self._parse_html(content, link, encoding)
+            self._remember_record(link, digest, record)
+            return record
+        except Exception as e:
+            print(f"Lỗi link {link}: {e}")
+            self.failures.add(link, "parse")
+        return None
+
+    async def _scrape_details_async(self, links, progress_bar=None, status_text=None, sink=None):
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("Chế độ fetch_mode='async' cần cài thêm aiohttp: pip install aiohttp")
+
+        total = len(links)
+        results = [None] * total
+        global_sem = asyncio.Semaphore(self.max_concurrency)
+        host_sems = {}
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_limit or 0)
+        timeout = aiohttp.ClientTimeout(total=15)
+        parse_pool = self._new_parse_pool() if self.parse_mode == "process" else None
+
+        async def fetch_indexed(i, link):
+            record = await self._fetch_single_product_async(http, link, global_sem, host_sems, parse_pool)
+            if self.media and record: record = await self.media.mirror_async(record)
+            results[i] = self._to_sink(record, sink, link)
+
+        try:
+            async with aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout,
+                                             trace_configs=[aiohttp_trace_config(self.pool_stats)]) as http:
+                tasks = [asyncio.ensure_future(fetch_indexed(i, link)) for i, link in enumerate(links)]
+                completed = 0
+                for task in asyncio.as_completed(tasks):
+                    await task
+                    completed += 1
+                    self._report_progress(completed, total, progress_bar, status_text)
+        finally:
+            if parse_pool: parse_pool.shutdown()
+        return results
+
+
+# --- WORKER PARSE (chạy trong process con của ProcessPoolExecutor) ---
+# Mỗi process giữ sẵn 1 instance scraper cho mỗi (class, cấu hình parse) để không phải tạo lại Session
+_WORKER_SCRAPERS = {}
+
+
+def _parse_in_worker(scraper_cls, parse_options, content, encoding, link):
+    key = (scraper_cls, tuple(sorted(parse_options.items())))
+    bot = _WORKER_SCRAPERS.get(key)
+    if bot is None:
+        bot = _WORKER_SCRAPERS[key] = scraper_cls(**parse_options)
+    return bot._parse_html_timed(content, link, encoding)
 
 
 # --- CLASS 1: Viglacera Tiles ---
 class ViglaceraTilesScraper(BaseScraper):
+    PLAN = SelectorPlan(
+        page={"code": '.title-main h2 strong', "breadcrumb": '.breadcrumb li:last-child a',
+              "images": '.detail-pic img', "specs": '.des-item'},
+        item={"key": 'span', "value": 'h3'},
+    )
+    PARSE_REGION = PLAN.region()
+
     def parse_detail(self, soup, url):
-        code_tag = soup.select_one('.title-main h2 strong')
+        found = self.PLAN.scan(soup)
+        code_tag = first(found, "code")
         product_code = code_tag.text.strip() if code_tag else "N/A"
-        breadcrumb = soup.select_one('.breadcrumb li:last-child a')
+        breadcrumb = first(found, "breadcrumb")
         collection = breadcrumb.text.strip() if breadcrumb else "N/A"
         images = []
-        for img in soup.select('.detail-pic img'):
+        for img in found["images"]:
             src = img.get('src')
             if src:
                 if not src.startswith('http'): src = "https://viglaceratiles.vn" + src
                 images.append(src)
         dynamic_specs = {}
-        for item in soup.select('.des-item'):
-            key_tag = item.select_one('span')
-            val_tag = item.select_one('h3')
+        for item in found["specs"]:
+            key_tag = self.PLAN.select_one(item, "key")
+            val_tag = self.PLAN.select_one(item, "value")
             if key_tag and val_tag: dynamic_specs[key_tag.text.strip().title()] = val_tag.text.strip()
         final_data = {
             'URL': url, 'Mã Sản Phẩm': product_code, 'Bộ Sưu Tập': collection,
@@ -135,26 +942,36 @@ class ViglaceraTilesScraper(BaseScraper):
 
 # --- CLASS 2: Viglacera AAC ---
 class ViglaceraAACScraper(BaseScraper):
+    # Collection Haravan hỗ trợ phân trang ?page=N -> không cần cuộn bằng Selenium
+    HTTP_PAGE_URL = "{url}?page={page}"
+    PLAN = SelectorPlan(page={
+        "name": 'h1[itemprop="name"]', "brand": '.pro-brand a', "type": '.pro-type a',
+        "main_img": '#ProductPhoto img', "slider": '#sliderproduct img', "table": 'table', "h2": 'h2',
+        "tab_content": 'div.pro-tabcontent',
+    })
+    # Không lọc vùng: bảng thông tin nằm ở thẻ anh em ngay sau <h2> (find_next_sibling)
+
     def parse_detail(self, soup, url):
-        name_tag = soup.find('h1', itemprop='name')
+        found = self.PLAN.scan(soup)
+        name_tag = first(found, "name")
         product_name = name_tag.text.strip() if name_tag else "N/A"
-        brand_tag = soup.select_one('.pro-brand a')
+        brand_tag = first(found, "brand")
         brand = brand_tag.text.strip() if brand_tag else "N/A"
-        type_tag = soup.select_one('.pro-type a')
+        type_tag = first(found, "type")
         product_type = type_tag.text.strip() if type_tag else "N/A"
         images = []
-        main_img = soup.select_one('#ProductPhoto img')
+        main_img = first(found, "main_img")
         if main_img and main_img.get('src'):
             src = main_img.get('src')
             if src.startswith('//'): src = 'https:' + src
             images.append(src)
-        for img in soup.select('#sliderproduct img'):
+        for img in found["slider"]:
             src = img.get('src')
             if src:
                 if src.startswith('//'): src = 'https:' + src
                 if src not in images: images.append(src)
         specs = {}
-        table = soup.find('table')
+        table = first(found, "table")
         if table:
             for row in table.find_all('tr'):
                 cols = row.find_all(['td', 'th'])
@@ -167,16 +984,15 @@ class ViglaceraAACScraper(BaseScraper):
                     if len(row_data) > 2: key = f"{key} ({' '.join(row_data[1:-1])})"
                     specs[key] = value
         info_dict = {}
-        headers = soup.find_all('h2')
         target_ul = None
-        for h2 in headers:
+        for h2 in found["h2"]:
             if any(x in h2.text.upper() for x in ["THÔNG TIN", "TÍNH NĂNG"]):
                 sibling = h2.find_next_sibling(['ul', 'div'])
                 if sibling:
                     target_ul = sibling.find('ul') if sibling.name == 'div' else sibling
                     if target_ul: break
         if not target_ul:
-            content_div = soup.find('div', class_='pro-tabcontent')
+            content_div = first(found, "tab_content")
             if content_div: target_ul = content_div.find('ul')
         if target_ul:
             for i, li in enumerate(target_ul.find_all('li')):
@@ -197,10 +1013,16 @@ class ViglaceraAACScraper(BaseScraper):
 
 # --- CLASS 3: VTHM Group (Logic Data-Driven) ---
 class VthmGroupScraper(BaseScraper):
-
-    def get_links(self, url, item_selector, link_selector=None, progress_callback=None):
+    PLAN = SelectorPlan(
+        page={"name": 'h1', "attributes": '.attribute-item', "flex_rows": '.flex.gap-4',
+              "images": '.slides img, .swiper-slide img, main img'},
+        item={"label": '.text-content-3', "flex_label": '.w-26.text-content-3', "value": '.text-content-1'},
+    )
+    PARSE_REGION = PLAN.region()
+
+    def _get_links_selenium(self, url, item_selector, link_selector=None, progress_callback=None):
         driver = None
-        product_links = set()  # Sử dụng SET để tự động loại bỏ link trùng
+        product_links = self._new_link_set()  # Tự động loại bỏ link trùng (giữ thứ tự tìm thấy)
 
         # Selector chỉ dùng để TÌM nút, không dùng để check disabled nữa
         NEXT_BUTTON_SELECTOR = "nav.pagination button.btn-next"
@@ -209,9 +1031,11 @@ class VthmGroupScraper(BaseScraper):
             if progress_callback: progress_callback(f"🚀 Đang khởi động trình duyệt...")
             driver = self._setup_driver()
 
+            waiter = self._waiter(driver)
+
             if progress_callback: progress_callback(f"🔗 Đang truy cập: {url}")
             driver.get(url)
-            time.sleep(5)
+            waiter.until("page_load", elements_present(item_selector), timeout=15, baseline=5)
 
             page_count = 1
             page_des = 20
@@ -219,23 +1043,14 @@ class VthmGroupScraper(BaseScraper):
 
             while True:
                 # --- BƯỚC 1: LẤY DỮ LIỆU ---
-                # Chờ tối đa 10s cho đến khi link sản phẩm đầu tiên thay đổi so với trang trước
-                retries = 0
-                items = []
-                while retries < 10:
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
-                    items = soup.select(item_selector)
-
-                    if not items: break
-                    current_first_link = items[0].get('href')
-
-                    # Nếu là trang 1 HOẶC link đầu tiên đã khác trang trước -> OK, trang mới đã load
-                    if page_count == 1 or current_first_link != last_first_link:
-                        last_first_link = current_first_link
-                        break
+                # Từ trang 2: chờ tối đa 10s cho đến khi link sản phẩm đầu tiên thay đổi so với trang trước
+                if page_count > 1:
+                    waiter.until("page_change", first_href_changed(item_selector, last_first_link),
+                                 timeout=10, baseline=3)
 
-                    time.sleep(1)
-                    retries += 1
+                soup = self._make_soup(driver.page_source)
+                items = soup.select(item_selector)
+                if items: last_first_link = items[0].get('href')
 
                 # Lấy link từ các item tìm được
                 current_page_new_links = 0
@@ -269,17 +1084,13 @@ class VthmGroupScraper(BaseScraper):
                 try:
                     next_btn = driver.find_element(By.CSS_SELECTOR, NEXT_BUTTON_SELECTOR)
 
-                    # Cuộn tới nút và click
+                    # Cuộn tới nút và click (click bằng JS nên không cần chờ cuộn xong)
                     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_btn)
-                    time.sleep(1)
                     driver.execute_script("arguments[0].click();", next_btn)
 
                     print(f"⏳ Đang tải trang {page_count + 1}...")
                     page_count += 1
 
-                    # Chờ 1 chút sau khi click để web bắt đầu request
-                    time.sleep(2)
-
                 except Exception:
                     print(f"🛑 Không tìm thấy nút Next (Hoặc nút đã bị ẩn) -> Dừng.")
                     break
@@ -288,33 +1099,31 @@ class VthmGroupScraper(BaseScraper):
             if progress_callback: progress_callback(f"❌ Lỗi Selenium: {e}")
             print(f"Error: {e}")
         finally:
-            if driver: driver.quit()
+            if driver: self._release_driver(driver)
 
         return list(product_links)
 
     def parse_detail(self, soup, url):
         try:
-            name_tag = soup.select_one('h1')
+            found = self.PLAN.scan(soup)
+            name_tag = first(found, "name")
             product_name = name_tag.text.strip() if name_tag else "N/A"
 
             specs = {}
             # Grid items
-            attr_items = soup.select('.attribute-item')
-            for item in attr_items:
-                lbl = item.select_one('.text-content-3')
-                val = item.select_one('.text-content-1')
+            for item in found["attributes"]:
+                lbl = self.PLAN.select_one(item, "label")
+                val = self.PLAN.select_one(item, "value")
                 if lbl and val: specs[lbl.text.strip().title()] = val.text.strip()
 
             # Flex items
-            flex_rows = soup.select('.flex.gap-4')
-            for row in flex_rows:
-                lbl = row.select_one('.w-26.text-content-3')
-                val = row.select_one('.text-content-1')
+            for row in found["flex_rows"]:
+                lbl = self.PLAN.select_one(row, "flex_label")
+                val = self.PLAN.select_one(row, "value")
                 if lbl and val: specs[lbl.text.strip().title()] = val.text.strip()
 
             images = []
-            img_tags = soup.select('.slides img, .swiper-slide img, main img')
-            for img in img_tags:
+            for img in found["images"]:
                 src = img.get('src') or img.get('data-nuxt-img')
                 if src and 'http' in src and not any(x in src.lower() for x in ['logo', 'icon', '.svg']):
                     q_index = src.find('?')
@@ -341,18 +1150,69 @@ class VthmGroupScraper(BaseScraper):
 # --- CLASS 4: TaiceraVN (Bản nâng cấp: Smart Wait + Scroll) ---
 # --- CLASS 4: TaiceraVN (Đã thêm logic cào Slider 80x80) ---
 class TaiceraScraper(BaseScraper):
+    # Trang danh mục WooCommerce có phân trang tĩnh (/page/N/)
+    HTTP_NEXT_SELECTOR = "ul.page-numbers a.next"
+    # Selector nút Next của trang phân trang (Archive Page)
+    NEXT_BTN_XPATH_ARCHIVE = "//ul[contains(@class,'page-numbers')]//li/a[contains(@class,'next')]"
+    PLAN = SelectorPlan(
+        page={"name": '.product-title, h1.entry-title', "price": '.price span.amount bdi',
+              "price_sale": '.price ins span.amount bdi',
+              "images": '.product-gallery-slider img, .woocommerce-product-gallery__image img',
+              "description": '#tab-description, .woocommerce-Tabs-panel--description',
+              "attributes": 'table.woocommerce-product-attributes tr'},
+        item={"th": 'th', "td": 'td'},
+    )
+    PARSE_REGION = PLAN.region()
+
+    def _get_links_http(self, url, item_selector, link_selector=None, progress_callback=None):
+        product_links = self._new_link_set()
+        target_urls = []
+        is_general_page = "san-pham" in url or len(url.split('/')) < 5
+        try:
+            if is_general_page:
+                if progress_callback: progress_callback(f"⚡ Đang quét trang chủ sản phẩm bằng HTTP...")
+                soup = self._http_soup(url)
+                if soup is None: return None
+
+                # Slider 80x80: HTML tĩnh đã chứa đủ sản phẩm, slider chỉ ẩn/hiện nên không cần bấm Next
+                for h3 in soup.select('h3'):
+                    if '80 x 80' in h3.text or '80x80' in h3.text:
+                        container = h3.find_parent('div', class_='col-inner')
+                        if container:
+                            count_new = self._collect_links(container, "div.product-small",
+                                                            "a.woocommerce-LoopProduct-link",
+                                                            "https://taiceravn.com", product_links)
+                            print(f"   -> Slider 80x80: Lấy {count_new} link mới.")
+                            break
 
-    def get_links(self, url, item_selector, link_selector=None, progress_callback=None):
-        driver = None
-        product_links = set()
+                for a in soup.select('#menu-item-1665 .sub-menu a') + soup.select('h3.section-title a'):
+                    href = a.get('href')
+                    if href and 'http' in href: target_urls.append(href)
+                target_urls = list(dict.fromkeys(target_urls))
+                if progress_callback: progress_callback(
+                    f"✅ Đã quét xong trang chủ. Tìm thấy {len(product_links)} sp từ slider và {len(target_urls)} danh mục.")
+            else:
+                target_urls.append(url)
 
-        # Selector nút Next của trang phân trang (Archive Page)
-        NEXT_BTN_XPATH_ARCHIVE = "//ul[contains(@class,'page-numbers')]//li/a[contains(@class,'next')]"
+            target_urls = self._skip_80x80(target_urls, product_links)
+            crawl = lambda d, cat_url: self._crawl_category_http(d, cat_url, item_selector, link_selector)
+            for href in self._crawl_categories(target_urls, crawl, progress_callback):
+                product_links[href] = True
+            # Danh mục đã xong nằm trong checkpoint, Selenium chỉ còn duyệt lại các danh mục lỗi
+            if self.category_failures.items: raise ValueError("Có danh mục không tải được bằng HTTP")
+        except Exception as e:
+            print(f"⚠️ Không lấy được link bằng HTTP: {e}")
+            return None
+        return list(product_links)
+
+    def _get_links_selenium(self, url, item_selector, link_selector=None, progress_callback=None):
+        driver = None
+        product_links = self._new_link_set()
 
         try:
             if progress_callback: progress_callback(f"🚀 Đang khởi động trình duyệt...")
             driver = self._setup_driver()
-            wait = WebDriverWait(driver, 15)
+            waiter = self._waiter(driver)
 
             # --- GIAI ĐOẠN 1: TÌM LINK DANH MỤC (LINK CON) ---
             target_urls = []
@@ -361,7 +1221,7 @@ class TaiceraScraper(BaseScraper):
             if is_general_page:
                 if progress_callback: progress_callback(f"🔗 Đang truy cập trang chủ sản phẩm để quét...")
                 driver.get(url)
-                time.sleep(3)
+                waiter.until("page_load", network_idle(500), timeout=10, baseline=3)
 
                 # === [LOGIC MỚI] CÀO TRỰC TIẾP TỪ SLIDER TRANG CHỦ (ĐẶC BIỆT LÀ 80x80) ===
                 try:
@@ -382,7 +1242,7 @@ class TaiceraScraper(BaseScraper):
                         # Vì slider này lặp lại (wrapAround: true), ta cần set để lọc trùng
                         for _ in range(10):
                             # Lấy link hiện tại trong vùng này
-                            soup_slider = BeautifulSoup(container.get_attribute('outerHTML'), 'html.parser')
+                            soup_slider = self._make_soup(container.get_attribute('outerHTML'))
                             links_in_slider = soup_slider.select("div.product-small a.woocommerce-LoopProduct-link")
 
                             count_new = 0
@@ -402,7 +1262,8 @@ class TaiceraScraper(BaseScraper):
                                 next_btn_slider = container.find_element(By.XPATH,
                                                                          ".//button[contains(@class, 'next')]")
                                 driver.execute_script("arguments[0].click();", next_btn_slider)
-                                time.sleep(1.5)  # Chờ slider trượt
+                                # Chờ slider trượt xong (không còn tải thêm ảnh)
+                                waiter.until("slider_wait", network_idle(300), timeout=1.5, baseline=1.5)
                             except Exception as e:
                                 print("   -> Không bấm được nút Next slider (hoặc hết):", e)
                                 break
@@ -414,7 +1275,7 @@ class TaiceraScraper(BaseScraper):
 
                 # === [HẾT LOGIC MỚI] TIẾP TỤC QUÉT DANH MỤC KHÁC ===
 
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
+                soup = self._make_soup(driver.page_source)
 
                 # Tìm trong Menu chính
                 menu_links = soup.select('#menu-item-1665 .sub-menu a')
@@ -428,7 +1289,7 @@ class TaiceraScraper(BaseScraper):
                     href = a.get('href')
                     if href and 'http' in href: target_urls.append(href)
 
-                target_urls = list(set(target_urls))
+                target_urls = list(dict.fromkeys(target_urls))
 
                 # Loại bỏ link 80x80 khỏi danh sách quét chi tiết (vì trang đó bị lỗi như bạn nói)
                 # Hoặc cứ để nó chạy, nếu lỗi thì try/except bên dưới sẽ bỏ qua
@@ -438,92 +1299,97 @@ class TaiceraScraper(BaseScraper):
                 target_urls.append(url)
 
             # --- GIAI ĐOẠN 2: DUYỆT CÁC DANH MỤC CÒN LẠI ---
-            total_cats = len(target_urls)
-            for i, cat_url in enumerate(target_urls):
-                # Nếu bạn muốn bỏ qua trang 80x80 bị lỗi để tiết kiệm thời gian
-                if "80x80" in cat_url and len(product_links) > 0:
-                    print(f"⏩ Bỏ qua danh mục 80x80 (đã cào từ slider): {cat_url}")
-                    continue
+            target_urls = self._skip_80x80(target_urls, product_links)
+            if self.category_workers > 1:
+                # Song song: trả Chrome hiện tại lại, mỗi worker tự mượn Chrome riêng
+                self._release_driver(driver)
+                driver = None
 
-                msg = f"📂 [{i + 1}/{total_cats}] Đang xử lý: {cat_url}"
-                print(msg)
-                if progress_callback: progress_callback(msg)
+            crawl = lambda d, cat_url: self._crawl_category_selenium(d, cat_url, item_selector, link_selector)
+            for href in self._crawl_categories(target_urls, crawl, progress_callback, driver=driver, use_browser=True):
+                product_links.add(href)
 
-                try:
-                    driver.get(cat_url)
-                    time.sleep(3)
-
-                    page_count = 1
+        except Exception as e:
+            if progress_callback: progress_callback(f"❌ Lỗi Selenium: {e}")
+            print(f"Error: {e}")
+        finally:
+            if driver: self._release_driver(driver)
 
-                    while True:
-                        # Chờ và scroll (Chống sót)
-                        try:
-                            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, item_selector)))
-                        except:
-                            break
+        return list(product_links)
 
-                        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        time.sleep(2)
+    def _skip_80x80(self, target_urls, product_links):
+        # Bỏ qua trang 80x80 bị lỗi nếu đã cào được sản phẩm từ slider trang chủ
+        if not product_links: return target_urls
+        for cat_url in target_urls:
+            if "80x80" in cat_url: print(f"⏩ Bỏ qua danh mục 80x80 (đã cào từ slider): {cat_url}")
+        return [u for u in target_urls if "80x80" not in u]
 
-                        soup = BeautifulSoup(driver.page_source, 'html.parser')
-                        items = soup.select(item_selector)
+    def _crawl_category_selenium(self, driver, cat_url, item_selector, link_selector=None):
+        # Duyệt 1 danh mục (scroll + phân trang archive), trả về link theo thứ tự xuất hiện
+        waiter = self._waiter(driver)
+        category_links = self._new_link_set()
+        driver.get(cat_url)
 
-                        current_links_count = 0
-                        for item in items:
-                            tag = item.select_one(link_selector) if link_selector else item.select_one('a')
-                            href = tag.get('href') if tag else None
-                            if href:
-                                if not href.startswith('http'): href = "https://taiceravn.com" + href
-                                if href not in product_links:
-                                    product_links.add(href)
-                                    current_links_count += 1
+        page_count = 1
 
-                        if current_links_count == 0 and page_count > 1:
-                            break
+        while True:
+            # Chờ và scroll (Chống sót)
+            if not waiter.until("page_load", elements_present(item_selector), timeout=15,
+                                baseline=3 if page_count == 1 else 0):
+                break
 
-                            # Chuyển trang (Archive)
-                        try:
-                            next_btn = driver.find_element(By.XPATH, NEXT_BTN_XPATH_ARCHIVE)
-                            next_href = next_btn.get_attribute('href')
-                            if next_href:
-                                driver.get(next_href)
-                                page_count += 1
-                            else:
-                                break
-                        except Exception:
-                            break
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            waiter.until("scroll_wait", scroll_height_stable(500), timeout=2, baseline=2)
 
-                except Exception as e:
-                    print(f"Lỗi danh mục {cat_url}: {e}")
-                    continue
+            soup = self._make_soup(driver.page_source)
+            items = soup.select(item_selector)
 
-        except Exception as e:
-            if progress_callback: progress_callback(f"❌ Lỗi Selenium: {e}")
-            print(f"Error: {e}")
-        finally:
-            if driver: driver.quit()
+            current_links_count = 0
+            for item in items:
+                tag = item.select_one(link_selector) if link_selector else item.select_one('a')
+                href = tag.get('href') if tag else None
+                if href:
+                    if not href.startswith('http'): href = "https://taiceravn.com" + href
+                    if href not in category_links:
+                        category_links[href] = True
+                        current_links_count += 1
+
+            if current_links_count == 0 and page_count > 1:
+                break
+
+            # Chuyển trang (Archive)
+            try:
+                next_btn = driver.find_element(By.XPATH, self.NEXT_BTN_XPATH_ARCHIVE)
+                next_href = next_btn.get_attribute('href')
+                if next_href:
+                    driver.get(next_href)
+                    page_count += 1
+                else:
+                    break
+            except Exception:
+                break
 
-        return list(product_links)
+        return list(category_links)
 
     def parse_detail(self, soup, url):
         # ... (Giữ nguyên hàm parse_detail) ...
         try:
-            name_tag = soup.select_one('.product-title, h1.entry-title')
+            found = self.PLAN.scan(soup)
+            name_tag = first(found, "name")
             product_name = name_tag.text.strip() if name_tag else "N/A"
 
-            price_tag = soup.select_one('.price span.amount bdi')
-            price_sale = soup.select_one('.price ins span.amount bdi')
+            price_tag = first(found, "price")
+            price_sale = first(found, "price_sale")
             price = price_sale.text.strip() if price_sale else (price_tag.text.strip() if price_tag else "Liên hệ")
 
             images = []
-            img_tags = soup.select('.product-gallery-slider img, .woocommerce-product-gallery__image img')
-            for img in img_tags:
+            for img in found["images"]:
                 src = img.get('src') or img.get('data-src') or img.get('data-large_image')
                 if src and 'http' in src: images.append(src)
             images = list(set(images))
 
             specs = {}
-            desc_content = soup.select_one('#tab-description, .woocommerce-Tabs-panel--description')
+            desc_content = first(found, "description")
             if desc_content:
                 paragraphs = desc_content.find_all('p')
                 for p in paragraphs:
@@ -535,10 +1401,9 @@ class TaiceraScraper(BaseScraper):
                     elif "Đơn giá" in clean_text:
                         specs["Thông tin giá"] = clean_text
 
-            rows = soup.select('table.woocommerce-product-attributes tr')
-            for row in rows:
-                th = row.select_one('th')
-                td = row.select_one('td')
+            for row in found["attributes"]:
+                th = self.PLAN.select_one(row, "th")
+                td = self.PLAN.select_one(row, "td")
                 if th and td: specs[th.text.strip()] = td.text.strip()
 
             return {
@@ -556,10 +1421,21 @@ class TaiceraScraper(BaseScraper):
 
 # --- CLASS 5: Slabstone (Xử lý AJAX Pagination & Đa Tab chi tiết) ---
 class SlabstoneScraper(BaseScraper):
-
-    def get_links(self, url, item_selector, link_selector=None, progress_callback=None):
+    # Nút Next gọi AJAX; nếu không có href thật thì dùng URL phân trang chuẩn của WordPress
+    HTTP_NEXT_SELECTOR = "a.tv-page.next"
+    HTTP_PAGE_URL = "{url}/page/{page}/"
+    PLAN = SelectorPlan(
+        page={"name": 'h1.elementor-heading-title', "description": '.elementor-widget-theme-post-content',
+              "images": '.swiper-slide:not(.swiper-slide-duplicate) img', "tab_navs": '.tv-tab-nav li',
+              "info_grid": '.tv-info-grid', "tab_panels": '[id^="tv-tab-"]'},
+        item={"spec_item": '.item', "label": 'label', "value": 'p', "value_img": '.item-img img'},
+    )
+    # Panel của từng tab (#tv-tab-N) nằm trong vùng kể cả khi id đặt ở thẻ bọc ngoài .tv-info-grid
+    PARSE_REGION = PLAN.region()
+
+    def _get_links_selenium(self, url, item_selector, link_selector=None, progress_callback=None):
         driver = None
-        product_links = set()
+        product_links = self._new_link_set()
 
         # Selector nút Next
         NEXT_BTN_SELECTOR = "a.tv-page.next"
@@ -567,15 +1443,17 @@ class SlabstoneScraper(BaseScraper):
         try:
             if progress_callback: progress_callback(f"🚀 Đang khởi động trình duyệt...")
             driver = self._setup_driver()
+            waiter = self._waiter(driver)
+            item_link_css = f"{item_selector} {link_selector or 'a'}"
 
             if progress_callback: progress_callback(f"🔗 Đang truy cập: {url}")
             driver.get(url)
-            time.sleep(3)
+            waiter.until("page_load", elements_present(item_selector), timeout=15, baseline=3)
 
             page_count = 1
 
             while True:
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
+                soup = self._make_soup(driver.page_source)
                 items = soup.select(item_selector)
 
                 current_page_links = []
@@ -602,12 +1480,15 @@ class SlabstoneScraper(BaseScraper):
                         print("🚫 Nút Next bị ẩn -> Hết trang.")
                         break
 
+                    first_links = driver.find_elements(By.CSS_SELECTOR, item_link_css)
+                    first_href = first_links[0].get_dom_attribute('href') if first_links else None
+
                     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_btn)
-                    time.sleep(1)
                     driver.execute_script("arguments[0].click();", next_btn)
 
                     print(f"⏳ Đang tải trang {page_count + 1}...")
-                    time.sleep(3)  # Chờ AJAX load
+                    # Chờ AJAX load xong: sản phẩm đầu tiên đã đổi
+                    waiter.until("page_change", first_href_changed(item_link_css, first_href), timeout=10, baseline=4)
                     page_count += 1
                 except Exception:
                     print(f"🛑 Không tìm thấy nút Next (Hoặc đã hết trang).")
@@ -617,7 +1498,7 @@ class SlabstoneScraper(BaseScraper):
             if progress_callback: progress_callback(f"❌ Lỗi Selenium: {e}")
             print(f"Error: {e}")
         finally:
-            if driver: driver.quit()
+            if driver: self._release_driver(driver)
 
         return list(product_links)
 
@@ -625,11 +1506,10 @@ class SlabstoneScraper(BaseScraper):
     def _parse_specs_from_panel(self, container):
         specs = {}
         # Tìm các dòng thông số trong class .tv-info-grid .item
-        items = container.select('.item')
-        for item in items:
-            lbl = item.select_one('label')
-            val_p = item.select_one('p')
-            val_img = item.select_one('.item-img img')  # Trường hợp Công nghệ xương là ảnh
+        for item in self.PLAN.select(container, "spec_item"):
+            lbl = self.PLAN.select_one(item, "label")
+            val_p = self.PLAN.select_one(item, "value")
+            val_img = self.PLAN.select_one(item, "value_img")  # Trường hợp Công nghệ xương là ảnh
 
             if lbl:
                 key = lbl.text.strip().replace(':', '')
@@ -647,17 +1527,17 @@ class SlabstoneScraper(BaseScraper):
     def parse_detail(self, soup, url):
         try:
             # 1. Tên chung sản phẩm
-            name_tag = soup.select_one('h1.elementor-heading-title')
+            found = self.PLAN.scan(soup)
+            name_tag = first(found, "name")
             product_name = name_tag.text.strip() if name_tag else "N/A"
 
             # 2. Mô tả chung
-            desc_tag = soup.select_one('.elementor-widget-theme-post-content')
+            desc_tag = first(found, "description")
             description = desc_tag.text.strip() if desc_tag else ""
 
             # 3. Ảnh (Lấy từ Slider, lọc trùng)
             images = []
-            img_tags = soup.select('.swiper-slide:not(.swiper-slide-duplicate) img')
-            for img in img_tags:
+            for img in found["images"]:
                 src = img.get('src')
                 if src: images.append(src)
             images = list(set(images))
@@ -666,7 +1546,9 @@ class SlabstoneScraper(BaseScraper):
             variants = []
 
             # Tìm danh sách các Tab (Mã sản phẩm: SP82H127, SM82H127...)
-            tab_navs = soup.select('.tv-tab-nav li')
+            tab_navs = found["tab_navs"]
+            panels = {}
+            for tag in found["tab_panels"]: panels.setdefault(tag.get('id'), tag)  # id trùng: lấy thẻ đầu như select_one
 
             if tab_navs:
                 # Nếu có nhiều Tab
@@ -675,7 +1557,7 @@ class SlabstoneScraper(BaseScraper):
                     panel_id = li.get('data-tab')  # Lấy ID của panel chứa dữ liệu (VD: tv-tab-0)
 
                     # Tìm panel tương ứng trong HTML
-                    panel = soup.select_one(f'#{panel_id}')
+                    panel = panels.get(panel_id)
                     if panel:
                         # Gọi hàm phụ để lấy thông số kỹ thuật của panel này
                         specs = self._parse_specs_from_panel(panel)
@@ -688,7 +1570,7 @@ class SlabstoneScraper(BaseScraper):
             else:
                 # Trường hợp không có Tab (chỉ có 1 loại duy nhất)
                 # Thử tìm bảng thông số trực tiếp
-                panel = soup.select_one('.tv-info-grid')
+                panel = first(found, "info_grid")
                 if panel:
                     specs = self._parse_specs_from_panel(panel)
                     variants.append({
@@ -712,16 +1594,21 @@ class SlabstoneScraper(BaseScraper):
 
 # --- CLASS 6: Amy.vn (Full: Quét Menu + Cuộn trang + Parse chi tiết chuẩn) ---
 class AmyScraper(BaseScraper):
+    PLAN = SelectorPlan(
+        page={"name": 'h1', "images": '.details-pics .slidebox-item img', "info": '.product-info.data-index'},
+        item={"spec_item": '.des-item', "key": 'span', "value": 'strong'},
+    )
+    PARSE_REGION = PLAN.region()
 
-    def get_links(self, url, item_selector, link_selector=None, progress_callback=None):
+    def _get_links_selenium(self, url, item_selector, link_selector=None, progress_callback=None):
         driver = None
-        product_links = set()
+        product_links = self._new_link_set()
 
         try:
             if progress_callback: progress_callback(f"🚀 Đang khởi động trình duyệt...")
             driver = self._setup_driver()
             # Amy.vn load animation khá lâu, chờ tối đa 20s
-            wait = WebDriverWait(driver, 20)
+            waiter = self._waiter(driver)
 
             # --- GIAI ĐOẠN 1: TỰ ĐỘNG LẤY LINK DANH MỤC TỪ MENU ---
             target_categories = []
@@ -735,9 +1622,10 @@ class AmyScraper(BaseScraper):
 
                 try:
                     # Chờ menu xuất hiện
-                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".sub-menu-drop")))
+                    if not waiter.until("menu_wait", elements_present(".sub-menu-drop"), timeout=20):
+                        raise TimeoutError("Hết 20s vẫn chưa thấy menu")
 
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
+                    soup = self._make_soup(driver.page_source)
                     # Lấy tất cả link trong menu con
                     menu_items = soup.select('.sub-menu-drop .item-menu-second a')
 
@@ -755,82 +1643,92 @@ class AmyScraper(BaseScraper):
             else:
                 target_categories.append(url)
 
-            target_categories = list(set(target_categories))
+            target_categories = list(dict.fromkeys(target_categories))
             if progress_callback: progress_callback(
                 f"✅ Đã tìm thấy {len(target_categories)} danh mục. Bắt đầu quét sản phẩm.")
 
             # --- GIAI ĐOẠN 2: DUYỆT TỪNG DANH MỤC & CUỘN VÔ TẬN ---
-            total_cats = len(target_categories)
-            for i, cat_url in enumerate(target_categories):
-                msg = f"📂 [{i + 1}/{total_cats}] Đang xử lý: {cat_url}"
-                print(msg)
-                if progress_callback: progress_callback(msg)
+            if self.category_workers > 1:
+                # Song song: trả Chrome hiện tại lại, mỗi worker tự mượn Chrome riêng
+                self._release_driver(driver)
+                driver = None
 
-                try:
-                    driver.get(cat_url)
-                    time.sleep(5)  # Chờ load trang danh mục
-
-                    # Logic cuộn trang (Infinite Scroll)
-                    last_height = driver.execute_script("return document.body.scrollHeight")
-                    scroll_retries = 0
-
-                    while True:
-                        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        time.sleep(3)  # Chờ sản phẩm mới load lên
-
-                        new_height = driver.execute_script("return document.body.scrollHeight")
-                        if new_height == last_height:
-                            scroll_retries += 1
-                            if scroll_retries >= 2: break  # Hết trang
-                        else:
-                            scroll_retries = 0
-                            last_height = new_height
-
-                        # (Tùy chọn) In ra số lượng tạm thời
-                        # items_now = len(driver.find_elements(By.CSS_SELECTOR, item_selector))
-                        # print(f"   ...Đã load {items_now} sản phẩm")
-
-                    # Sau khi cuộn xong, parse HTML 1 lần để lấy link
-                    soup_cat = BeautifulSoup(driver.page_source, 'html.parser')
-                    items = soup_cat.select(item_selector)
-
-                    count_new = 0
-                    for item in items:
-                        # Link nằm trong thẻ a có class .link-load hoặc .more-details
-                        tag = item.select_one(link_selector) if link_selector else item.select_one('a')
-                        href = tag.get('href') if tag else None
-
-                        if href:
-                            if not href.startswith('http'): href = "https://amy.vn" + href
-                            if href not in product_links:
-                                product_links.add(href)
-                                count_new += 1
-
-                    print(f"   -> Lấy được {count_new} sản phẩm mới.")
-
-                except Exception as e:
-                    print(f"Lỗi danh mục {cat_url}: {e}")
-                    continue
+            crawl = lambda d, cat_url: self._crawl_category_selenium(d, cat_url, item_selector, link_selector)
+            for href in self._crawl_categories(target_categories, crawl, progress_callback, driver=driver,
+                                               use_browser=True):
+                product_links.add(href)
 
         except Exception as e:
             if progress_callback: progress_callback(f"❌ Lỗi Selenium: {e}")
             print(f"Error: {e}")
         finally:
-            if driver: driver.quit()
+            if driver: self._release_driver(driver)
 
         return list(product_links)
 
+    def _crawl_category_selenium(self, driver, cat_url, item_selector, link_selector=None):
+        # Duyệt 1 danh mục (cuộn vô tận), trả về link theo thứ tự xuất hiện
+        waiter = self._waiter(driver)
+        category_links = self._new_link_set()
+        driver.get(cat_url)
+        # Chờ load trang danh mục (có sản phẩm là đủ)
+        waiter.until("page_load", elements_present(item_selector), timeout=20, baseline=5)
+
+        # Logic cuộn trang (Infinite Scroll)
+        last_height = driver.execute_script("return document.body.scrollHeight")
+        scroll_retries = 0
+
+        while True:
+            item_count = len(driver.find_elements(By.CSS_SELECTOR, item_selector))
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            # Chờ sản phẩm mới load lên (trả về ngay khi có thêm sản phẩm)
+            waiter.until("scroll_wait", any_of(scroll_height_changed(last_height),
+                                                  item_count_increased(item_selector, item_count)),
+                         timeout=3, baseline=3)
+
+            new_height = driver.execute_script("return document.body.scrollHeight")
+            if new_height == last_height:
+                scroll_retries += 1
+                if scroll_retries >= 2: break  # Hết trang
+            else:
+                scroll_retries = 0
+                last_height = new_height
+
+            # (Tùy chọn) In ra số lượng tạm thời
+            # items_now = len(driver.find_elements(By.CSS_SELECTOR, item_selector))
+            # print(f"   ...Đã load {items_now} sản phẩm")
+
+        # Sau khi cuộn xong, parse HTML 1 lần để lấy link
+        soup_cat = self._make_soup(driver.page_source)
+        items = soup_cat.select(item_selector)
+
+        count_new = 0
+        for item in items:
+            # Link nằm trong thẻ a có class .link-load hoặc .more-details
+            tag = item.select_one(link_selector) if link_selector else item.select_one('a')
+            href = tag.get('href') if tag else None
+
+            if href:
+                if not href.startswith('http'): href = "https://amy.vn" + href
+                if href not in category_links:
+                    category_links[href] = True
+                    count_new += 1
+
+        print(f"   -> Lấy được {count_new} sản phẩm mới.")
+
+        return list(category_links)
+
     def parse_detail(self, soup, url):
         try:
             # 1. Tên sản phẩm (Thẻ h1)
-            name_tag = soup.select_one('h1')
+            found = self.PLAN.scan(soup)
+            name_tag = first(found, "name")
             product_name = name_tag.text.strip() if name_tag else "N/A"
 
             # 2. Hình ảnh
             # Ảnh nằm trong .details-pics -> .slidebox-item -> img
             images = []
-            img_tags = soup.select('.details-pics .slidebox-item img')
-            for img in img_tags:
+            for img in found["images"]:
                 src = img.get('src') or img.get('data-src')
                 if src:
                     if not src.startswith('http'): src = "https://amy.vn" + src
@@ -841,15 +1739,14 @@ class AmyScraper(BaseScraper):
             specs = {}
 
             # Tìm div chứa thông tin
-            info_container = soup.select_one('.product-info.data-index')
+            info_container = first(found, "info")
 
             if info_container:
                 # Tìm các thẻ h3 class="des-item"
-                items = info_container.select('.des-item')
-                for item in items:
+                for item in self.PLAN.select(info_container, "spec_item"):
                     # Key nằm trong span, Value nằm trong strong
-                    key_tag = item.select_one('span')
-                    val_tag = item.select_one('strong')
+                    key_tag = self.PLAN.select_one(item, "key")
+                    val_tag = self.PLAN.select_one(item, "value")
 
                     if key_tag and val_tag:
                         # Xóa dấu : ở key (VD: "Mã:" -> "Mã")
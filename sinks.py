@@ -0,0 +1,59 @@
+import io
+import gzip
+import json
+import textwrap
+import threading
+
+
+def _open(path, mode):
+    # File .gz được nén/giải nén gzip tự động
+    if path.endswith('.gz'): return gzip.open(path, mode, compresslevel=6)
+    return open(path, mode)
+
+
+# --- GHI KẾT QUẢ RA ĐĨA TỪNG BẢN GHI (JSONL / NDJSON) ---
+# Mỗi bản ghi là 1 dòng JSON, ghi ngay khi cào xong -> không phải giữ toàn bộ kết quả trong RAM.
+class JsonlSink:
+    def __init__(self, path, compress=None):
+        # compress: True = gzip; None = tự nhận theo đuôi file (.gz)
+        if compress and not path.endswith('.gz'): path += '.gz'
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = io.TextIOWrapper(_open(path, 'wb'), encoding='utf-8', newline='\n')
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed: self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path):
+    # Đọc lại file JSONL (hoặc .jsonl.gz) từng bản ghi một
+    with io.TextIOWrapper(_open(path, 'rb'), encoding='utf-8') as f:
+        for line in f:
+            if line.strip(): yield json.loads(line)
+
+
+def jsonl_to_json(src, dst, indent=4):
+    # Chuyển JSONL -> 1 mảng JSON trên đĩa (cùng định dạng json.dumps(data, indent=4) cũ), đọc/ghi từng bản ghi
+    count = 0
+    with io.TextIOWrapper(_open(dst, 'wb'), encoding='utf-8', newline='\n') as out:
+        out.write('[')
+        for record in iter_records(src):
+            item = json.dumps(record, ensure_ascii=False, indent=indent)
+            out.write((',\n' if count else '\n') + textwrap.indent(item, ' ' * indent, lambda _: True))
+            count += 1
+        out.write('\n]' if count else ']')
+    return count
@@ -0,0 +1,50 @@
+import os
+import json
+import tempfile
+import unittest
+import scrapers
+from product_store import ProductStore, build_store
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+def parse_fixture(scraper_name, filename):
+    # Bản ghi thật của scraper, parse từ trang mẫu trong fixtures/
+    with open(os.path.join(FIXTURES, scraper_name, "manifest.json"), encoding="utf-8") as f:
+        url = json.load(f)["pages"][filename]
+    with open(os.path.join(FIXTURES, scraper_name, filename), encoding="utf-8") as f:
+        html = f.read()
+    return getattr(scrapers, scraper_name)()._parse_html(html, url)
+
+
+class ProductStoreIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store_dir = os.path.join(self.tmp.name, "store")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_brand_label_from_page_is_indexed(self):
+        # Amy / Taicera ghi "Thương hiệu" (chữ h thường) thay vì "Thương Hiệu"
+        amy = parse_fixture("AmyScraper", "amy-6612.html")
+        taicera = parse_fixture("TaiceraScraper", "g68025.html")
+        self.assertIn("Thương hiệu", amy)
+        build_store([("Amy", [amy]), ("Taicera", [taicera])], self.store_dir)
+        with ProductStore(self.store_dir) as store:
+            self.assertEqual([r["URL"] for r in store.find(brand="Amy")], [amy["URL"]])
+            self.assertEqual([r["URL"] for r in store.find(brand="taicera")], [taicera["URL"]])
+            self.assertEqual(set(store.values("brand")), {"amy", "taicera"})
+            self.assertEqual(store.get("AMY-6612")["URL"], amy["URL"])
+
+    def test_collection_key_is_case_insensitive(self):
+        records = [{"URL": "https://a/1", "Bộ sưu tập": "Marble"}, {"URL": "https://a/2", "Bộ Sưu Tập": "marble "},
+                   {"URL": "https://a/3", "Dòng sản phẩm": "Stone"}]
+        build_store([(None, records)], self.store_dir)
+        with ProductStore(self.store_dir) as store:
+            self.assertEqual([r["URL"] for r in store.find(collection="MARBLE")], ["https://a/1", "https://a/2"])
+            self.assertEqual(store.values("collection"), {"marble": 2, "stone": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
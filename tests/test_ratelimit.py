@@ -0,0 +1,80 @@
+import time
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import scrapers
+from ratelimit import HostLimiter, MAX_RETRY_DELAY
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # /bad: 503 + Retry-After 1 giờ; còn lại trả trang bình thường
+    def do_GET(self):
+        if self.path.startswith("/bad"):
+            self.send_response(503)
+            self.send_header("Retry-After", "3600")
+            self.end_headers()
+            return
+        body = b"<html><h1>ok</h1></html>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LongRetryAfterTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_host_limiter_skips_cooldown_past_cap(self):
+        limiter = HostLimiter(max_concurrency=4)
+        limiter.release(limiter.acquire(), 503, MAX_RETRY_DELAY * 100)
+        start = time.monotonic()
+        limiter.release(limiter.acquire(), 200)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(limiter.stats["throttled"], 1)
+
+    def test_thread_fetch_does_not_pause_host(self):
+        bot = scrapers.ViglaceraAACScraper(fetch_mode="thread")
+        start = time.monotonic()
+        self.assertIsNone(bot._fetch_html(self.base + "/bad"))
+        self.assertIsNotNone(bot._fetch_html(self.base + "/ok-1"))
+        self.assertIsNotNone(bot._fetch_html(self.base + "/ok-2"))
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual([item["status"] for item in bot.failures.items], [503])
+
+    @unittest.skipUnless(aiohttp, "cần aiohttp")
+    def test_async_fetch_does_not_pause_host(self):
+        bot = scrapers.ViglaceraAACScraper(fetch_mode="async")
+
+        async def fetch_all():
+            async with aiohttp.ClientSession() as http:
+                sem = asyncio.Semaphore(5)
+                return [await bot._fetch_html_async(http, self.base + path, sem, asyncio.Semaphore(5))
+                        for path in ("/bad", "/ok-1", "/ok-2")]
+
+        start = time.monotonic()
+        results = asyncio.run(fetch_all())
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual([r is not None for r in results], [False, True, True])
+        self.assertEqual([item["status"] for item in bot.failures.items], [503])
+
+
+if __name__ == "__main__":
+    unittest.main()
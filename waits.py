@@ -0,0 +1,152 @@
+import time
+
+
+# Selenium chỉ được import khi thật sự chờ trình duyệt (Waiter.until) -> process chỉ tải HTTP / parse không phải nạp
+# Hằng số chiến lược tìm phần tử, giống hệt selenium.webdriver.common.by.By
+class By:
+    CSS_SELECTOR = "css selector"
+    XPATH = "xpath"
+
+
+# --- CÁC ĐIỀU KIỆN CHỜ (dùng với WebDriverWait.until) ---
+# Mỗi điều kiện trả về True ngay khi thỏa mãn -> không còn phải sleep cố định.
+class any_of:
+    """Thỏa mãn khi 1 trong các điều kiện thỏa mãn (như expected_conditions.any_of)."""
+
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+    def __call__(self, driver):
+        from selenium.common.exceptions import WebDriverException
+        for condition in self.conditions:
+            try:
+                result = condition(driver)
+                if result: return result
+            except WebDriverException:
+                pass
+        return False
+
+
+class elements_present:
+    def __init__(self, selector):
+        self.selector = selector
+
+    def __call__(self, driver):
+        return len(driver.find_elements(By.CSS_SELECTOR, self.selector)) > 0
+
+
+class item_count_increased:
+    """Số phần tử khớp selector tăng lên so với trước (lazy load / infinite scroll)."""
+
+    def __init__(self, selector, previous_count):
+        self.selector = selector
+        self.previous_count = previous_count
+
+    def __call__(self, driver):
+        return len(driver.find_elements(By.CSS_SELECTOR, self.selector)) > self.previous_count
+
+
+class first_href_changed:
+    """href của link sản phẩm đầu tiên khác trang trước (phân trang AJAX)."""
+
+    def __init__(self, selector, previous_href):
+        self.selector = selector
+        self.previous_href = previous_href
+
+    def __call__(self, driver):
+        elements = driver.find_elements(By.CSS_SELECTOR, self.selector)
+        if not elements: return False
+        href = elements[0].get_dom_attribute('href')
+        return href is not None and href != self.previous_href
+
+
+class scroll_height_changed:
+    def __init__(self, previous_height):
+        self.previous_height = previous_height
+
+    def __call__(self, driver):
+        return driver.execute_script("return document.body.scrollHeight") != self.previous_height
+
+
+class scroll_height_stable:
+    """scrollHeight không đổi trong stable_ms mili-giây liên tiếp."""
+
+    def __init__(self, stable_ms=500):
+        self.stable_ms = stable_ms
+        self.last_height = None
+        self.since = None
+
+    def __call__(self, driver):
+        height = driver.execute_script("return document.body.scrollHeight")
+        now = time.monotonic()
+        if height != self.last_height:
+            self.last_height, self.since = height, now
+            return False
+        return (now - self.since) * 1000 >= self.stable_ms
+
+
+class network_idle:
+    """Trang đã load xong và không có request tài nguyên mới trong idle_ms mili-giây."""
+    SCRIPT = ("return [document.readyState, "
+              "window.performance ? performance.getEntriesByType('resource').length : 0]")
+
+    def __init__(self, idle_ms=500):
+        self.idle_ms = idle_ms
+        self.last_count = None
+        self.since = None
+
+    def __call__(self, driver):
+        ready_state, count = driver.execute_script(self.SCRIPT)
+        now = time.monotonic()
+        if ready_state != "complete" or count != self.last_count:
+            self.last_count, self.since = count, now
+            return False
+        return (now - self.since) * 1000 >= self.idle_ms
+
+
+# --- GHI NHẬN THỜI GIAN CHỜ THỰC TẾ ---
+class WaitRecorder:
+    def __init__(self, profiler=None):
+        # profiler: Profiler (profiling.py) - mỗi bước chờ cũng được tính là 1 giai đoạn cùng tên
+        self.records = []
+        self.profiler = profiler
+
+    def reset(self):
+        self.records = []
+
+    def add(self, site, name, seconds, met, baseline=None):
+        self.records.append({"site": site, "name": name, "seconds": seconds, "met": met, "baseline": baseline})
+        if self.profiler: self.profiler.record(name, site, seconds)
+
+    def summary(self):
+        # Gom theo (site, tên bước chờ): số lần, tổng thời gian thực tế, thời gian tiết kiệm so với sleep cố định cũ
+        result = {}
+        for r in self.records:
+            key = f"{r['site']}:{r['name']}"
+            s = result.setdefault(key, {"count": 0, "timeouts": 0, "seconds": 0.0, "reclaimed_seconds": 0.0})
+            s["count"] += 1
+            s["seconds"] += r["seconds"]
+            if not r["met"]: s["timeouts"] += 1
+            if r["baseline"] is not None: s["reclaimed_seconds"] += r["baseline"] - r["seconds"]
+        return result
+
+
+class Waiter:
+    def __init__(self, driver, recorder, site=""):
+        self.driver = driver
+        self.recorder = recorder
+        self.site = site
+
+    def until(self, name, condition, timeout=10, baseline=None):
+        """Chờ tới khi condition thỏa mãn hoặc hết timeout. Trả về True/False, không raise.
+        baseline: số giây sleep cố định trước đây ở bước này (để tính thời gian tiết kiệm được)."""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+        start = time.perf_counter()
+        met = True
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(condition)
+        except (TimeoutException, WebDriverException):
+            met = False
+        self.recorder.add(self.site, name, time.perf_counter() - start, met, baseline)
+        return met